@@ -1,16 +1,18 @@
 import React, { useEffect, useState } from "react";
-import { fetchRecords } from "./utils/fetchCsv";
-import { RunRecord } from "./types";
+import { fetchRecords, fetchRollups } from "./utils/fetchCsv";
+import { AccuracyRollup, RunRecord } from "./types";
 import { AccuracyChart } from "./components/AccuracyChart";
 import { RecordTable } from "./components/RecordTable";
 import { RecordDetail } from "./components/RecordDetail";
 
 export const App: React.FC = () => {
   const [records, setRecords] = useState<RunRecord[]>([]);
+  const [rollups, setRollups] = useState<AccuracyRollup[]>([]);
   const [selected, setSelected] = useState<RunRecord | null>(null);
 
   useEffect(() => {
     fetchRecords().then(setRecords).catch(console.error);
+    fetchRollups().then(setRollups).catch(console.error);
   }, []);
 
   useEffect(() => {
@@ -24,7 +26,7 @@ export const App: React.FC = () => {
   return (
     <div style={{ padding: 20 }}>
       <h1>ML Run Records Dashboard</h1>
-      <AccuracyChart records={records} />
+      <AccuracyChart rollups={rollups} />
       <div>click table record to view details</div>
       <RecordTable records={records} onSelect={setSelected} />
       <RecordDetail record={selected} onClose={() => setSelected(null)} />
@@ -1,5 +1,5 @@
 import React from "react";
-import { RunRecord } from "../types";
+import { AccuracyRollup } from "../types";
 import {
   LineChart,
   Line,
@@ -12,35 +12,43 @@ import {
 } from "recharts";
 
 interface Props {
-  records: RunRecord[];
+  rollups: AccuracyRollup[];
 }
 
-export const AccuracyChart: React.FC<Props> = ({ records }) => {
+export const AccuracyChart: React.FC<Props> = ({ rollups }) => {
   // モデルごとに色を分ける
-  const llms = Array.from(new Set(records.map((r) => r.llm_name)));
+  const llms = Array.from(new Set(rollups.map((r) => r.llm_name)));
   const colors = ["#8884d8", "#82ca9d", "#ffc658", "#ff7300", "#0088FE"];
+  // 1 日 1 行（LLM ごとの列）に並べ替える
+  const byDay = new Map<string, Record<string, string | number>>();
+  rollups
+    .filter((r) => r.run_count > 0)
+    .forEach((r) => {
+      const row = byDay.get(r.day) ?? { day: r.day };
+      row[r.llm_name] = r.test_p50;
+      byDay.set(r.day, row);
+    });
+  const data = Array.from(byDay.values()).sort((a, b) => String(a.day).localeCompare(String(b.day)));
 
   return (
     <ResponsiveContainer width="100%" height={300}>
-      <LineChart data={records} margin={{ top: 10, right: 30, left: 0, bottom: 30 }}>
+      <LineChart data={data} margin={{ top: 10, right: 30, left: 0, bottom: 30 }}>
         <CartesianGrid strokeDasharray="3 3" />
         <XAxis
-          dataKey="created_at"
+          dataKey="day"
           tickFormatter={(value) => new Date(value).toLocaleDateString()}
         />
-        <YAxis />
+        <YAxis domain={["auto", "auto"]} />
         <Tooltip
-          labelFormatter={(label) => new Date(label).toLocaleString()}
+          labelFormatter={(label) => new Date(label).toLocaleDateString()}
         />
         <Legend />
         {llms.map((llm, idx) => (
           <Line
             key={llm}
             type="monotone"
-            dataKey={(row: RunRecord) =>
-              row.llm_name === llm ? row.accuracy_test : undefined
-            }
-            name={`${llm} (test)`}
+            dataKey={llm}
+            name={`${llm} (test, daily median)`}
             stroke={colors[idx % colors.length]}
             connectNulls
           />
@@ -50,4 +58,4 @@ export const AccuracyChart: React.FC<Props> = ({ records }) => {
   );
 };
 
-export default AccuracyChart;
\ No newline at end of file
+export default AccuracyChart;
@@ -1,3 +1,13 @@
 export const CSV_URL =
   "https://storage.googleapis.com/model-periodic-learn-test/db/model_eval_results.csv?t=" +
-  Date.now();
\ No newline at end of file
+  Date.now();
+
+// REPORT_EXPORT_MODE=incremental の出力（月別の gzip CSV と manifest.json）
+export const EXPORT_BASE_URL =
+  "https://storage.googleapis.com/model-periodic-learn-test/db/model_eval_results_export/";
+export const EXPORT_MANIFEST_URL = EXPORT_BASE_URL + "manifest.json?t=" + Date.now();
+
+// LLM・日ごとの精度集計（accuracy_rollups）
+export const ROLLUP_CSV_URL =
+  "https://storage.googleapis.com/model-periodic-learn-test/db/model_eval_results_rollup.csv?t=" +
+  Date.now();
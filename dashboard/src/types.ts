@@ -9,4 +9,16 @@ export interface RunRecord {
   accuracy_val: number;
   accuracy_test: number;
   created_at: string; // CSV読み込み時は string
-}
\ No newline at end of file
+}
+export interface AccuracyRollup {
+  day: string;
+  llm_name: string;
+  run_count: number;
+  failure_count: number;
+  val_mean: number;
+  val_p50: number;
+  test_mean: number;
+  test_p10: number;
+  test_p50: number;
+  test_p90: number;
+}
@@ -1,16 +1,24 @@
-import { CSV_URL } from "../constants";
-import { RunRecord } from "../types";
+import { CSV_URL, EXPORT_BASE_URL, EXPORT_MANIFEST_URL, ROLLUP_CSV_URL } from "../constants";
+import { AccuracyRollup, RunRecord } from "../types";
 import Papa from "papaparse";
 
-export async function fetchRecords(): Promise<RunRecord[]> {
+interface ExportManifest {
+  version: number;
+  max_id: number;
+  rows: number;
+  partitions: Record<string, { file: string; rows: number; min_id: number; max_id: number }>;
+}
+
+function parseCsv(url: string): Promise<RunRecord[]> {
   return new Promise((resolve, reject) => {
-    Papa.parse<RunRecord>(CSV_URL, {
+    Papa.parse<RunRecord>(url, {
       download: true,
       header: true,
       skipEmptyLines: true,
       complete: (results) => {
         const data = results.data.map((row) => ({
           ...row,
+          id: Number(row.id),
           accuracy_val: parseFloat(row.accuracy_val as unknown as string),
           accuracy_test: parseFloat(row.accuracy_test as unknown as string),
           created_at: new Date(row.created_at).toISOString(),
@@ -20,4 +28,40 @@ export async function fetchRecords(): Promise<RunRecord[]> {
       error: (err) => reject(err),
     });
   });
-}
\ No newline at end of file
+}
+
+async function fetchManifest(): Promise<ExportManifest | null> {
+  try {
+    const res = await fetch(EXPORT_MANIFEST_URL);
+    return res.ok ? ((await res.json()) as ExportManifest) : null;
+  } catch {
+    return null;
+  }
+}
+
+export async function fetchRecords(): Promise<RunRecord[]> {
+  const manifest = await fetchManifest();
+  if (!manifest) {
+    // 増分エクスポートが無ければ全件の CSV を読む
+    return parseCsv(CSV_URL);
+  }
+  // パーティションのファイル名は中身ごとに変わるのでブラウザのキャッシュがそのまま使える
+  // （Content-Encoding: gzip で配信されるため展開はブラウザが行う）
+  const parts = await Promise.all(
+    Object.values(manifest.partitions).map((p) => parseCsv(EXPORT_BASE_URL + p.file))
+  );
+  return parts.flat().sort((a, b) => a.id - b.id);
+}
+
+export async function fetchRollups(): Promise<AccuracyRollup[]> {
+  return new Promise((resolve, reject) => {
+    Papa.parse<AccuracyRollup>(ROLLUP_CSV_URL, {
+      download: true,
+      header: true,
+      skipEmptyLines: true,
+      dynamicTyping: true,
+      complete: (results) => resolve(results.data),
+      error: (err) => reject(err),
+    });
+  });
+}
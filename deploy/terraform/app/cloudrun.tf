@@ -12,7 +12,7 @@ resource "google_cloud_run_v2_job" "mplm_app_job" {
         resources {
           limits = {
             cpu    = "2"
-            memory = "1024Mi"
+            memory = "2048Mi"
           }
         }
 
@@ -44,6 +44,39 @@ resource "google_cloud_run_v2_job" "mplm_app_job" {
           name  = "MODEL_SAVE_DIR"
           value = var.model_save_dir
         }
+        env {
+          name  = "EXECUTION_BACKEND"
+          value = "sandbox"
+        }
+        env {
+          name  = "LLM_STREAMING"
+          value = "true"
+        }
+        env {
+          name  = "LOG_FORMAT"
+          value = "json"
+        }
+        env {
+          name  = "LLM_REQUESTS_PER_MIN"
+          value = "20"
+        }
+        env {
+          name  = "NUM_TRAINING_CANDIDATES"
+          value = "3"
+        }
+        env {
+          # 候補を同時に実行できるよう、ワーカー数は候補数以上にする
+          name  = "EXECUTION_NUM_WORKERS"
+          value = "3"
+        }
+        env {
+          name  = "EXECUTION_MAX_RSS_MB"
+          value = "512"
+        }
+        env {
+          name  = "SUMMARY_CACHE_MODE"
+          value = "latest"
+        }
         env {
           name  = "FORCE_DEPLOY"
           value = var.image_digest
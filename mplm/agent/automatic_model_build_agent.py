@@ -7,27 +7,32 @@ model training with retry logic. All nodes are wired together
 using LangGraph's StateGraph.
 """
 
+from functools import partial
+
 from langgraph.graph import END, StateGraph
 
 from ..chains.summary_chain import summary_chain
-from ..chains.training_chain import fix_error_training_chain, training_chain
-from ..db.crud import create_run_record
+from ..chains.training_chain import fix_error_training_chain, parallel_training_chain, training_chain
+from ..db.crud import create_run_record, create_run_spans
 from ..db.session import get_session
 from ..llm import get_llm
 from ..models.state import WorkflowState
+from ..services.summary_cache import record_summary_accuracy
 from ..settings import settings
 from ..utils.logger import get_logger
+from ..utils.tracing import traced_node
 
 logger = get_logger(__name__)
 
 
-def build_workflow(max_retry: int = settings.max_retry):
+def build_workflow(max_retry: int = settings.max_retry, num_candidates: int = settings.num_training_candidates):
     """
     Build the automatic model build workflow as a LangGraph StateGraph.
 
     Workflow nodes:
       - summary: generate dataset summary using LLM
-      - training: train model
+      - training: train model (with num_candidates > 1, that many programs are
+        generated and executed in parallel and the best one is kept)
       - fix_error_training: retry training if errors occur
 
     Retry logic:
@@ -38,10 +43,13 @@ def build_workflow(max_retry: int = settings.max_retry):
     """
     graph = StateGraph(WorkflowState)
 
-    # Add nodes
-    graph.add_node("summary", summary_chain)
-    graph.add_node("training", training_chain)
-    graph.add_node("fix_error_training", fix_error_training_chain)
+    # Add nodes (each node is a span of state["trace"] when the state carries one)
+    graph.add_node("summary", traced_node("summary", summary_chain))
+    if num_candidates > 1:
+        graph.add_node("training", traced_node("training", partial(parallel_training_chain, num_candidates=num_candidates)))
+    else:
+        graph.add_node("training", traced_node("training", training_chain))
+    graph.add_node("fix_error_training", traced_node("fix_error_training", fix_error_training_chain))
 
     # Entry point
     graph.set_entry_point("summary")
@@ -92,6 +100,7 @@ def save_run_to_db(state: WorkflowState, db_path: str = settings.db_file):
     """
     Save summary and training results into the database using the new RunRecord schema.
     db_path は指定がなければ settings.db_file を使用する。
+    並列学習（state["candidate_results"]）の場合は全候補を 1 レコードずつ保存する。
     """
     training = state.get("training_result")
     summary = state.get("summary_result")
@@ -106,11 +115,6 @@ def save_run_to_db(state: WorkflowState, db_path: str = settings.db_file):
     # Extract fields safely
     dataset_summary_code = getattr(summary, "summary_code", None) if summary else None
     dataset_summary = getattr(summary, "summary_text", "") if summary else ""
-    train_code = getattr(training, "code", "")
-    model_name = getattr(training, "model_name", "")
-    model_path = getattr(training, "model_path", "")
-    accuracy_val = getattr(training, "accuracy_val", 0.0)
-    accuracy_test = getattr(training, "accuracy_test", 0.0)
 
     # LLM name resolution
     llm = state.get("llm", None) or get_llm()
@@ -121,19 +125,34 @@ def save_run_to_db(state: WorkflowState, db_path: str = settings.db_file):
     else:
         llm_name = "unknown"
 
+    candidates = state.get("candidate_results") or [training]
+
     # Create session dynamically
     SessionLocal = get_session(db_path)
+    trace = state.get("trace")
     with SessionLocal() as db:
-        create_run_record(
-            db,
-            train_code=train_code,
-            model_name=model_name,
-            model_path=model_path,
-            dataset_summary=dataset_summary,
-            dataset_summary_code=dataset_summary_code,
-            accuracy_val=accuracy_val,
-            accuracy_test=accuracy_test,
-            llm_name=llm_name,
-        )
+        for result in candidates:
+            record = create_run_record(
+                db,
+                train_code=getattr(result, "code", ""),
+                model_name=getattr(result, "model_name", ""),
+                model_path=getattr(result, "model_path", ""),
+                dataset_summary=dataset_summary,
+                dataset_summary_code=dataset_summary_code,
+                accuracy_val=getattr(result, "accuracy_val", 0.0),
+                accuracy_test=getattr(result, "accuracy_test", 0.0),
+                llm_name=llm_name,
+            )
+            # トレースは採用された（best）候補のレコードに紐づける
+            if trace is not None and result is training:
+                create_run_spans(db, run_id=record.id, spans=trace.spans)
+
+    accuracy_val = max(getattr(result, "accuracy_val", 0.0) for result in candidates)
+    cache_id = getattr(summary, "cache_id", None) if summary else None
+    if cache_id is not None:
+        try:
+            record_summary_accuracy(cache_id, accuracy_val, db_path=db_path)
+        except Exception as e:
+            logger.warning(f"Failed to record summary accuracy: {e}")
 
     logger.info("Saved run to DB.")
@@ -0,0 +1,149 @@
+"""
+Batch re-evaluation of stored training code.
+
+Re-executes the train_code of every RunRecord on a (new) dataset or split
+seed and writes one ReevaluationRecord per run, linked to the original run.
+
+- RunRecords are streamed from SQLite page by page, so memory use does not
+  grow with the number of stored runs.
+- Programs run in parallel on a SandboxExecutor worker pool (one process
+  per core by default); the split is shared with the workers once.
+- Every result is committed as soon as it arrives. A batch is identified by
+  batch_id (dataset fingerprint + seed by default), and runs that already
+  have a row in the batch are skipped, so an interrupted batch resumes
+  where it stopped.
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from ..db.crud import create_reevaluation_record, get_reevaluated_run_ids, iter_run_codes
+from ..db.session import get_session
+from ..models.reevaluation import ReevaluationSummary
+from ..models.training import TrainExecutionResult
+from ..services.code_validator import validate_training_code
+from ..services.sandbox_executor import SandboxExecutor
+from ..services.split_cache import dataset_fingerprint, get_dataset_split
+from ..settings import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def default_batch_id(df: pd.DataFrame, random_seed: int | None) -> str:
+    """Batch id of a dataset / seed pair ("<fingerprint[:16]>-seed<seed>")."""
+    return f"{dataset_fingerprint(df)[:16]}-seed{random_seed}"
+
+
+def reevaluate_runs(
+    df: pd.DataFrame,
+    random_seed: int | None = settings.default_random_seed,
+    batch_id: str | None = None,
+    db_path: str = settings.db_file,
+    executor: SandboxExecutor | None = None,
+    num_workers: int | None = None,
+    limit: int | None = None,
+    page_size: int = 100,
+) -> ReevaluationSummary:
+    """
+    Re-execute stored train_code on `df` split with `random_seed` and record the accuracies.
+
+    Args:
+        df: pandas DataFrame to evaluate on.
+        random_seed: Split seed.
+        batch_id: Batch identifier. Defaults to default_batch_id(df, random_seed).
+            Calling again with the same batch id resumes the batch.
+        db_path: SQLite file holding the runs and reevaluations tables.
+        executor: Sandbox pool to run on. If None, a pool of `num_workers` is created and closed.
+        num_workers: Worker processes of the created pool.
+            Defaults to settings.reevaluation_num_workers, or the number of CPUs.
+        limit: Max number of runs executed by this call (None → all remaining).
+        page_size: Number of RunRecords fetched per query.
+
+    Returns:
+        ReevaluationSummary
+    """
+    start = time.perf_counter()
+    fingerprint = dataset_fingerprint(df)
+    batch_id = batch_id or default_batch_id(df, random_seed)
+    summary = ReevaluationSummary(batch_id=batch_id, dataset_fingerprint=fingerprint, random_seed=random_seed)
+
+    own_executor = executor is None
+    if own_executor:
+        num_workers = num_workers or settings.reevaluation_num_workers or os.cpu_count() or 1
+        executor = SandboxExecutor(num_workers=num_workers)
+
+    SessionLocal = get_session(db_path)
+    try:
+        split = get_dataset_split(df, random_seed=random_seed)
+        dataset = executor.share_frames(key=("split", fingerprint, random_seed), make_frames=split.frames)
+
+        def evaluate(code: str) -> tuple[TrainExecutionResult | None, str | None, float]:
+            started_at = time.perf_counter()
+            try:
+                validate_training_code(code)
+                result = executor.run(code, dataset=dataset)
+            except Exception as e:
+                return None, str(e), time.perf_counter() - started_at
+            return result, None, time.perf_counter() - started_at
+
+        max_in_flight = executor.num_workers * 2
+        # 書き込みは呼び出しスレッドのみ（SQLite は 1 セッションで読み書きする）
+        with SessionLocal() as db, ThreadPoolExecutor(max_workers=executor.num_workers) as pool:
+            done = get_reevaluated_run_ids(db, batch_id)
+            logger.info(f"[reevaluate] batch {batch_id}: {len(done)} runs already evaluated")
+            pending: dict[Future, int] = {}
+
+            def record(futures) -> None:
+                for future in futures:
+                    run_id = pending.pop(future)
+                    result, error, elapsed = future.result()
+                    if result is None:
+                        logger.warning(f"[reevaluate] run {run_id} failed: {error}")
+                        summary.failed += 1
+                    else:
+                        summary.succeeded += 1
+                    summary.evaluated += 1
+                    create_reevaluation_record(
+                        db,
+                        batch_id=batch_id,
+                        run_id=run_id,
+                        dataset_fingerprint=fingerprint,
+                        random_seed=random_seed,
+                        status="failed" if result is None else "ok",
+                        accuracy_val=None if result is None else result.accuracy_val,
+                        accuracy_test=None if result is None else result.accuracy_test,
+                        error=error,
+                        elapsed_sec=elapsed,
+                    )
+
+            submitted = 0
+            for run_id, code in iter_run_codes(db, batch_size=page_size):
+                if run_id in done:
+                    summary.skipped += 1
+                    continue
+                if limit is not None and submitted >= limit:
+                    break
+                while len(pending) >= max_in_flight:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    record(finished)
+                pending[pool.submit(evaluate, code)] = run_id
+                submitted += 1
+
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                record(finished)
+    finally:
+        if own_executor:
+            executor.close()
+
+    summary.elapsed_sec = time.perf_counter() - start
+    logger.info(
+        f"[reevaluate] batch {batch_id}: evaluated {summary.evaluated} "
+        f"(ok {summary.succeeded}, failed {summary.failed}), skipped {summary.skipped} "
+        f"in {summary.elapsed_sec:.1f}s"
+    )
+    return summary
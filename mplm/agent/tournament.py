@@ -0,0 +1,164 @@
+"""
+Multi-model tournament runner.
+
+Runs the automatic model build workflow for several LLMs concurrently on
+the same dataset. All runs share the cached train/val/test split (keyed on
+the dataset fingerprint), so their accuracies are directly comparable, and
+each successful run is written to the DB as one RunRecord.
+
+Concurrency is bounded globally (max_workers) and per provider (the part of
+the OpenRouter model id before "/"), since free-tier rate limits apply per
+provider.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from ..llm import get_llm
+from ..llm.model_catalog import is_rate_limit_message, record_model_run, select_models
+from ..models.state import WorkflowState
+from ..models.tournament import TournamentEntry
+from ..services.split_cache import dataset_fingerprint, get_dataset_split
+from ..settings import settings
+from ..utils.logger import get_logger, log_context
+from ..utils.tracing import Trace
+from .automatic_model_build_agent import build_workflow, save_run_to_db
+
+logger = get_logger(__name__)
+
+
+def model_provider(model_name: str) -> str:
+    """Provider part of an OpenRouter model id ("qwen/qwen3-14b:free" → "qwen")."""
+    return model_name.split("/", 1)[0] if "/" in model_name else model_name
+
+
+def pick_tournament_models(num_models: int, seed: int | None = None) -> list[str]:
+    """
+    Sample healthy models from the cached OpenRouter free model catalog (see model_catalog.py).
+    """
+    return select_models(num_models, seed=seed)
+
+
+def run_tournament(
+    df: pd.DataFrame,
+    model_names: list[str],
+    target_column: str,
+    temperature: float | None = None,
+    metadata=None,
+    max_workers: int = settings.tournament_max_workers,
+    max_per_provider: int = settings.tournament_max_per_provider,
+    max_retry: int = settings.max_retry,
+    save: bool = True,
+    db_path: str = settings.db_file,
+) -> list[TournamentEntry]:
+    """
+    Run the workflow once per model concurrently and record the results.
+
+    Args:
+        df: pandas DataFrame
+        model_names: LLM model names to compare.
+        target_column: Target column name.
+        temperature: Sampling temperature shared by all models.
+        metadata: Dataset metadata put into each WorkflowState.
+        max_workers: Max number of models running at the same time.
+        max_per_provider: Max number of models of the same provider running at the same time.
+        max_retry: Retry limit passed to build_workflow.
+        save: Write one RunRecord per successful model and a health event per model.
+        db_path: SQLite file for save.
+
+    Returns:
+        List of TournamentEntry, in the order of model_names
+    """
+    # 全モデルで同じ分割を使う（事前に計算してキャッシュしておく）
+    dataset_fingerprint(df)
+    get_dataset_split(df)
+
+    workflow = build_workflow(max_retry=max_retry, num_candidates=1)
+    semaphores: dict[str, threading.Semaphore] = {}
+    semaphores_lock = threading.Lock()
+
+    def provider_semaphore(model_name: str) -> threading.Semaphore:
+        provider = model_provider(model_name)
+        with semaphores_lock:
+            if provider not in semaphores:
+                semaphores[provider] = threading.Semaphore(max_per_provider)
+            return semaphores[provider]
+
+    def run_one(model_name: str) -> tuple[TournamentEntry, WorkflowState | None]:
+        with provider_semaphore(model_name):
+            logger.info(f"[tournament] Running {model_name}...")
+            start = time.perf_counter()
+            try:
+                state: WorkflowState = {
+                    "df": df,
+                    "target_column": target_column,
+                    "metadata": metadata,
+                    # モデル同士の比較なので、別モデルへのフォールバックはしない
+                    "llm": get_llm(model_name=model_name, temperature=temperature, fallback=False),
+                    "trace": Trace(),
+                }
+                with log_context(run_id=uuid.uuid4().hex[:12], llm=model_name):
+                    final_state = workflow.invoke(state, debug=False)
+            except Exception as e:
+                logger.warning(f"[tournament] {model_name} raised: {e}")
+                entry = TournamentEntry(
+                    model_name=model_name,
+                    status="failed",
+                    error=str(e),
+                    elapsed_sec=time.perf_counter() - start,
+                )
+                return entry, None
+
+        elapsed = time.perf_counter() - start
+        training = final_state.get("training_result")
+        if final_state.get("status") != "ok" or training is None:
+            errors = final_state.get("training_errors") or final_state.get("summary_errors") or []
+            entry = TournamentEntry(
+                model_name=model_name,
+                status="failed",
+                error=errors[-1] if errors else None,
+                elapsed_sec=elapsed,
+            )
+            return entry, None
+
+        entry = TournamentEntry(
+            model_name=model_name,
+            status="ok",
+            accuracy_val=training.accuracy_val,
+            accuracy_test=training.accuracy_test,
+            trained_model_name=training.model_name,
+            elapsed_sec=elapsed,
+        )
+        return entry, final_state
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        outcomes = list(pool.map(run_one, model_names))
+
+    # SQLite への書き込みは全モデル終了後にまとめて直列で行う
+    if save:
+        for entry, final_state in outcomes:
+            if final_state is not None:
+                save_run_to_db(final_state, db_path=db_path)
+            try:
+                record_model_run(
+                    entry.model_name,
+                    success=entry.status == "ok",
+                    latency_sec=entry.elapsed_sec,
+                    rate_limited=is_rate_limit_message(entry.error),
+                    error=entry.error,
+                    db_path=db_path,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to record health event of {entry.model_name}: {e}")
+
+    entries = [entry for entry, _ in outcomes]
+    for entry in sorted(entries, key=lambda e: -1.0 if e.accuracy_val is None else e.accuracy_val, reverse=True):
+        logger.info(
+            f"[tournament] {entry.model_name}: {entry.status} "
+            f"accuracy_val={entry.accuracy_val} ({entry.elapsed_sec:.1f}s)"
+        )
+    return entries
@@ -3,12 +3,35 @@ LangGraph node: generate summary.
 """
 
 from ..models.state import WorkflowState
-from ..services.summary_generator import fixed_summary_logic, generate_summary_with_llm
+from ..models.summary import SummaryResult
+from ..services.dataset_profiler import format_profile, profile_dataset
+from ..services.summary_cache import load_cached_summary, store_summary
+from ..services.summary_generator import generate_summary_with_llm
+from ..settings import settings
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _load_cached_summary(df) -> SummaryResult | None:
+    if settings.summary_cache_mode == "off":
+        return None
+    try:
+        return load_cached_summary(df)
+    except Exception as e:
+        logger.warning(f"Summary cache lookup failed: {e}")
+        return None
+
+
+def _store_summary(df, summary_result: SummaryResult) -> None:
+    if settings.summary_cache_mode == "off":
+        return
+    try:
+        store_summary(df, summary_result)
+    except Exception as e:
+        logger.warning(f"Failed to store summary in cache: {e}")
+
+
 def summary_chain(state: WorkflowState) -> WorkflowState:
     """
     LangGraph node for generating a dataset summary using LLM.
@@ -17,9 +40,17 @@ def summary_chain(state: WorkflowState) -> WorkflowState:
     generate_summary_with_llm service. It updates the WorkflowState
     with the summary result, status, and any encountered errors.
 
+    The dataset is profiled once (state["profile"], reused on retries); the
+    profile text is given to the LLM as dataset metadata and attached to the
+    SummaryResult.
+
+    Unless settings.summary_cache_mode is "off", a summary stored for the same
+    dataset content and prompt version is reused instead of calling the LLM,
+    and newly generated summaries are stored. Cache failures never fail the node.
+
     Requires the state to have:
         - 'df': the dataset
-        - optionally 'metadata': dataset metadata
+        - optionally 'profile': precomputed DatasetProfile
         - 'summary_errors': list of previous summary errors
         - 'training_errors': list of previous training errors
         - optional 'llm': LLM client instance
@@ -38,7 +69,6 @@ def summary_chain(state: WorkflowState) -> WorkflowState:
     state.setdefault("training_errors", [])
 
     df = state["df"]
-    metadata = "not available"  # state["metadata"]
 
     logger.info("Running summary chain...")
 
@@ -52,16 +82,24 @@ def summary_chain(state: WorkflowState) -> WorkflowState:
             training_errors_str = '\n'.join(state["training_errors"])
         else:
             training_errors_str = 'no error'
+        if state.get("profile") is None:
+            state["profile"] = profile_dataset(df)
+        profile = state["profile"]
+        metadata = format_profile(profile)
         if state.get("use_fixed_summary", False):
-            summary_result = fixed_summary_logic
+            summary_result = SummaryResult(summary_text=metadata)
         else:
-            summary_result = generate_summary_with_llm(
-                df,
-                metadata_str=metadata,
-                summary_code_error=summary_errors_str,
-                training_code_error=training_errors_str,
-                llm=state.get('llm', None),
-            )
+            summary_result = _load_cached_summary(df)
+            if summary_result is None:
+                summary_result = generate_summary_with_llm(
+                    df,
+                    metadata_str=metadata,
+                    summary_code_error=summary_errors_str,
+                    training_code_error=training_errors_str,
+                    llm=state.get('llm', None),
+                )
+                _store_summary(df, summary_result)
+        summary_result.profile = profile
         state["summary_result"] = summary_result
         state["status"] = "ok"
         state["summary_errors"] = []
@@ -2,13 +2,29 @@
 LangGraph node: generate training code and execute it.
 """
 
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from ..models.state import WorkflowState
-from ..services.training_code_generator import generate_error_fixed_training_code, generate_training_code
+from ..models.training import TrainExecutionResult
+from ..services.sandbox_executor import get_default_executor
+from ..services.training_code_generator import (
+    agenerate_training_code,
+    generate_error_fixed_training_code,
+    generate_training_code,
+)
 from ..services.training_executor import execute_training_code
+from ..utils.fileio import save_pickle
 from ..utils.logger import get_logger
+from ..utils.tracing import span
 
 logger = get_logger(__name__)
 
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
 
 def training_chain(state: WorkflowState) -> WorkflowState:
     """
@@ -42,7 +58,7 @@ def training_chain(state: WorkflowState) -> WorkflowState:
     logger.info("Generating training code with LLM...")
     try:
         code = None
-        code = generate_training_code(summary, target_column, llm=state.get("llm", None))
+        code = generate_training_code(summary.summary_text, target_column, llm=state.get("llm", None))
         result = execute_training_code(
             df=df,
             code=code,
@@ -104,3 +120,117 @@ def fix_error_training_chain(state: WorkflowState) -> WorkflowState:
         state["retry_count"] = state.get("retry_count", 0) + 1
 
     return state
+
+
+def _run_on_background_loop(coro):
+    """
+    Run a coroutine on a process-wide event loop in a daemon thread and wait for the result.
+
+    Unlike asyncio.run(), this also works when the graph is driven from a running
+    event loop (workflow.ainvoke, notebooks), and async LLM clients keep being used
+    from the same loop instead of a new loop per call. Context variables (trace,
+    log context) of the caller are propagated to the coroutine.
+    """
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="mplm-async-llm", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+async def _agenerate_candidates(summary_text: str, target_column: str, num_candidates: int, llm) -> list:
+    return await asyncio.gather(
+        *[
+            agenerate_training_code(
+                summary_text,
+                target_column,
+                candidate_index=i,
+                num_candidates=num_candidates,
+                llm=llm,
+            )
+            for i in range(num_candidates)
+        ],
+        return_exceptions=True,
+    )
+
+
+def parallel_training_chain(state: WorkflowState, num_candidates: int = 2) -> WorkflowState:
+    """
+    LangGraph node that trains `num_candidates` LLM-generated programs and keeps the best.
+
+    All candidate programs are requested from the LLM concurrently (ainvoke),
+    then executed on the sandbox worker pool (one at a time with the
+    in-process backend). The candidate with the highest accuracy_val becomes
+    state["training_result"]; every successful candidate is kept in
+    state["candidate_results"] so that all of them are recorded in the DB.
+
+    Requires the same state as training_chain.
+
+    Behavior:
+        - At least one candidate succeeded:
+            - state["training_result"] is the best candidate (its model is saved
+              to state["model_output_path"] if set)
+            - state["status"] is set to "ok"
+        - All candidates failed:
+            - state["status"] is set to "failed"
+            - the code of the last failed candidate is stored in state["previous_code"]
+            - the error message of that candidate is appended to state["training_errors"]
+            - state["retry_count"] is incremented
+    """
+    df = state["df"]
+    summary = state["summary_result"]
+    target_column = state["target_column"]
+    llm = state.get("llm", None)
+
+    logger.info(f"Generating {num_candidates} training code candidates with LLM...")
+    codes = _run_on_background_loop(_agenerate_candidates(summary.summary_text, target_column, num_candidates, llm))
+
+    executor = get_default_executor()
+    max_workers = min(executor.num_workers, num_candidates) if executor is not None else 1
+
+    def run(index, code):
+        if isinstance(code, Exception):
+            return code
+        try:
+            with span(f"candidate.{index}", kind="candidate", candidate=index):
+                return execute_training_code(df=df, code=code, executor=executor)
+        except Exception as e:
+            return e
+
+    logger.info(f"Executing {num_candidates} training code candidates...")
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # トレースのコンテキストをワーカースレッドに引き継ぐ
+        futures = [pool.submit(contextvars.copy_context().run, run, i, code) for i, code in enumerate(codes)]
+        outcomes = [future.result() for future in futures]
+
+    results: list[TrainExecutionResult] = []
+    failures: list[tuple[str | None, str]] = []
+    for i, (code, outcome) in enumerate(zip(codes, outcomes, strict=True)):
+        if isinstance(outcome, TrainExecutionResult):
+            logger.info(f"Candidate {i}: {outcome.model_name} accuracy_val={outcome.accuracy_val:.4f}")
+            results.append(outcome)
+        else:
+            logger.warning(f"Candidate {i} failed: {outcome}")
+            failures.append((code if isinstance(code, str) else None, str(outcome)))
+
+    if not results:
+        # 修正プロンプトにはコードとそのエラーの組を渡す（コードが生成できた候補を優先）
+        failed_code, failed_error = next(((c, e) for c, e in reversed(failures) if c is not None), failures[-1])
+        state["status"] = "failed"
+        state["previous_code"] = failed_code
+        state.setdefault("training_errors", []).append(failed_error)
+        state["retry_count"] = state.get("retry_count", 0) + 1
+        return state
+
+    best = max(results, key=lambda r: r.accuracy_val)
+    model_output_path = state.get("model_output_path", None)
+    if model_output_path is not None:
+        save_pickle(best.model, model_output_path)
+        best.model_path = model_output_path
+
+    state["candidate_results"] = results
+    state["training_result"] = best
+    state["status"] = "ok"
+    return state
@@ -9,3 +9,7 @@ Base = declarative_base()
 
 def init_db(engine):
     Base.metadata.create_all(bind=engine)
+    # create_all は既存テーブルに後から追加したインデックスを作らないので個別に作成する
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
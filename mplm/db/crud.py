@@ -2,10 +2,17 @@
 CRUD helper functions for database operations.
 """
 
+import json
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+
 import pandas as pd
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from .models import RunRecord
+from ..models.tracing import SpanRecord
+from .models import ModelRunEvent, ReevaluationRecord, RunRecord, RunSpan, SummaryCacheRecord
+from .rollup import update_accuracy_rollups
 from .session import get_session
 
 
@@ -39,25 +46,312 @@ def create_run_record(
         llm_name=llm_name,
     )
     db.add(record)
+    db.flush()
+    db.refresh(record)  # created_at (server default) が必要
+    update_accuracy_rollups(
+        db.connection(),
+        runs=[(record.created_at, record.llm_name, record.accuracy_val, record.accuracy_test)],
+    )
     db.commit()
     db.refresh(record)
     return record
 
 
-def get_all_records_as_df(db: Session | None = None) -> pd.DataFrame:
+# Columns needed for accuracy stats and plots (no code / summary text)
+RUN_STATS_COLUMNS = ("id", "created_at", "llm_name", "model_name", "accuracy_val", "accuracy_test")
+
+
+def query_runs_as_df(
+    db: Session,
+    *,
+    columns: Sequence[str] | None = None,
+    llm_name: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = None,
+) -> pd.DataFrame:
+    """
+    Fetch RunRecord rows as a DataFrame with a single Core SELECT (no ORM objects).
+
+    Args:
+        columns: Columns to select (e.g. RUN_STATS_COLUMNS). None → all columns.
+        llm_name: Only runs of this LLM.
+        since: Only runs created at or after this time.
+        until: Only runs created before this time.
+        after_id: Only runs with id greater than this.
+        limit: Only the `limit` most recent runs.
+
+    Returns:
+        DataFrame ordered by id (oldest first)
+    """
+    table = RunRecord.__table__
+    selected = [table.c[name] for name in columns] if columns else list(table.c)
+    query = select(*selected)
+    if llm_name is not None:
+        query = query.where(table.c.llm_name == llm_name)
+    if since is not None:
+        query = query.where(table.c.created_at >= since)
+    if until is not None:
+        query = query.where(table.c.created_at < until)
+    if after_id is not None:
+        query = query.where(table.c.id > after_id)
+    if limit is not None:
+        query = query.order_by(table.c.id.desc()).limit(limit)  # created_at と同順、主キーで引ける
+    else:
+        query = query.order_by(table.c.id)
+
+    parse_dates = ["created_at"] if any(c.name == "created_at" for c in selected) else None
+    df = pd.read_sql(query, db.connection(), parse_dates=parse_dates)
+    if limit is not None:
+        df = df.iloc[::-1].reset_index(drop=True)
+    return df
+
+
+def get_all_records_as_df(db: Session | None = None, columns: Sequence[str] | None = None) -> pd.DataFrame:
     """
     Fetch all RunRecord entries from the database and return as a pandas DataFrame.
+
+    Args:
+        columns: Columns to select. None → all columns.
     """
     if db is None:
         LocalSession = get_session()
         db = LocalSession()
 
-    records = db.query(RunRecord).all()
+    return query_runs_as_df(db, columns=columns)
 
-    # SQLAlchemyオブジェクトを辞書に変換
-    records_dicts = [r.__dict__.copy() for r in records]
-    for d in records_dicts:
-        d.pop("_sa_instance_state", None)  # 内部用属性を削除
 
-    df = pd.DataFrame(records_dicts)
-    return df
+def create_summary_cache_record(
+    db: Session,
+    *,
+    dataset_fingerprint: str,
+    prompt_version: str,
+    summary_text: str,
+    summary_code: str | None = None,
+) -> SummaryCacheRecord:
+    """
+    Insert a new SummaryCacheRecord into the database.
+    """
+    record = SummaryCacheRecord(
+        dataset_fingerprint=dataset_fingerprint,
+        prompt_version=prompt_version,
+        summary_text=summary_text,
+        summary_code=summary_code,
+        use_count=0,
+    )
+    db.add(record)
+    db.commit()
+    db.refresh(record)
+    return record
+
+
+def get_summary_cache_records(
+    db: Session,
+    *,
+    dataset_fingerprint: str,
+    prompt_version: str,
+    order_by: str = "latest",
+    limit: int = 1,
+) -> list[SummaryCacheRecord]:
+    """
+    Fetch cached summaries for a dataset / prompt version.
+
+    Args:
+        order_by: "latest" (newest first) or "best" (highest best_accuracy_val first, unscored last)
+        limit: Max number of records
+    """
+    query = db.query(SummaryCacheRecord).filter(
+        SummaryCacheRecord.dataset_fingerprint == dataset_fingerprint,
+        SummaryCacheRecord.prompt_version == prompt_version,
+    )
+    if order_by == "best":
+        query = query.order_by(
+            SummaryCacheRecord.best_accuracy_val.is_(None),
+            SummaryCacheRecord.best_accuracy_val.desc(),
+            SummaryCacheRecord.id.desc(),
+        )
+    elif order_by == "latest":
+        query = query.order_by(SummaryCacheRecord.id.desc())
+    else:
+        raise ValueError(f"Unknown order_by: {order_by}")
+    return query.limit(limit).all()
+
+
+def mark_summary_cache_used(db: Session, record_id: int) -> None:
+    """
+    Increment use_count of a cached summary.
+    """
+    db.query(SummaryCacheRecord).filter(SummaryCacheRecord.id == record_id).update(
+        {SummaryCacheRecord.use_count: SummaryCacheRecord.use_count + 1}
+    )
+    db.commit()
+
+
+def update_summary_cache_accuracy(db: Session, record_id: int, accuracy_val: float) -> None:
+    """
+    Record the validation accuracy of a run trained on a cached summary (keeps the best).
+    """
+    db.query(SummaryCacheRecord).filter(SummaryCacheRecord.id == record_id).update(
+        {
+            SummaryCacheRecord.best_accuracy_val: func.max(
+                func.coalesce(SummaryCacheRecord.best_accuracy_val, accuracy_val), accuracy_val
+            )
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def create_model_run_event(
+    db: Session,
+    *,
+    llm_name: str,
+    success: bool,
+    latency_sec: float | None = None,
+    rate_limited: bool = False,
+    error: str | None = None,
+) -> ModelRunEvent:
+    """
+    Insert a new ModelRunEvent into the database.
+    """
+    record = ModelRunEvent(
+        llm_name=llm_name,
+        success=success,
+        latency_sec=latency_sec,
+        rate_limited=rate_limited,
+        error=error,
+    )
+    db.add(record)
+    if not success:
+        db.flush()
+        db.refresh(record)
+        update_accuracy_rollups(db.connection(), failures=[(record.created_at, record.llm_name)])
+    db.commit()
+    db.refresh(record)
+    return record
+
+
+def get_model_run_events_as_df(db: Session, since: datetime | None = None) -> pd.DataFrame:
+    """
+    Fetch ModelRunEvent rows (optionally only those created at or after `since`) as a DataFrame.
+    """
+    query = db.query(
+        ModelRunEvent.llm_name,
+        ModelRunEvent.success,
+        ModelRunEvent.latency_sec,
+        ModelRunEvent.rate_limited,
+        ModelRunEvent.created_at,
+    )
+    if since is not None:
+        query = query.filter(ModelRunEvent.created_at >= since)
+    return pd.DataFrame(
+        query.all(), columns=["llm_name", "success", "latency_sec", "rate_limited", "created_at"]
+    )
+
+
+def iter_run_codes(db: Session, *, after_id: int = 0, batch_size: int = 100) -> Iterator[tuple[int, str]]:
+    """
+    Stream (id, train_code) of RunRecord rows in id order, `batch_size` rows per query.
+
+    Uses keyset pagination (id > last id), so only one page is held in memory
+    and rows inserted while iterating do not shift the pages.
+    """
+    last_id = after_id
+    while True:
+        rows = (
+            db.query(RunRecord.id, RunRecord.train_code)
+            .filter(RunRecord.id > last_id)
+            .order_by(RunRecord.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return
+        for row in rows:
+            yield row.id, row.train_code
+        last_id = rows[-1].id
+
+
+def get_reevaluated_run_ids(db: Session, batch_id: str) -> set[int]:
+    """
+    Ids of the runs that already have a ReevaluationRecord in a batch.
+    """
+    rows = db.query(ReevaluationRecord.run_id).filter(ReevaluationRecord.batch_id == batch_id).all()
+    return {row.run_id for row in rows}
+
+
+def create_reevaluation_record(
+    db: Session,
+    *,
+    batch_id: str,
+    run_id: int,
+    dataset_fingerprint: str,
+    random_seed: int | None,
+    status: str,
+    accuracy_val: float | None = None,
+    accuracy_test: float | None = None,
+    error: str | None = None,
+    elapsed_sec: float | None = None,
+) -> ReevaluationRecord:
+    """
+    Insert a new ReevaluationRecord into the database.
+    """
+    record = ReevaluationRecord(
+        batch_id=batch_id,
+        run_id=run_id,
+        dataset_fingerprint=dataset_fingerprint,
+        random_seed=random_seed,
+        status=status,
+        accuracy_val=accuracy_val,
+        accuracy_test=accuracy_test,
+        error=error,
+        elapsed_sec=elapsed_sec,
+    )
+    db.add(record)
+    db.commit()
+    db.refresh(record)
+    return record
+
+
+def create_run_spans(db: Session, *, run_id: int, spans: Iterable[SpanRecord]) -> int:
+    """
+    Insert the trace spans of a run as RunSpan rows.
+
+    Returns:
+        Number of rows inserted
+    """
+    rows = [
+        RunSpan(
+            run_id=run_id,
+            span_id=s.span_id,
+            parent_span_id=s.parent_id,
+            name=s.name,
+            kind=s.kind,
+            start_offset_sec=s.start_offset_sec,
+            wall_sec=s.wall_sec,
+            cpu_sec=s.cpu_sec,
+            peak_rss_mb=s.peak_rss_mb,
+            prompt_tokens=s.prompt_tokens,
+            completion_tokens=s.completion_tokens,
+            error=s.error,
+            attributes=json.dumps(s.attributes, ensure_ascii=False, default=str),
+        )
+        for s in spans
+    ]
+    db.add_all(rows)
+    db.commit()
+    return len(rows)
+
+
+def get_run_spans_as_df(db: Session, run_id: int | None = None) -> pd.DataFrame:
+    """
+    Fetch RunSpan rows (optionally of one run) as a DataFrame ordered by run and span id,
+    with a single Core SELECT (no ORM objects).
+    """
+    table = RunSpan.__table__
+    query = select(table)
+    if run_id is not None:
+        query = query.where(table.c.run_id == run_id)
+    query = query.order_by(table.c.run_id, table.c.span_id)
+    return pd.read_sql(query, db.connection())
@@ -0,0 +1,178 @@
+"""
+Incremental export of run records to month-partitioned gzip CSV files on GCS.
+
+Instead of rewriting one CSV with the whole history on every run
+(settings.report_export_mode == "full"), "incremental" mode keeps, under
+settings.export_gcs_prefix:
+
+- one gzip CSV file per month of created_at, named with the highest id it
+  contains (runs-2026-10-1234.csv.gz). Files are immutable: a month with new
+  rows is written as a new file and the previous one is deleted after the
+  manifest points to the new one. Only months that received rows since the
+  last export are rewritten, so a run uploads about one month of rows.
+- manifest.json: max exported id, row counts and the current file of every
+  month. The dashboard reads the manifest and fetches the partition files,
+  which can be cached forever because their names change with their content.
+
+Which rows are new is decided by id > manifest max_id. The manifest is
+uploaded with a generation precondition, so when two jobs export at the same
+time the later one re-reads the manifest and retries.
+"""
+
+import json
+import random
+import tempfile
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pandas as pd
+
+from ..settings import settings
+from ..utils.exceptions import DBPublishConflictError
+from ..utils.gcs import (
+    delete_gcs_file,
+    download_file_from_gcs,
+    download_file_from_gcs_with_generation,
+    upload_file_to_gcs,
+    upload_file_to_gcs_if_generation_match,
+)
+from ..utils.logger import get_logger
+from .crud import query_runs_as_df
+from .session import get_session
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+PARTITION_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MANIFEST_CACHE_CONTROL = "no-cache, max-age=0"
+
+
+def empty_manifest() -> dict:
+    return {"version": MANIFEST_VERSION, "max_id": 0, "rows": 0, "updated_at": None, "partitions": {}}
+
+
+def load_manifest(export_prefix: str, tmp_dir: str | Path) -> tuple[dict, int]:
+    """
+    Download the manifest of an export prefix.
+
+    Returns:
+        (manifest, generation); an empty manifest and 0 if there is none yet
+    """
+    local_path = Path(tmp_dir) / MANIFEST_NAME
+    generation = download_file_from_gcs_with_generation(export_prefix + MANIFEST_NAME, local_path)
+    if not generation:
+        return empty_manifest(), 0
+    return json.loads(local_path.read_text(encoding="utf-8")), generation
+
+
+def _month_range(key: str) -> tuple[datetime, datetime]:
+    start = datetime.strptime(key, "%Y-%m")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def _write_partition(db, key: str, path: Path) -> dict:
+    start, end = _month_range(key)
+    df = query_runs_as_df(db, since=start, until=end)
+    df.to_csv(path, index=False, compression={"method": "gzip", "mtime": 0})
+    return {"rows": len(df), "min_id": int(df["id"].min()), "max_id": int(df["id"].max())}
+
+
+def export_incremental(
+    db_path: str,
+    export_prefix: str | None = None,
+    max_attempts: int | None = None,
+) -> int:
+    """
+    Export the runs added since the last export and update the manifest.
+
+    Args:
+        db_path: Local DB holding the full history.
+        export_prefix: GCS prefix of the export. Defaults to settings.export_gcs_prefix.
+        max_attempts: Manifest upload attempts. Defaults to settings.db_publish_max_attempts.
+
+    Returns:
+        Number of new rows exported (0 if the export was already up to date)
+
+    Raises:
+        DBPublishConflictError: if the manifest kept changing during every attempt
+    """
+    from google.api_core.exceptions import PreconditionFailed
+
+    export_prefix = export_prefix or settings.export_gcs_prefix
+    max_attempts = max_attempts or settings.db_publish_max_attempts
+
+    for attempt in range(max_attempts):
+        with tempfile.TemporaryDirectory() as tmp_dir, get_session(db_path)() as db:
+            manifest, generation = load_manifest(export_prefix, tmp_dir)
+            new_rows = query_runs_as_df(db, columns=["id", "created_at"], after_id=manifest["max_id"])
+            if new_rows.empty:
+                logger.info(f"Export is up to date (max id {manifest['max_id']})")
+                return 0
+
+            partitions = dict(manifest["partitions"])
+            replaced = []
+            for key in sorted(set(new_rows["created_at"].dt.strftime("%Y-%m"))):
+                local_path = Path(tmp_dir) / f"runs-{key}.csv.gz"
+                stats = _write_partition(db, key, local_path)
+                file_name = f"runs-{key}-{stats['max_id']}.csv.gz"
+                upload_file_to_gcs(
+                    local_path,
+                    export_prefix + file_name,
+                    make_public=True,
+                    content_type="text/csv",
+                    content_encoding="gzip",
+                    cache_control=PARTITION_CACHE_CONTROL,
+                )
+                if key in partitions and partitions[key]["file"] != file_name:
+                    replaced.append(partitions[key]["file"])
+                partitions[key] = {"file": file_name, **stats}
+
+            new_manifest = {
+                "version": MANIFEST_VERSION,
+                "max_id": int(new_rows["id"].max()),
+                "rows": sum(p["rows"] for p in partitions.values()),
+                "updated_at": datetime.now(UTC).isoformat(),
+                "partitions": dict(sorted(partitions.items())),
+            }
+            manifest_path = Path(tmp_dir) / MANIFEST_NAME
+            manifest_path.write_text(json.dumps(new_manifest, indent=1), encoding="utf-8")
+            try:
+                upload_file_to_gcs_if_generation_match(
+                    manifest_path,
+                    export_prefix + MANIFEST_NAME,
+                    generation,
+                    make_public=True,
+                    cache_control=MANIFEST_CACHE_CONTROL,
+                )
+            except PreconditionFailed:
+                # 他のジョブが先に manifest を更新した → 新しい manifest を基準にやり直す
+                logger.warning(f"Export manifest changed concurrently, retrying (attempt {attempt + 1})")
+                time.sleep(settings.db_publish_backoff_sec * random.uniform(0.5, 1.5))
+                continue
+
+        for file_name in replaced:
+            delete_gcs_file(export_prefix + file_name)
+        logger.info(f"Exported {len(new_rows)} new rows to {export_prefix} (max id {new_manifest['max_id']})")
+        return len(new_rows)
+
+    raise DBPublishConflictError(f"Failed to update {export_prefix}{MANIFEST_NAME}: it kept changing")
+
+
+def read_export(export_prefix: str | None = None) -> pd.DataFrame:
+    """
+    Read every exported run back from GCS (for scripts and checks).
+    """
+    export_prefix = export_prefix or settings.export_gcs_prefix
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manifest, _ = load_manifest(export_prefix, tmp_dir)
+        frames = []
+        for partition in manifest["partitions"].values():
+            local_path = Path(tmp_dir) / partition["file"]
+            download_file_from_gcs(export_prefix + partition["file"], local_path)
+            frames.append(pd.read_csv(local_path, compression="gzip"))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -2,7 +2,7 @@
 ORM table definitions.
 """
 
-from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+from sqlalchemy import Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.sql import func
 
 from .base import Base
@@ -26,7 +26,7 @@ class RunRecord(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
-    llm_name = Column(String(255), nullable=True)
+    llm_name = Column(String(255), nullable=True, index=True)
 
     dataset_summary_code = Column(Text, nullable=True)
     dataset_summary = Column(Text, nullable=False)
@@ -38,4 +38,215 @@ class RunRecord(Base):
     accuracy_val = Column(Float, nullable=False)
     accuracy_test = Column(Float, nullable=False)
 
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+
+class SummaryCacheRecord(Base):
+    """
+    Dataset summaries memoized by dataset content and summary prompt version.
+
+    Columns:
+        id: Primary key.
+        dataset_fingerprint: Content hash of the dataset (split_cache.dataset_fingerprint).
+        prompt_version: Version of the summary prompt template (SUMMARY_PROMPT_VERSION).
+        summary_text: Generated summary text.
+        summary_code: Code that produced the summary.
+        use_count: Number of runs that reused this summary.
+        best_accuracy_val: Best validation accuracy of runs trained on this summary.
+        created_at: Timestamp when record was created.
+    """
+
+    __tablename__ = "summary_cache"
+    __table_args__ = (
+        Index("ix_summary_cache_key", "dataset_fingerprint", "prompt_version"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    dataset_fingerprint = Column(String(64), nullable=False)
+    prompt_version = Column(String(64), nullable=False)
+
+    summary_text = Column(Text, nullable=False)
+    summary_code = Column(Text, nullable=True)
+
+    use_count = Column(Integer, nullable=False, default=0)
+    best_accuracy_val = Column(Float, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class ModelRunEvent(Base):
+    """
+    Outcome of one workflow run per LLM (successful and failed), used for model health stats.
+
+    RunRecord only stores successful runs, so failures, latency and rate
+    limiting are recorded here.
+
+    Columns:
+        id: Primary key.
+        llm_name: LLM model name.
+        success: Whether the workflow finished with status "ok".
+        latency_sec: Wall-clock seconds of the workflow.
+        rate_limited: Whether the run hit a rate limit (HTTP 429).
+        error: Last error message of a failed run.
+        created_at: Timestamp when record was created.
+    """
+
+    __tablename__ = "model_run_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    llm_name = Column(String(255), nullable=False, index=True)
+    success = Column(Boolean, nullable=False)
+    latency_sec = Column(Float, nullable=True)
+    rate_limited = Column(Boolean, nullable=False, default=False)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class ReevaluationRecord(Base):
+    """
+    Accuracy of a stored run's train_code re-executed on another dataset or split seed.
+
+    Rows are written one by one as runs finish, and (batch_id, run_id) is
+    unique, so an interrupted batch resumes by skipping the runs it already has.
+
+    Columns:
+        id: Primary key.
+        batch_id: Identifier of the re-evaluation batch (dataset + seed by default).
+        run_id: Re-evaluated RunRecord.
+        dataset_fingerprint: Content hash of the dataset used.
+        random_seed: Split seed used.
+        status: "ok" or "failed".
+        accuracy_val: Validation accuracy (None if failed).
+        accuracy_test: Test accuracy (None if failed).
+        error: Error message if failed.
+        elapsed_sec: Wall-clock seconds of the execution.
+        created_at: Timestamp when record was created.
+    """
+
+    __tablename__ = "reevaluations"
+    __table_args__ = (
+        UniqueConstraint("batch_id", "run_id", name="uq_reevaluations_batch_run"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    batch_id = Column(String(255), nullable=False)
+    run_id = Column(Integer, ForeignKey("runs.id"), nullable=False, index=True)
+    dataset_fingerprint = Column(String(64), nullable=False)
+    random_seed = Column(Integer, nullable=True)
+
+    status = Column(String(16), nullable=False)
+    accuracy_val = Column(Float, nullable=True)
+    accuracy_test = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+    elapsed_sec = Column(Float, nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class RunSpan(Base):
+    """
+    Timing and resource usage of one step of the workflow run that produced a RunRecord.
+
+    Columns:
+        id: Primary key.
+        run_id: RunRecord the span belongs to.
+        span_id: Id of the span within the run's trace.
+        parent_span_id: Id of the enclosing span (None for workflow nodes).
+        name: Span name (e.g. "summary", "llm.train_code", "exec.training").
+        kind: "node", "llm", "split", "exec" or "candidate".
+        start_offset_sec: Start time relative to the start of the workflow.
+        wall_sec: Wall-clock seconds.
+        cpu_sec: CPU seconds of the process that ran the step.
+        peak_rss_mb: Peak RSS of that process in MB.
+        prompt_tokens: Prompt tokens reported by the LLM provider.
+        completion_tokens: Completion tokens reported by the LLM provider.
+        error: Error message if the step failed.
+        attributes: Extra attributes as JSON (model name, attempt, candidate index, ...).
+    """
+
+    __tablename__ = "run_spans"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    run_id = Column(Integer, ForeignKey("runs.id"), nullable=False, index=True)
+    span_id = Column(Integer, nullable=False)
+    parent_span_id = Column(Integer, nullable=True)
+    name = Column(String(255), nullable=False)
+    kind = Column(String(32), nullable=False)
+
+    start_offset_sec = Column(Float, nullable=True)
+    wall_sec = Column(Float, nullable=True)
+    cpu_sec = Column(Float, nullable=True)
+    peak_rss_mb = Column(Float, nullable=True)
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    attributes = Column(Text, nullable=True)
+
+
+class AppliedSegment(Base):
+    """
+    Segment files (see segment_sync.py) already merged into this DB.
+
+    Columns:
+        name: Segment file name.
+        rows: Number of rows inserted from the segment.
+        applied_at: Timestamp when the segment was applied.
+    """
+
+    __tablename__ = "applied_segments"
+
+    name = Column(String(255), primary_key=True)
+    rows = Column(Integer, nullable=False, default=0)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class AccuracyRollup(Base):
+    """
+    Accuracy statistics of the runs of one LLM on one day, maintained on insert (see rollup.py).
+
+    Sums (not means) are stored so that adding a run only updates one row;
+    quantiles are read from fixed-width histograms of ROLLUP_HIST_BINS bins over [0, 1].
+
+    Columns:
+        id: Primary key.
+        day: UTC date of created_at.
+        llm_name: LLM model name ("unknown" if not recorded).
+        run_count: Number of RunRecords.
+        failure_count: Number of failed workflow runs (ModelRunEvent.success == False).
+        val_sum / val_sum_sq / val_min / val_max: Sum, sum of squares, min and max of accuracy_val.
+        val_hist: Histogram of accuracy_val as a JSON list of bin counts.
+        test_sum / test_sum_sq / test_min / test_max / test_hist: Same for accuracy_test.
+        updated_at: Timestamp of the last update.
+    """
+
+    __tablename__ = "accuracy_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "llm_name", name="uq_accuracy_rollups_day_llm"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    day = Column(Date, nullable=False)
+    llm_name = Column(String(255), nullable=False)
+
+    run_count = Column(Integer, nullable=False, default=0)
+    failure_count = Column(Integer, nullable=False, default=0)
+
+    val_sum = Column(Float, nullable=False, default=0.0)
+    val_sum_sq = Column(Float, nullable=False, default=0.0)
+    val_min = Column(Float, nullable=True)
+    val_max = Column(Float, nullable=True)
+    val_hist = Column(Text, nullable=True)
+
+    test_sum = Column(Float, nullable=False, default=0.0)
+    test_sum_sq = Column(Float, nullable=False, default=0.0)
+    test_min = Column(Float, nullable=True)
+    test_max = Column(Float, nullable=True)
+    test_hist = Column(Text, nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
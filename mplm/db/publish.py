@@ -0,0 +1,110 @@
+"""
+Publication of the whole SQLite DB file to GCS with optimistic concurrency.
+
+The generation of the DB object is read together with the download, and
+the upload is conditional on that generation (if_generation_match). When
+another job published in between, the upload fails with HTTP 412; the rows
+this job added (ids above the watermarks taken after the download) are then
+merged into the latest remote DB, and the merged file is uploaded against
+the new generation. Parallel jobs therefore never overwrite each other's
+RunRecords.
+"""
+
+import os
+import random
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from ..settings import settings
+from ..utils.exceptions import DBPublishConflictError
+from ..utils.gcs import download_file_from_gcs_with_generation, upload_file_to_gcs_if_generation_match
+from ..utils.logger import get_logger
+from .segment_sync import apply_segment, export_segment
+
+logger = get_logger(__name__)
+
+
+def download_db_with_generation(local_db_path: str | None = None, gcs_db_path: str | None = None) -> int:
+    """
+    Download the DB file from GCS (if it exists) and return its generation.
+
+    Returns:
+        Generation of the downloaded DB, or 0 if there is no DB on GCS (the local file is kept)
+    """
+    local_db_path = local_db_path or settings.db_file
+    gcs_db_path = gcs_db_path or settings.db_file_gcs
+    Path(local_db_path).parent.mkdir(parents=True, exist_ok=True)
+    generation = download_file_from_gcs_with_generation(gcs_db_path, local_db_path)
+    if generation:
+        logger.info(f"Downloaded {gcs_db_path} (generation {generation})")
+    else:
+        logger.info(f"{gcs_db_path} does not exist yet")
+    return generation
+
+
+def publish_db(
+    local_db_path: str,
+    gcs_db_path: str,
+    generation: int,
+    watermarks: dict[str, int],
+    max_attempts: int | None = None,
+    backoff_sec: float | None = None,
+) -> int:
+    """
+    Upload the local DB if the GCS object is still at `generation`, merging and retrying on conflict.
+
+    Args:
+        local_db_path: Local DB file. Replaced by the merged DB after a conflict.
+        gcs_db_path: GCS DB file.
+        generation: Generation the local DB was downloaded at (0 → did not exist).
+        watermarks: Row ids at download time (segment_sync.get_watermarks);
+            rows above them are this job's rows and are merged on conflict.
+        max_attempts: Max upload attempts. Defaults to settings.db_publish_max_attempts.
+        backoff_sec: Base wait between attempts (jittered). Defaults to settings.db_publish_backoff_sec.
+
+    Returns:
+        Generation of the published DB
+
+    Raises:
+        DBPublishConflictError: if every attempt hit a conflict
+    """
+    from google.api_core.exceptions import PreconditionFailed
+
+    max_attempts = max_attempts or settings.db_publish_max_attempts
+    backoff_sec = settings.db_publish_backoff_sec if backoff_sec is None else backoff_sec
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        segment_name = f"publish-{uuid.uuid4().hex}.jsonl"
+        segment_path = Path(tmp_dir) / segment_name
+        new_rows = None
+
+        for attempt in range(max_attempts):
+            try:
+                new_generation = upload_file_to_gcs_if_generation_match(local_db_path, gcs_db_path, generation)
+                logger.info(f"Published {gcs_db_path} (generation {generation} → {new_generation})")
+                return new_generation
+            except PreconditionFailed:
+                logger.warning(f"{gcs_db_path} changed since generation {generation}, merging (attempt {attempt + 1})")
+
+            if new_rows is None:
+                # この実行で追加した行（ダウンロード時の watermark より後）を一度だけ書き出しておく
+                new_rows = export_segment(local_db_path, watermarks, segment_path)
+
+            merged_path = Path(tmp_dir) / "merged.db"
+            merged_path.unlink(missing_ok=True)
+            try:
+                generation = download_file_from_gcs_with_generation(gcs_db_path, merged_path)
+            except PreconditionFailed:
+                # ダウンロード中にさらに上書きされた → 次の試行で取り直す
+                time.sleep(backoff_sec * random.uniform(0.5, 1.5))
+                continue
+            if generation:
+                if new_rows:
+                    apply_segment(str(merged_path), segment_path, name=segment_name)
+                os.replace(merged_path, local_db_path)
+            # generation 0: 削除されていた → ローカルの DB をそのまま新規作成として送る
+            time.sleep(backoff_sec * random.uniform(0.5, 1.5))
+
+    raise DBPublishConflictError(f"Failed to publish {gcs_db_path}: it kept changing during {max_attempts} attempts")
@@ -0,0 +1,183 @@
+"""
+Per-day, per-LLM accuracy statistics (accuracy_rollups) maintained on insert.
+
+create_run_record / create_model_run_event and segment_sync.apply_segment add
+each new run or failure to its (day, llm_name) rollup row in the same
+transaction as the insert, so plots, the stats CSV and the dashboard read a
+table whose size depends on the number of days and LLMs, not on the number
+of runs. Quantiles are estimated from fixed-width histograms (error at most
+one bin width, 1 / ROLLUP_HIST_BINS).
+
+ensure_accuracy_rollups() rebuilds the table from runs and model_run_events
+when they disagree (DB files written before the table existed).
+"""
+
+import json
+import math
+from collections.abc import Iterable
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+
+from ..utils.logger import get_logger
+from .models import AccuracyRollup, ModelRunEvent, RunRecord
+
+logger = get_logger(__name__)
+
+ROLLUP_HIST_BINS = 100
+UNKNOWN_LLM = "unknown"
+
+_METRICS = ("val", "test")
+
+
+def _day(created_at: datetime | date | str) -> date:
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return created_at.date() if isinstance(created_at, datetime) else created_at
+
+
+def _bin(value: float) -> int:
+    return min(max(int(value * ROLLUP_HIST_BINS), 0), ROLLUP_HIST_BINS - 1)
+
+
+def _empty_stats(day: date, llm_name: str) -> dict:
+    stats = {"day": day, "llm_name": llm_name, "run_count": 0, "failure_count": 0}
+    for m in _METRICS:
+        stats.update({f"{m}_sum": 0.0, f"{m}_sum_sq": 0.0, f"{m}_min": None, f"{m}_max": None, f"{m}_hist": None})
+    return stats
+
+
+def _add_run(stats: dict, accuracy_val: float, accuracy_test: float) -> None:
+    stats["run_count"] += 1
+    for m, value in zip(_METRICS, (accuracy_val, accuracy_test), strict=True):
+        stats[f"{m}_sum"] += value
+        stats[f"{m}_sum_sq"] += value * value
+        stats[f"{m}_min"] = value if stats[f"{m}_min"] is None else min(stats[f"{m}_min"], value)
+        stats[f"{m}_max"] = value if stats[f"{m}_max"] is None else max(stats[f"{m}_max"], value)
+        hist = json.loads(stats[f"{m}_hist"]) if stats[f"{m}_hist"] else [0] * ROLLUP_HIST_BINS
+        hist[_bin(value)] += 1
+        stats[f"{m}_hist"] = json.dumps(hist)
+
+
+def update_accuracy_rollups(
+    conn: Connection,
+    runs: Iterable[tuple] = (),
+    failures: Iterable[tuple] = (),
+) -> None:
+    """
+    Add runs and failed workflow runs to their rollup rows (in the caller's transaction).
+
+    Args:
+        conn: Connection of the transaction that inserted the rows (Session.connection()).
+        runs: (created_at, llm_name, accuracy_val, accuracy_test) of new RunRecords.
+        failures: (created_at, llm_name) of new failed ModelRunEvents.
+    """
+    table = AccuracyRollup.__table__
+    pending: dict[tuple[date, str], dict] = {}
+
+    def stats_for(created_at, llm_name) -> dict:
+        key = (_day(created_at), llm_name or UNKNOWN_LLM)
+        if key not in pending:
+            row = conn.execute(select(table).where(table.c.day == key[0], table.c.llm_name == key[1])).mappings().first()
+            pending[key] = dict(row) if row is not None else _empty_stats(*key)
+        return pending[key]
+
+    for created_at, llm_name, accuracy_val, accuracy_test in runs:
+        _add_run(stats_for(created_at, llm_name), accuracy_val, accuracy_test)
+    for created_at, llm_name in failures:
+        stats_for(created_at, llm_name)["failure_count"] += 1
+
+    for stats in pending.values():
+        row_id = stats.pop("id", None)
+        stats.pop("updated_at", None)
+        if row_id is None:
+            conn.execute(insert(table).values(**stats))
+        else:
+            conn.execute(update(table).where(table.c.id == row_id).values(**stats))
+
+
+def rebuild_accuracy_rollups(conn: Connection) -> None:
+    """Recompute every rollup row from runs and model_run_events."""
+    conn.execute(delete(AccuracyRollup.__table__))
+    runs = conn.execute(
+        select(RunRecord.created_at, RunRecord.llm_name, RunRecord.accuracy_val, RunRecord.accuracy_test)
+    ).all()
+    failures = conn.execute(
+        select(ModelRunEvent.created_at, ModelRunEvent.llm_name).where(ModelRunEvent.success.is_(False))
+    ).all()
+    update_accuracy_rollups(conn, runs=runs, failures=failures)
+    logger.info(f"Rebuilt accuracy rollups from {len(runs)} runs and {len(failures)} failures")
+
+
+def ensure_accuracy_rollups(conn: Connection) -> bool:
+    """
+    Rebuild the rollups if their counts do not match runs / model_run_events.
+
+    Returns:
+        True if the rollups were rebuilt
+    """
+    rollup_runs, rollup_failures = conn.execute(
+        select(
+            func.coalesce(func.sum(AccuracyRollup.run_count), 0),
+            func.coalesce(func.sum(AccuracyRollup.failure_count), 0),
+        )
+    ).one()
+    runs = conn.scalar(select(func.count()).select_from(RunRecord))
+    failures = conn.scalar(select(func.count()).select_from(ModelRunEvent).where(ModelRunEvent.success.is_(False)))
+    if (rollup_runs, rollup_failures) == (runs, failures):
+        return False
+    rebuild_accuracy_rollups(conn)
+    return True
+
+
+def histogram_quantile(hist: list[int], q: float) -> float | None:
+    """
+    Estimate the q-quantile of values binned into fixed-width bins over [0, 1].
+    """
+    total = sum(hist)
+    if not total:
+        return None
+    target = q * total
+    cumulative = 0
+    for i, count in enumerate(hist):
+        if count and cumulative + count >= target:
+            return (i + (target - cumulative) / count) / len(hist)
+        cumulative += count
+    return 1.0
+
+
+def get_accuracy_rollups_as_df(conn: Connection, quantiles: tuple[float, ...] = (0.1, 0.5, 0.9)) -> pd.DataFrame:
+    """
+    Rollup rows as a DataFrame ordered by day and llm_name.
+
+    Returns:
+        Columns: day, llm_name, run_count, failure_count and, for val / test,
+        {m}_mean, {m}_std, {m}_min, {m}_max, {m}_p{q*100} and {m}_hist (list of bin counts)
+    """
+    rows = conn.execute(select(AccuracyRollup.__table__).order_by(AccuracyRollup.day, AccuracyRollup.llm_name)).mappings()
+    records = []
+    for row in rows:
+        record = {"day": row["day"], "llm_name": row["llm_name"], "run_count": row["run_count"], "failure_count": row["failure_count"]}
+        n = row["run_count"]
+        for m in _METRICS:
+            hist = json.loads(row[f"{m}_hist"]) if row[f"{m}_hist"] else [0] * ROLLUP_HIST_BINS
+            mean = row[f"{m}_sum"] / n if n else None
+            record[f"{m}_mean"] = mean
+            record[f"{m}_std"] = math.sqrt(max(row[f"{m}_sum_sq"] / n - mean * mean, 0.0)) if n else None
+            record[f"{m}_min"] = row[f"{m}_min"]
+            record[f"{m}_max"] = row[f"{m}_max"]
+            for q in quantiles:
+                value = histogram_quantile(hist, q)
+                # ビン内の推定値が実際の最小・最大を超えないようにする
+                if value is not None:
+                    value = float(np.clip(value, row[f"{m}_min"], row[f"{m}_max"]))
+                record[f"{m}_p{round(q * 100)}"] = value
+            record[f"{m}_hist"] = hist
+        records.append(record)
+    df = pd.DataFrame(records)
+    if not df.empty:
+        df["day"] = pd.to_datetime(df["day"])
+    return df
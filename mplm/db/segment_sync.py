@@ -0,0 +1,333 @@
+"""
+Incremental persistence of the SQLite DB to GCS as append-only segment files.
+
+Instead of downloading and re-uploading the whole DB file on every run
+(settings.db_sync_mode == "full"), a run in "segments" mode:
+
+1. records the highest row id of every synced table at startup (watermarks);
+   the DB history is only downloaded when a feature needs it
+   (see needs_history());
+2. writes the rows created during the run to one JSONL segment file
+   (one {"table": ..., "row": ...} object per line) and uploads it under
+   settings.db_segments_gcs with a unique name, so concurrent jobs never
+   write the same object;
+3. every settings.db_compact_every segments, compacts: the base DB file is
+   downloaded, pending segments are applied in name order, the base is
+   uploaded and the applied segments are deleted. The upload is conditional
+   on the generation that was downloaded, so two jobs compacting at the same
+   time cannot overwrite each other; the loser starts over from the new base.
+
+Row ids are local to the DB that created them, so applying a segment
+inserts rows with new ids and remaps foreign keys (run_spans.run_id, ...)
+that point to rows of the same segment. Applied segment names are stored in
+the applied_segments table, which makes applying a segment twice a no-op.
+
+The accuracy_rollups of the target DB are updated with the inserted runs
+and failures (rollups themselves are not synced).
+
+Only inserts are synced: updates of existing rows (e.g. summary_cache
+use_count / best_accuracy_val of a summary written by an earlier run) stay
+in the local DB of the run that made them.
+"""
+
+import json
+import random
+import tempfile
+import time
+import uuid
+from datetime import UTC, date, datetime
+from pathlib import Path
+
+from sqlalchemy import DateTime, func, insert, select
+
+from ..settings import settings
+from ..utils.exceptions import DBPublishConflictError
+from ..utils.gcs import (
+    delete_gcs_file,
+    download_file_from_gcs,
+    download_file_from_gcs_with_generation,
+    gcs_exists,
+    list_gcs_files,
+    upload_file_to_gcs,
+    upload_file_to_gcs_if_generation_match,
+)
+from ..utils.logger import get_logger
+from .base import Base, init_db
+from .models import AppliedSegment
+from .rollup import update_accuracy_rollups
+from .session import get_engine
+
+logger = get_logger(__name__)
+
+# Insert order: referenced tables first
+SYNC_TABLES = ("runs", "summary_cache", "model_run_events", "run_spans", "reevaluations")
+SEGMENT_SUFFIX = ".jsonl"
+
+
+def _tables():
+    return [Base.metadata.tables[name] for name in SYNC_TABLES]
+
+
+def _to_json(value):
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    return value
+
+
+def get_watermarks(db_path: str) -> dict[str, int]:
+    """
+    Highest row id of every synced table (0 for empty tables).
+    """
+    engine = get_engine(db_path)
+    init_db(engine)
+    with engine.connect() as conn:
+        return {table.name: conn.scalar(select(func.coalesce(func.max(table.c.id), 0))) for table in _tables()}
+
+
+def export_segment(db_path: str, watermarks: dict[str, int], segment_path: str | Path) -> int:
+    """
+    Write rows with ids above the watermarks to a JSONL segment file.
+
+    Returns:
+        Number of rows written (the file is not created when there are none)
+    """
+    engine = get_engine(db_path)
+    lines = []
+    with engine.connect() as conn:
+        for table in _tables():
+            query = select(table).where(table.c.id > watermarks.get(table.name, 0)).order_by(table.c.id)
+            for row in conn.execute(query).mappings():
+                lines.append(json.dumps({"table": table.name, "row": {k: _to_json(v) for k, v in row.items()}}, ensure_ascii=False))
+    if lines:
+        Path(segment_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(segment_path).write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return len(lines)
+
+
+def _from_json(table, row: dict) -> dict:
+    values = {}
+    for column in table.columns:
+        if column.name not in row:
+            continue
+        value = row[column.name]
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        values[column.name] = value
+    return values
+
+
+def apply_segment(db_path: str, segment_path: str | Path, name: str | None = None) -> int:
+    """
+    Insert the rows of a segment file into a DB (once per segment name).
+
+    Rows get new ids; foreign keys pointing to rows of the same segment are
+    remapped, others (rows that already existed when the segment was written)
+    are kept as is.
+
+    Returns:
+        Number of inserted rows (0 if the segment was already applied)
+    """
+    name = name or Path(segment_path).name
+    engine = get_engine(db_path)
+    init_db(engine)
+    tables = {table.name: table for table in _tables()}
+
+    rows_by_table: dict[str, list[dict]] = {table: [] for table in SYNC_TABLES}
+    with open(segment_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                rows_by_table[entry["table"]].append(entry["row"])
+
+    inserted = 0
+    rollup_runs, rollup_failures = [], []
+    with engine.begin() as conn:
+        if conn.scalar(select(AppliedSegment.name).where(AppliedSegment.name == name)) is not None:
+            logger.info(f"Segment {name} already applied, skipping")
+            return 0
+
+        id_maps: dict[str, dict[int, int]] = {}
+        for table_name in SYNC_TABLES:
+            table = tables[table_name]
+            foreign_keys = {
+                column.name: fk.column.table.name for column in table.columns for fk in column.foreign_keys
+            }
+            id_map = id_maps.setdefault(table_name, {})
+            for row in rows_by_table[table_name]:
+                values = _from_json(table, row)
+                old_id = values.pop("id", None)
+                for column_name, referenced in foreign_keys.items():
+                    ref_map = id_maps.get(referenced, {})
+                    if values.get(column_name) in ref_map:
+                        values[column_name] = ref_map[values[column_name]]
+                new_id = conn.execute(insert(table).values(**values)).inserted_primary_key[0]
+                if old_id is not None:
+                    id_map[old_id] = new_id
+                inserted += 1
+                if table_name == "runs":
+                    rollup_runs.append((values["created_at"], values.get("llm_name"), values["accuracy_val"], values["accuracy_test"]))
+                elif table_name == "model_run_events" and not values["success"]:
+                    rollup_failures.append((values["created_at"], values["llm_name"]))
+
+        update_accuracy_rollups(conn, runs=rollup_runs, failures=rollup_failures)
+        conn.execute(insert(AppliedSegment.__table__).values(name=name, rows=inserted))
+    logger.info(f"Applied segment {name} ({inserted} rows)")
+    return inserted
+
+
+def mark_segment_applied(db_path: str, name: str, rows: int = 0) -> None:
+    """Record a segment whose rows are already in the DB (e.g. exported from it)."""
+    engine = get_engine(db_path)
+    init_db(engine)
+    with engine.begin() as conn:
+        if conn.scalar(select(AppliedSegment.name).where(AppliedSegment.name == name)) is None:
+            conn.execute(insert(AppliedSegment.__table__).values(name=name, rows=rows))
+
+
+def get_applied_segments(db_path: str) -> set[str]:
+    engine = get_engine(db_path)
+    init_db(engine)
+    with engine.connect() as conn:
+        return set(conn.scalars(select(AppliedSegment.name)))
+
+
+def new_segment_name() -> str:
+    """Unique, time-ordered segment file name."""
+    return f"{datetime.now(UTC):%Y%m%dT%H%M%S%fZ}-{uuid.uuid4().hex[:8]}{SEGMENT_SUFFIX}"
+
+
+def list_segments(segments_prefix: str | None = None) -> list[str]:
+    """GCS paths of the pending segment files, oldest first."""
+    segments_prefix = segments_prefix or settings.db_segments_gcs
+    return [path for path in list_gcs_files(segments_prefix) if path.endswith(SEGMENT_SUFFIX)]
+
+
+def needs_history() -> bool:
+    """
+    Whether this run reads rows written by earlier runs, so the DB history must be loaded at startup.
+
+    That is the case when the summary cache is on, and when models are selected by
+    their health stats (model_run_events of earlier runs, model_health_window_days > 0).
+    """
+    return (
+        settings.db_load_history
+        or settings.summary_cache_mode != "off"
+        or settings.model_health_window_days > 0
+    )
+
+
+def load_history(
+    local_db_path: str | None = None,
+    gcs_db_path: str | None = None,
+    segments_prefix: str | None = None,
+) -> int:
+    """
+    Build the local DB from the base DB file and all pending segments on GCS.
+
+    Returns:
+        Number of segments applied
+    """
+    local_db_path = local_db_path or settings.db_file
+    gcs_db_path = gcs_db_path or settings.db_file_gcs
+
+    Path(local_db_path).parent.mkdir(parents=True, exist_ok=True)
+    if gcs_exists(gcs_db_path):
+        download_file_from_gcs(gcs_db_path, local_db_path)
+    else:
+        Path(local_db_path).unlink(missing_ok=True)
+    return _apply_pending_segments(local_db_path, list_segments(segments_prefix))
+
+
+def _apply_pending_segments(db_path: str, segment_paths: list[str]) -> int:
+    applied = get_applied_segments(db_path)
+    count = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for gcs_path in segment_paths:
+            name = gcs_path.rsplit("/", 1)[-1]
+            if name in applied:
+                continue
+            local_path = download_file_from_gcs(gcs_path, Path(tmp_dir) / name)
+            apply_segment(db_path, local_path, name=name)
+            count += 1
+    return count
+
+
+def publish_segment(
+    local_db_path: str,
+    watermarks: dict[str, int],
+    segments_prefix: str | None = None,
+) -> str | None:
+    """
+    Upload the rows created since `watermarks` as a new segment file.
+
+    The segment is also marked as applied in the local DB, so compacting from
+    that DB does not insert its rows a second time.
+
+    Returns:
+        GCS path of the segment, or None if there were no new rows
+    """
+    segments_prefix = segments_prefix or settings.db_segments_gcs
+    name = new_segment_name()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        local_path = Path(tmp_dir) / name
+        rows = export_segment(local_db_path, watermarks, local_path)
+        if rows == 0:
+            logger.info("No new rows to publish.")
+            return None
+        gcs_path = upload_file_to_gcs(local_path, segments_prefix + name)
+    mark_segment_applied(local_db_path, name, rows)
+    logger.info(f"Published {rows} rows as {gcs_path}")
+    return gcs_path
+
+
+def compact_segments(
+    work_db_path: str,
+    gcs_db_path: str | None = None,
+    segments_prefix: str | None = None,
+    min_segments: int | None = None,
+) -> bool:
+    """
+    Merge pending segments into the base DB file on GCS and delete them.
+
+    Args:
+        work_db_path: Local file used to build the compacted DB (overwritten).
+        gcs_db_path: Base DB file. Defaults to settings.db_file_gcs.
+        segments_prefix: Segment prefix. Defaults to settings.db_segments_gcs.
+        min_segments: Do nothing while fewer segments are pending.
+            Defaults to settings.db_compact_every.
+
+    Returns:
+        True if the base DB was rewritten (work_db_path then holds the full DB)
+    """
+    from google.api_core.exceptions import NotFound, PreconditionFailed
+
+    gcs_db_path = gcs_db_path or settings.db_file_gcs
+    min_segments = settings.db_compact_every if min_segments is None else min_segments
+
+    segments = list_segments(segments_prefix)
+    if not segments or len(segments) < min_segments:
+        logger.info(f"{len(segments)} pending segments, compaction not needed yet")
+        return False
+
+    Path(work_db_path).parent.mkdir(parents=True, exist_ok=True)
+    for attempt in range(settings.db_publish_max_attempts):
+        Path(work_db_path).unlink(missing_ok=True)
+        generation = download_file_from_gcs_with_generation(gcs_db_path, work_db_path)
+        try:
+            # 別のジョブが先に統合して削除したセグメントは NotFound になるが、新しい base には含まれている
+            applied = _apply_pending_segments(work_db_path, segments)
+            upload_file_to_gcs_if_generation_match(work_db_path, gcs_db_path, generation)
+            break
+        except (PreconditionFailed, NotFound):
+            logger.warning(f"{gcs_db_path} changed during compaction, retrying (attempt {attempt + 1})")
+            time.sleep(settings.db_publish_backoff_sec * random.uniform(0.5, 1.5))
+    else:
+        raise DBPublishConflictError(f"Failed to compact into {gcs_db_path}: it kept changing")
+
+    # base に取り込まれたことを確認できたセグメントだけ削除する
+    merged = get_applied_segments(work_db_path)
+    for gcs_path in segments:
+        if gcs_path.rsplit("/", 1)[-1] in merged:
+            delete_gcs_file(gcs_path)
+    logger.info(f"Compacted {applied} segments into {gcs_db_path}")
+    return True
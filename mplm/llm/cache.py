@@ -0,0 +1,329 @@
+"""
+Persistent prompt → response cache for LLM clients.
+
+Responses are stored in a dedicated SQLite file (settings.llm_cache_file),
+keyed on a hash of (model name, temperature, prompt). Entries expire after
+settings.llm_cache_ttl_sec, and the least recently used entries are evicted
+once the cache holds more than settings.llm_cache_max_entries rows.
+
+Only calls whose temperature is at most settings.llm_cache_max_temperature
+are cached: sampling at higher temperatures is intentionally random, and
+replaying it would silently remove that randomness.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from sqlalchemy import Column, Float, Integer, String, Text, create_engine, delete, func, select
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from ..settings import settings
+from ..utils.logger import get_logger
+from .rate_limit import RateLimitedLLM, answered_model_name
+
+logger = get_logger(__name__)
+
+# The cache lives in its own file, so it must not share metadata with the run DB.
+CacheBase = declarative_base()
+
+
+class LLMCacheEntry(CacheBase):
+    """
+    Cached LLM response.
+
+    Columns:
+        key: sha256 of (model, temperature, prompt).
+        model: Model name.
+        temperature: Sampling temperature (None → provider default).
+        kind: "text" (plain str response) or "message" (LangChain message).
+        response: Serialized response.
+        created_at: Unix time the entry was written.
+        last_used_at: Unix time of the last cache hit (LRU order).
+        hits: Number of cache hits.
+    """
+
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    temperature = Column(Float, nullable=True)
+    kind = Column(String(16), nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(Float, nullable=False)
+    last_used_at = Column(Float, nullable=False, index=True)
+    hits = Column(Integer, nullable=False, default=0)
+
+
+def prompt_to_text(prompt: Any) -> str:
+    """
+    Canonical text of an LLM input (str, PromptValue or list of messages) used for hashing.
+    """
+    if isinstance(prompt, str):
+        return prompt
+    if hasattr(prompt, "to_messages"):
+        prompt = prompt.to_messages()
+    if isinstance(prompt, list | tuple) and all(isinstance(m, BaseMessage) for m in prompt):
+        return json.dumps([[m.type, m.content] for m in prompt], ensure_ascii=False)
+    return repr(prompt)
+
+
+def make_cache_key(model: str, temperature: float | None, prompt: Any) -> str:
+    payload = json.dumps([model, temperature, prompt_to_text(prompt)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _serialize(response: Any) -> tuple[str, str]:
+    if isinstance(response, str):
+        return "text", response
+    if isinstance(response, BaseMessage):
+        return "message", json.dumps(messages_to_dict([response]), ensure_ascii=False)
+    raise TypeError(f"Unsupported LLM response type: {type(response).__name__}")
+
+
+def _join_chunks(chunks: list) -> Any:
+    if all(isinstance(c, str) for c in chunks):
+        return "".join(chunks)
+    merged = chunks[0]
+    for chunk in chunks[1:]:
+        merged = merged + chunk
+    return merged
+
+
+def _deserialize(kind: str, data: str) -> Any:
+    if kind == "text":
+        return data
+    return messages_from_dict(json.loads(data))[0]
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response store with TTL expiry and LRU eviction.
+
+    Args:
+        path: SQLite file.
+        ttl_sec: Entry lifetime in seconds (None → never expire).
+        max_entries: Max number of rows kept (None → unbounded).
+    """
+
+    def __init__(self, path: str, ttl_sec: float | None = None, max_entries: int | None = None):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._engine = create_engine(f"sqlite:///{path}", echo=False, future=True)
+        CacheBase.metadata.create_all(bind=self._engine)
+        self._Session = sessionmaker(bind=self._engine, autoflush=False, autocommit=False)
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached response, or None on miss / expired entry."""
+        now = time.time()
+        with self._Session() as db:
+            entry = db.get(LLMCacheEntry, key)
+            if entry is None:
+                return None
+            if self.ttl_sec is not None and entry.created_at + self.ttl_sec < now:
+                db.delete(entry)
+                db.commit()
+                return None
+            entry.last_used_at = now
+            entry.hits += 1
+            db.commit()
+            return _deserialize(entry.kind, entry.response)
+
+    def put(self, key: str, response: Any, model: str, temperature: float | None) -> None:
+        """Store a response and apply TTL / size eviction."""
+        kind, data = _serialize(response)
+        now = time.time()
+        with self._Session() as db:
+            db.merge(
+                LLMCacheEntry(
+                    key=key,
+                    model=model,
+                    temperature=temperature,
+                    kind=kind,
+                    response=data,
+                    created_at=now,
+                    last_used_at=now,
+                    hits=0,
+                )
+            )
+            db.flush()
+            if self.ttl_sec is not None:
+                db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.created_at < now - self.ttl_sec))
+            if self.max_entries is not None:
+                count = db.scalar(select(func.count()).select_from(LLMCacheEntry))
+                if count > self.max_entries:
+                    oldest = (
+                        select(LLMCacheEntry.key)
+                        .order_by(LLMCacheEntry.last_used_at)
+                        .limit(count - self.max_entries)
+                    )
+                    db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(oldest)))
+            db.commit()
+
+    def clear(self) -> None:
+        with self._Session() as db:
+            db.execute(delete(LLMCacheEntry))
+            db.commit()
+
+
+class CachedLLM:
+    """
+    Wrapper around a LangChain LLM whose invoke()/ainvoke() consult an LLMResponseCache.
+
+    stream()/astream() replay a cached response as a single chunk. A streamed
+    response is stored when the stream ends, or with the part received so far
+    when the consumer closes it early (e.g. once a complete code block has
+    arrived); streams that fail are not stored.
+    Every other attribute (model, model_name, ...) is delegated to the wrapped LLM.
+    A response given by a fallback model of a wrapped RateLimitedLLM is stored
+    under that model's key, not under `model_name`.
+    Calls with extra invoke arguments (config, stop, ...) or a temperature above
+    `max_temperature` bypass the cache.
+
+    Args:
+        llm: Wrapped LLM client.
+        cache: LLMResponseCache
+        model_name: Model name used in the cache key.
+        temperature: Temperature used in the cache key.
+        max_temperature: Highest temperature that is cached (None → cache every call).
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        cache: LLMResponseCache,
+        model_name: str,
+        temperature: float | None,
+        max_temperature: float | None = 0.0,
+    ):
+        self.llm = llm
+        self.cache = cache
+        self.model_name_key = model_name
+        self.temperature_key = temperature
+        self.cacheable = max_temperature is None or (temperature is not None and temperature <= max_temperature)
+
+    def __getattr__(self, name: str):
+        return getattr(self.llm, name)
+
+    def _key(self, prompt: Any, args: tuple, kwargs: dict) -> str | None:
+        if not self.cacheable or args or kwargs:
+            return None
+        return make_cache_key(self.model_name_key, self.temperature_key, prompt)
+
+    def _lookup(self, key: str | None) -> Any | None:
+        if key is None:
+            return None
+        try:
+            return self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            return None
+
+    def _answered_model(self) -> str:
+        if isinstance(self.llm, RateLimitedLLM):
+            return answered_model_name() or self.model_name_key
+        return self.model_name_key
+
+    def _store(self, key: str | None, prompt: Any, response: Any) -> None:
+        if key is None:
+            return
+        model = self._answered_model()
+        if model != self.model_name_key:
+            # フェイルオーバーで別のモデルが答えた → そのモデルの応答として保存する
+            key = make_cache_key(model, self.temperature_key, prompt)
+        try:
+            self.cache.put(key, response, model, self.temperature_key)
+        except Exception as e:
+            logger.warning(f"Failed to store LLM response in cache: {e}")
+
+    def invoke(self, prompt: Any, *args, **kwargs) -> Any:
+        key = self._key(prompt, args, kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            logger.info(f"LLM cache hit ({self.model_name_key})")
+            return cached
+        response = self.llm.invoke(prompt, *args, **kwargs)
+        self._store(key, prompt, response)
+        return response
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs) -> Any:
+        key = self._key(prompt, args, kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            logger.info(f"LLM cache hit ({self.model_name_key})")
+            return cached
+        response = await self.llm.ainvoke(prompt, *args, **kwargs)
+        self._store(key, prompt, response)
+        return response
+
+    def stream(self, prompt: Any, *args, **kwargs) -> Iterator[Any]:
+        key = self._key(prompt, args, kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            logger.info(f"LLM cache hit ({self.model_name_key})")
+            yield cached
+            return
+        chunks = []
+        try:
+            for chunk in self.llm.stream(prompt, *args, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            # 呼び出し側が必要な部分を受信して打ち切った
+            if chunks:
+                self._store(key, prompt, _join_chunks(chunks))
+            raise
+        if chunks:
+            self._store(key, prompt, _join_chunks(chunks))
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[Any]:
+        key = self._key(prompt, args, kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            logger.info(f"LLM cache hit ({self.model_name_key})")
+            yield cached
+            return
+        chunks = []
+        try:
+            async for chunk in self.llm.astream(prompt, *args, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            if chunks:
+                self._store(key, prompt, _join_chunks(chunks))
+            raise
+        if chunks:
+            self._store(key, prompt, _join_chunks(chunks))
+
+
+_caches: dict[str, LLMResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(path: str | None = None) -> LLMResponseCache | None:
+    """
+    Shared LLMResponseCache for a file (settings.llm_cache_file by default).
+
+    Returns:
+        LLMResponseCache, or None if caching is disabled (no cache file configured).
+    """
+    path = path or settings.llm_cache_file
+    if path is None:
+        return None
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = LLMResponseCache(
+                path,
+                ttl_sec=settings.llm_cache_ttl_sec,
+                max_entries=settings.llm_cache_max_entries,
+            )
+            _caches[path] = cache
+        return cache
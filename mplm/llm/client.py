@@ -6,21 +6,45 @@ from langchain_openai import ChatOpenAI
 
 from ..settings import settings
 from ..utils.exceptions import LLMConfigError
+from .cache import CachedLLM, get_llm_cache
 from .model_list import LOCAL_LLM_OLLAMA_LIST
+from .rate_limit import RateLimitedLLM
+
+
+def _create_client(model_name: str, temperature: float | None, **kwargs):
+    if model_name in LOCAL_LLM_OLLAMA_LIST:
+        from langchain_ollama import OllamaLLM
+        return OllamaLLM(model=model_name, temperature=temperature)
+    return ChatOpenAI(
+        model=model_name,
+        openai_api_base="https://openrouter.ai/api/v1",
+        openai_api_key=settings.openrouter_api_key,
+        temperature=temperature,
+        **kwargs,
+    )
 
 
 def get_llm(
     model_name: str | None = None,
     temperature: float | None = None,
+    fallback: bool = True,
 ) -> ChatOpenAI:
     """
     Create a LangChain ChatOpenAI object connected to OpenRouter.
 
+    When settings.llm_requests_per_min or settings.llm_fallback_models is set,
+    the client is wrapped in a RateLimitedLLM (token bucket, Retry-After aware
+    backoff and failover to the fallback models). When settings.llm_cache_file
+    is set, the result is wrapped in a CachedLLM.
+
     Args:
         model_name: Optional override. If None → use settings.llm_name.
+        fallback: Fail over to settings.llm_fallback_models. Disable it for runs
+            that measure `model_name` itself (tournaments, health-based selection),
+            so that no other model's answers are credited to it.
 
     Returns:
-        ChatOpenAI: Ready-to-use OpenRouter LLM client.
+        ChatOpenAI: Ready-to-use OpenRouter LLM client (or a wrapper around it).
     """
 
     resolved_model = model_name or settings.llm_name
@@ -31,13 +55,27 @@ def get_llm(
             "Please set LLM_NAME in your .env."
         )
 
-    if resolved_model in LOCAL_LLM_OLLAMA_LIST:
-        from langchain_ollama import OllamaLLM
-        return OllamaLLM(model=resolved_model, temperature=temperature)
+    fallback_models = [m for m in settings.llm_fallback_models if m != resolved_model] if fallback else []
+    if settings.llm_requests_per_min is None and not fallback_models:
+        llm = _create_client(resolved_model, temperature)
     else:
-        return ChatOpenAI(
-            model=resolved_model,
-            openai_api_base="https://openrouter.ai/api/v1",
-            openai_api_key=settings.openrouter_api_key,
-            temperature=temperature,
+        # リトライ・フェイルオーバーは RateLimitedLLM 側で行う（クライアント内部のリトライは無効化）
+        llm = RateLimitedLLM(
+            [(m, _create_client(m, temperature, max_retries=0)) for m in [resolved_model, *fallback_models]],
+            requests_per_min=settings.llm_requests_per_min,
+            burst=settings.llm_burst,
+            max_attempts=settings.llm_max_attempts,
+            backoff_base_sec=settings.llm_backoff_base_sec,
+            backoff_max_sec=settings.llm_backoff_max_sec,
         )
+
+    cache = get_llm_cache()
+    if cache is None:
+        return llm
+    return CachedLLM(
+        llm,
+        cache,
+        model_name=resolved_model,
+        temperature=temperature,
+        max_temperature=settings.llm_cache_max_temperature,
+    )
@@ -0,0 +1,283 @@
+"""
+OpenRouter model catalog with local caching and model health statistics.
+
+The free model list is fetched through a pooled HTTP session with timeouts
+and stored as JSON under settings.cache_dir. A fresh cache is used as is; a
+stale one is returned immediately while it is refreshed in a background
+thread, so startup only waits on the network when there is no cache at all.
+
+Health statistics (success rate, p50/p95 latency, last rate limit) are
+computed from the model_run_events table and used to skip models that are
+known to fail, be slow, or be rate limited right now.
+"""
+
+import os
+import random
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..db.crud import create_model_run_event, get_model_run_events_as_df
+from ..db.session import get_session
+from ..models.catalog import ModelCatalogSnapshot, ModelHealth
+from ..settings import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+OPENROUTER_MODELS_URL = "https://openrouter.ai/api/v1/models"
+CATALOG_FILE = "openrouter_models.json"
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Shared requests.Session with connection pooling and retries on connection errors / 5xx."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+            session.mount("https://", HTTPAdapter(pool_maxsize=8, max_retries=retry))
+            _session = session
+        return _session
+
+
+def fetch_free_models(timeout_sec: float | None = None) -> list[str]:
+    """
+    Fetch ids of the free (":free") models from OpenRouter.
+    """
+    response = get_http_session().get(
+        OPENROUTER_MODELS_URL,
+        headers={"Authorization": f"Bearer {settings.openrouter_api_key}"},
+        timeout=timeout_sec or settings.model_catalog_timeout_sec,
+    )
+    response.raise_for_status()
+    models = response.json().get("data", [])
+    return [m["id"] for m in models if m["id"].endswith(":free")]
+
+
+def _catalog_path(cache_dir: str | None) -> Path:
+    return Path(cache_dir or settings.cache_dir) / CATALOG_FILE
+
+
+def _read_snapshot(path: Path) -> ModelCatalogSnapshot | None:
+    try:
+        return ModelCatalogSnapshot.model_validate_json(path.read_text())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring broken model catalog cache {path}: {e}")
+        return None
+
+
+def _refresh(path: Path) -> ModelCatalogSnapshot:
+    snapshot = ModelCatalogSnapshot(fetched_at=time.time(), models=fetch_free_models())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(snapshot.model_dump_json())
+    os.replace(tmp_path, path)
+    return snapshot
+
+
+def _refresh_in_background(path: Path) -> None:
+    if not _refresh_lock.acquire(blocking=False):
+        return  # すでに更新中
+
+    def run():
+        try:
+            _refresh(path)
+            logger.info("Refreshed model catalog cache")
+        except Exception as e:
+            logger.warning(f"Background model catalog refresh failed: {e}")
+        finally:
+            _refresh_lock.release()
+
+    threading.Thread(target=run, name="model-catalog-refresh", daemon=True).start()
+
+
+def get_free_models(
+    ttl_sec: float | None = None,
+    cache_dir: str | None = None,
+    background_refresh: bool = True,
+) -> list[str]:
+    """
+    Free OpenRouter model ids, served from the local cache when possible.
+
+    Args:
+        ttl_sec: Cache lifetime. Defaults to settings.model_catalog_ttl_sec.
+        cache_dir: Cache root. Defaults to settings.cache_dir.
+        background_refresh: Refresh a stale cache in the background (False → refresh synchronously).
+
+    Returns:
+        List of model ids (the static OPEN_ROUTER_FREE_MODEL_LIST if nothing can be fetched or loaded)
+    """
+    from .model_list import OPEN_ROUTER_FREE_MODEL_LIST
+
+    ttl_sec = settings.model_catalog_ttl_sec if ttl_sec is None else ttl_sec
+    path = _catalog_path(cache_dir)
+    snapshot = _read_snapshot(path)
+
+    if snapshot is not None and time.time() - snapshot.fetched_at <= ttl_sec:
+        return snapshot.models
+    if snapshot is not None and background_refresh:
+        _refresh_in_background(path)
+        return snapshot.models
+
+    try:
+        return _refresh(path).models
+    except Exception as e:
+        if snapshot is not None:
+            logger.warning(f"Model catalog refresh failed, using stale cache: {e}")
+            return snapshot.models
+        logger.warning(f"Model catalog fetch failed, using static list: {e}")
+        return list(OPEN_ROUTER_FREE_MODEL_LIST)
+
+
+def record_model_run(
+    llm_name: str,
+    success: bool,
+    latency_sec: float | None = None,
+    rate_limited: bool = False,
+    error: str | None = None,
+    db_path: str | None = None,
+) -> None:
+    """
+    Record the outcome of a workflow run for model health statistics.
+    """
+    SessionLocal = get_session(db_path or settings.db_file)
+    with SessionLocal() as db:
+        create_model_run_event(
+            db,
+            llm_name=llm_name,
+            success=success,
+            latency_sec=latency_sec,
+            rate_limited=rate_limited,
+            error=error,
+        )
+
+
+def is_rate_limit_message(message: str | None) -> bool:
+    """Heuristic check of an error message for rate limiting."""
+    if not message:
+        return False
+    lowered = message.lower()
+    return "429" in lowered or "rate limit" in lowered or "ratelimit" in lowered
+
+
+def get_model_health(window_days: float | None = None, db_path: str | None = None) -> dict[str, ModelHealth]:
+    """
+    Per-model health statistics of the runs in the last `window_days` days.
+
+    Args:
+        window_days: Stats window. Defaults to settings.model_health_window_days.
+        db_path: SQLite file. Defaults to settings.db_file.
+
+    Returns:
+        Mapping of model name → ModelHealth
+    """
+    window_days = settings.model_health_window_days if window_days is None else window_days
+    since = datetime.now(UTC).replace(tzinfo=None) - timedelta(days=window_days)
+
+    SessionLocal = get_session(db_path or settings.db_file)
+    with SessionLocal() as db:
+        df = get_model_run_events_as_df(db, since=since)
+    if df.empty:
+        return {}
+
+    stats = df.groupby("llm_name").agg(
+        runs=("success", "size"),
+        success_rate=("success", "mean"),
+        p50_latency_sec=("latency_sec", "median"),
+        p95_latency_sec=("latency_sec", lambda s: s.quantile(0.95)),
+    )
+    last_rate_limited = df[df["rate_limited"].astype(bool)].groupby("llm_name")["created_at"].max()
+
+    def optional_float(value) -> float | None:
+        return None if pd.isna(value) else float(value)
+
+    return {
+        name: ModelHealth(
+            llm_name=name,
+            runs=int(row["runs"]),
+            success_rate=float(row["success_rate"]),
+            p50_latency_sec=optional_float(row["p50_latency_sec"]),
+            p95_latency_sec=optional_float(row["p95_latency_sec"]),
+            last_rate_limited_at=last_rate_limited.get(name),
+        )
+        for name, row in stats.iterrows()
+    }
+
+
+def is_healthy(health: ModelHealth | None, now: datetime | None = None) -> bool:
+    """
+    Whether a model may be selected. Models without (enough) history are always allowed.
+    """
+    if health is None:
+        return True
+    now = now or datetime.now(UTC).replace(tzinfo=None)
+    last = health.last_rate_limited_at
+    if last is not None:
+        if last.tzinfo is not None:
+            last = last.astimezone(UTC).replace(tzinfo=None)
+        if now - last < timedelta(seconds=settings.model_rate_limit_cooldown_sec):
+            return False
+    if health.runs < settings.model_health_min_runs:
+        return True
+    if health.success_rate < settings.model_min_success_rate:
+        return False
+    if (
+        settings.model_max_p95_latency_sec is not None
+        and health.p95_latency_sec is not None
+        and health.p95_latency_sec > settings.model_max_p95_latency_sec
+    ):
+        return False
+    return True
+
+
+def select_models(
+    num_models: int,
+    models: list[str] | None = None,
+    health: dict[str, ModelHealth] | None = None,
+    seed: int | None = None,
+) -> list[str]:
+    """
+    Randomly pick models, skipping unhealthy ones (falls back to all models if none is healthy).
+
+    Args:
+        num_models: Number of models to pick.
+        models: Candidate model ids. Defaults to get_free_models().
+        health: Model health stats. Defaults to get_model_health() (empty if the DB cannot be read).
+        seed: Random seed.
+
+    Returns:
+        List of distinct model ids
+    """
+    if models is None:
+        models = get_free_models()
+    if health is None:
+        try:
+            health = get_model_health()
+        except Exception as e:
+            logger.warning(f"Failed to load model health stats: {e}")
+            health = {}
+
+    healthy = [m for m in models if is_healthy(health.get(m))]
+    skipped = sorted(set(models) - set(healthy))
+    if skipped:
+        logger.info(f"Skipping unhealthy models: {skipped}")
+    if not healthy:
+        logger.warning("No healthy model left, selecting from all models")
+        healthy = list(models)
+
+    rng = random.Random(seed)
+    return rng.sample(healthy, min(num_models, len(healthy)))
+
@@ -1,7 +1,3 @@
-import requests
-
-from ..settings import settings
-
 OPEN_ROUTER_FREE_MODEL_LIST = [
     # "deepseek/deepseek-chat-v3.1:free",
     "deepseek/deepseek-chat-v3-0324:free",  # NG
@@ -19,16 +15,9 @@ LOCAL_LLM_OLLAMA_LIST = [
 
 
 def get_openrouter_free_models() -> list[str]:
-    url = "https://openrouter.ai/api/v1/models"
-    headers = {
-        "Authorization": f"Bearer {settings.openrouter_api_key}",
-    }
-
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-
-    models = response.json().get("data", [])
-
-    free_models = [m["id"] for m in models if m["id"].endswith(":free")]
+    """
+    Free OpenRouter model ids (served from the local model catalog cache, see model_catalog.py).
+    """
+    from .model_catalog import get_free_models
 
-    return free_models
+    return get_free_models()
@@ -0,0 +1,340 @@
+"""
+Rate-limit aware LLM client.
+
+RateLimitedLLM wraps one primary LLM client and optional fallback clients:
+
+- every call first takes a token from the model's token bucket, so requests
+  are spread out instead of bursting into the provider's quota;
+- a 429 (or 5xx) response puts the model into a cooldown for the
+  `Retry-After` duration, or a jittered exponential backoff when the
+  provider does not send one;
+- the call is retried on the next model that is not cooling down, and only
+  when every model is cooling down does it wait for the earliest one.
+
+Buckets and cooldowns are kept per model name for the whole process, so
+concurrent workflows (e.g. tournament runs) share them.
+
+Failover changes which model answers, so the answering model is exposed
+(answered_model_name(), RateLimitedLLM.model) for attribution. Runs that
+measure one specific model should be created without fallbacks
+(get_llm(..., fallback=False)).
+"""
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from ..utils.exceptions import LLMRateLimitError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Args:
+        rate_per_sec: Refill rate in tokens per second.
+        capacity: Max number of tokens (burst size).
+    """
+
+    def __init__(self, rate_per_sec: float, capacity: float):
+        if rate_per_sec <= 0 or capacity < 1:
+            raise ValueError("rate_per_sec must be > 0 and capacity >= 1")
+        self.rate_per_sec = rate_per_sec
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            0.0 if a token was taken, otherwise seconds until the next token.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_sec)
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate_per_sec
+
+    def acquire(self) -> None:
+        """Block until a token is taken."""
+        while (wait := self.try_acquire()) > 0:
+            time.sleep(wait)
+
+    async def aacquire(self) -> None:
+        """Wait (without blocking the event loop) until a token is taken."""
+        while (wait := self.try_acquire()) > 0:
+            await asyncio.sleep(wait)
+
+
+_buckets: dict[str, TokenBucket] = {}
+_cooldown_until: dict[str, float] = {}
+_state_lock = threading.Lock()
+
+_answered_by: contextvars.ContextVar[str | None] = contextvars.ContextVar("mplm_llm_answered_by", default=None)
+
+
+def answered_model_name() -> str | None:
+    """
+    Model that answered the latest RateLimitedLLM call in the current thread / asyncio task.
+
+    Unlike RateLimitedLLM.model, this is not overwritten by calls running concurrently
+    in other threads or tasks.
+    """
+    return _answered_by.get()
+
+
+def get_token_bucket(model_name: str, requests_per_min: float, burst: int) -> TokenBucket:
+    """Process-wide token bucket of a model."""
+    with _state_lock:
+        bucket = _buckets.get(model_name)
+        if bucket is None:
+            bucket = TokenBucket(requests_per_min / 60.0, burst)
+            _buckets[model_name] = bucket
+        return bucket
+
+
+def cooldown_remaining(model_name: str) -> float:
+    """Seconds until the model may be called again (0.0 if healthy)."""
+    with _state_lock:
+        return max(0.0, _cooldown_until.get(model_name, 0.0) - time.monotonic())
+
+
+def mark_cooldown(model_name: str, seconds: float) -> None:
+    """Do not call the model for `seconds` (an existing longer cooldown is kept)."""
+    with _state_lock:
+        until = time.monotonic() + seconds
+        _cooldown_until[model_name] = max(_cooldown_until.get(model_name, 0.0), until)
+
+
+def _status_code(exc: Exception) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable_error(exc: Exception) -> bool:
+    """Rate limit (429) and server-side (5xx) errors are retried on another model."""
+    if type(exc).__name__ == "RateLimitError":
+        return True
+    status = _status_code(exc)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def retry_after_seconds(exc: Exception) -> float | None:
+    """
+    Wait time requested by the provider (Retry-After or X-RateLimit-Reset header), if any.
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value is not None:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+
+    # OpenRouter: reset time as epoch milliseconds
+    reset = headers.get("x-ratelimit-reset") or headers.get("X-RateLimit-Reset")
+    if reset is not None:
+        try:
+            return max(0.0, float(reset) / 1000.0 - time.time())
+        except ValueError:
+            return None
+    return None
+
+
+class RateLimitedLLM:
+    """
+    LLM client wrapper with per-model token buckets, backoff and failover.
+
+    stream()/astream() apply the same policy until the first chunk arrives;
+    errors after that are raised to the caller.
+
+    Other attributes are delegated to the primary client, except `model` /
+    `model_name`, which report the model that answered the last successful call.
+
+    Args:
+        clients: (model name, LLM client) pairs in priority order; the first one is the primary.
+        requests_per_min: Token bucket rate per model (None → no client-side throttling).
+        burst: Token bucket capacity.
+        max_attempts: Max number of calls (over all models) before giving up.
+        backoff_base_sec: Backoff for the first failure without Retry-After; doubles on each failure.
+        backoff_max_sec: Upper limit of a single wait.
+    """
+
+    def __init__(
+        self,
+        clients: list[tuple[str, Any]],
+        requests_per_min: float | None = None,
+        burst: int = 1,
+        max_attempts: int = 6,
+        backoff_base_sec: float = 2.0,
+        backoff_max_sec: float = 60.0,
+    ):
+        if not clients:
+            raise ValueError("At least one LLM client is required")
+        self.clients = clients
+        self.requests_per_min = requests_per_min
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.last_model_name = clients[0][0]
+
+    def __getattr__(self, name: str):
+        return getattr(self.clients[0][1], name)
+
+    @property
+    def model(self) -> str:
+        return self.last_model_name
+
+    @property
+    def model_name(self) -> str:
+        return self.last_model_name
+
+    def _bucket(self, model_name: str) -> TokenBucket | None:
+        if self.requests_per_min is None:
+            return None
+        return get_token_bucket(model_name, self.requests_per_min, self.burst)
+
+    def _select(self) -> tuple[str, Any, float]:
+        """Return the first healthy client, or the one with the shortest cooldown and its wait time."""
+        waits = [(cooldown_remaining(name), i) for i, (name, _) in enumerate(self.clients)]
+        wait, i = min(waits, key=lambda w: (w[0] > 0, w[0], w[1]))
+        name, client = self.clients[i]
+        return name, client, min(wait, self.backoff_max_sec)
+
+    def _on_failure(self, model_name: str, exc: Exception, attempt: int) -> None:
+        delay = retry_after_seconds(exc)
+        if delay is None:
+            delay = self.backoff_base_sec * (2 ** attempt) * random.uniform(0.5, 1.5)
+        delay = min(delay, self.backoff_max_sec)
+        mark_cooldown(model_name, delay)
+        logger.warning(f"LLM {model_name} failed ({exc}); cooling down for {delay:.1f}s")
+
+    def _answered(self, model_name: str) -> None:
+        self.last_model_name = model_name
+        _answered_by.set(model_name)
+        if model_name != self.clients[0][0]:
+            logger.warning(f"LLM {self.clients[0][0]} unavailable; answered by fallback {model_name}")
+
+    def _exhausted(self, last_error: Exception | None) -> LLMRateLimitError:
+        names = [name for name, _ in self.clients]
+        return LLMRateLimitError(f"LLM call failed after {self.max_attempts} attempts on {names}: {last_error}")
+
+    def invoke(self, prompt: Any, *args, **kwargs) -> Any:
+        last_error = None
+        for attempt in range(self.max_attempts):
+            name, client, wait = self._select()
+            if wait > 0:
+                time.sleep(wait)
+            bucket = self._bucket(name)
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                response = client.invoke(prompt, *args, **kwargs)
+            except Exception as e:
+                if not is_retryable_error(e):
+                    raise
+                last_error = e
+                self._on_failure(name, e, attempt)
+                continue
+            self._answered(name)
+            return response
+        raise self._exhausted(last_error) from last_error
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs) -> Any:
+        last_error = None
+        for attempt in range(self.max_attempts):
+            name, client, wait = self._select()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            bucket = self._bucket(name)
+            if bucket is not None:
+                await bucket.aacquire()
+            try:
+                response = await client.ainvoke(prompt, *args, **kwargs)
+            except Exception as e:
+                if not is_retryable_error(e):
+                    raise
+                last_error = e
+                self._on_failure(name, e, attempt)
+                continue
+            self._answered(name)
+            return response
+        raise self._exhausted(last_error) from last_error
+
+    def stream(self, prompt: Any, *args, **kwargs) -> Iterator[Any]:
+        last_error = None
+        for attempt in range(self.max_attempts):
+            name, client, wait = self._select()
+            if wait > 0:
+                time.sleep(wait)
+            bucket = self._bucket(name)
+            if bucket is not None:
+                bucket.acquire()
+            iterator = iter(client.stream(prompt, *args, **kwargs))
+            try:
+                first = next(iterator)
+            except StopIteration:
+                self._answered(name)
+                return
+            except Exception as e:
+                if not is_retryable_error(e):
+                    raise
+                last_error = e
+                self._on_failure(name, e, attempt)
+                continue
+            self._answered(name)
+            yield first
+            yield from iterator
+            return
+        raise self._exhausted(last_error) from last_error
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[Any]:
+        last_error = None
+        for attempt in range(self.max_attempts):
+            name, client, wait = self._select()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            bucket = self._bucket(name)
+            if bucket is not None:
+                await bucket.aacquire()
+            iterator = aiter(client.astream(prompt, *args, **kwargs))
+            try:
+                first = await anext(iterator)
+            except StopAsyncIteration:
+                self._answered(name)
+                return
+            except Exception as e:
+                if not is_retryable_error(e):
+                    raise
+                last_error = e
+                self._on_failure(name, e, attempt)
+                continue
+            self._answered(name)
+            yield first
+            async for chunk in iterator:
+                yield chunk
+            return
+        raise self._exhausted(last_error) from last_error
@@ -3,21 +3,22 @@ Entry point for automated Titanic model training agent.
 """
 
 import random
+import time
+import uuid
 from pprint import pprint
 
 from mplm.agent.automatic_model_build_agent import build_workflow, save_run_to_db
 from mplm.db.base import init_db
-from mplm.db.crud import get_all_records_as_df
-from mplm.db.download_db_file import download_db_from_gcs_if_exists
+from mplm.db.publish import download_db_with_generation, publish_db
+from mplm.db.segment_sync import compact_segments, get_watermarks, load_history, needs_history, publish_segment
 from mplm.db.session import get_engine, get_session
 from mplm.llm.client import get_llm
-from mplm.llm.model_list import get_openrouter_free_models
+from mplm.llm.model_catalog import is_rate_limit_message, record_model_run, select_models
 from mplm.models.state import WorkflowState
 from mplm.services.data_loader import load_titanic_dataset
 from mplm.settings import settings
-from mplm.utils.gcs import upload_file_to_gcs
-from mplm.utils.logger import get_logger
-from mplm.utils.visualization import plot_accuracy_summary
+from mplm.utils.logger import flush_logs, get_logger, log_context
+from mplm.utils.tracing import Trace
 
 logger = get_logger(__name__)
 
@@ -25,12 +26,13 @@ logger = get_logger(__name__)
 def print_workflow_state(state: WorkflowState):
     """
     Nicely print the WorkflowState while omitting large/unnecessary fields:
-    df, metadata, llm, fixed_code
+    df, metadata, profile, llm, fixed_code
+    (trace is shown as total seconds per span kind)
     """
     display_state = {}
 
     for key, value in state.items():
-        if key in {"df", "metadata", "llm", "previous_code", "fixed_code"}:
+        if key in {"df", "metadata", "profile", "llm", "previous_code", "fixed_code"}:
             continue
         elif key == "summary_result" and value is not None:
             display_state[key] = {
@@ -45,73 +47,160 @@ def print_workflow_state(state: WorkflowState):
                 "model_path": value.model_path,
                 "train_code": value.code,
             }
+        elif key == "trace" and value is not None:
+            display_state["time_by_kind"] = {k: round(v, 2) for k, v in value.totals_by_kind().items()}
+        elif key == "candidate_results":
+            display_state[key] = [
+                {"model_name": r.model_name, "accuracy_val": r.accuracy_val, "accuracy_test": r.accuracy_test}
+                for r in value
+            ]
         else:
             display_state[key] = value
 
     pprint(display_state, width=120)
 
 
+def export_reports(db_path: str, gcs_db_path: str):
+    """
+    Export run records as CSV (all of them, or only the new ones with report_export_mode "incremental"),
+    the per-day accuracy rollup CSV and the accuracy summary figure, and upload them to GCS.
+    """
+    # 成功時にしか使わないので、ここで import する（matplotlib などの読み込みを起動時に払わない）
+    from mplm.db.crud import get_all_records_as_df
+    from mplm.db.incremental_export import export_incremental
+    from mplm.db.rollup import ensure_accuracy_rollups, get_accuracy_rollups_as_df
+    from mplm.utils.gcs import upload_file_to_gcs
+    from mplm.utils.visualization import plot_accuracy_rollup
+
+    if settings.report_export_mode == "incremental":
+        logger.info("Exporting new run records to GCS")
+        export_incremental(db_path)
+    else:
+        logger.info("Exporting to csv file and uploading to GCS")
+        with get_session(db_path=db_path)() as db:
+            df_record = get_all_records_as_df(db=db)
+        local_csv_path = db_path.replace('.db', '.csv')
+        gcs_csv_path = gcs_db_path.replace('.db', '.csv')
+        df_record.to_csv(local_csv_path)
+        csv_url = upload_file_to_gcs(local_path=local_csv_path, gcs_path=gcs_csv_path, make_public=True)
+        logger.info(f"Uploaded ({len(df_record)} records). Can be accessed at {csv_url}")
+
+    # 統計（CSV・図）は LLM・日ごとの集計テーブルから作る
+    with get_engine(db_path).begin() as conn:
+        ensure_accuracy_rollups(conn)
+        df_rollup = get_accuracy_rollups_as_df(conn)
+    local_rollup_path = db_path.replace('.db', '_rollup.csv')
+    gcs_rollup_path = gcs_db_path.replace('.db', '_rollup.csv')
+    df_rollup.drop(columns=["val_hist", "test_hist"], errors="ignore").to_csv(local_rollup_path, index=False)
+    rollup_url = upload_file_to_gcs(local_path=local_rollup_path, gcs_path=gcs_rollup_path, make_public=True)
+    logger.info(f"Uploaded accuracy rollup ({len(df_rollup)} rows). Can be accessed at {rollup_url}")
+
+    logger.info("Creating accuracy summary figure and uploading to GCS")
+    local_fig_path = db_path.replace('.db', f'.{settings.report_figure_format}')
+    gcs_fig_path = gcs_db_path.replace('.db', f'.{settings.report_figure_format}')
+    plot_accuracy_rollup(df_rollup, output_filepath=local_fig_path)
+    fig_url = upload_file_to_gcs(local_path=local_fig_path, gcs_path=gcs_fig_path, make_public=True)
+    logger.info(f"Uploaded. Can be accessed at {fig_url}")
+
+
 def main():
     settings.print_settings()
     local_db_path = settings.db_file
     gcs_db_path = settings.db_file_gcs
-    logger.info("Download DB file from GCS...")
-    download_db_from_gcs_if_exists(
-        local_db_path=local_db_path,
-        gcs_db_path=gcs_db_path,
-    )
+    segments_mode = settings.db_sync_mode == "segments"
+    if segments_mode:
+        if needs_history():
+            logger.info("Loading DB history (base file + segments) from GCS...")
+            load_history(local_db_path=local_db_path, gcs_db_path=gcs_db_path)
+        else:
+            logger.info("DB history not needed, skipping download.")
+    else:
+        logger.info("Download DB file from GCS...")
+        # アップロード時に、この generation から変わっていないこと（他のジョブが書いていないこと）を確認する
+        generation = download_db_with_generation(local_db_path, gcs_db_path)
 
     logger.info("Initializing DB...")
     init_db(get_engine())
+    watermarks = get_watermarks(local_db_path)
 
     logger.info("Loading Titanic dataset...")
     df, metadata = load_titanic_dataset()
 
-    llm_name = random.choice(get_openrouter_free_models())
     temperature = random.uniform(0.1, 2.0)
-    logger.info(f"Initializing llm {llm_name} (temperature {temperature})...")
-    llm = get_llm(model_name=llm_name, temperature=temperature)
 
-    state: WorkflowState = {
-        "df": df,
-        "target_column": "survived",
-        "metadata": metadata,
-        "retries": 0,
-        "llm": llm,
-    }
-
-    logger.info("Running workflow...")
-    workflow = build_workflow(max_retry=4)
-    final_state = workflow.invoke(state, debug=False)
-
-    print_workflow_state(final_state)
-
-    if final_state['status'] == "ok":
-        logger.info("Workflow completed succesfully. Saving results...")
-        save_run_to_db(final_state)
-
-        logger.info("Uploading db file to GCS")
-        uploeded_gcs_path = upload_file_to_gcs(local_path=local_db_path, gcs_path=gcs_db_path)
-        logger.info(f"Uploaded to {uploeded_gcs_path}")
-
-        logger.info("Exporting to csv file and uploading to GCS")
-        df_record = get_all_records_as_df(db=get_session(db_path=local_db_path)())
-        local_csv_path = local_db_path.replace('.db', '.csv')
-        gcs_csv_path = gcs_db_path.replace('.db', '.csv')
-        df_record.to_csv(local_csv_path)
-        csv_url = upload_file_to_gcs(local_path=local_csv_path, gcs_path=gcs_csv_path, make_public=True)
-        logger.info(f"Uploaded ({len(df_record)} records). Can be accessed at {csv_url}")
-
-        logger.info("Creating accuracy summary figure and uploading to GCS")
-        local_fig_path = local_db_path.replace('.db', '.png')
-        gcs_fig_path = gcs_db_path.replace('.db', '.png')
-        plot_accuracy_summary(df_record, output_filepath=local_fig_path)
-        fig_url = upload_file_to_gcs(local_path=local_fig_path, gcs_path=gcs_fig_path, make_public=True)
-        logger.info(f"Uploaded. Can be accessed at {fig_url}")
+    if settings.tournament_size > 0:
+        from mplm.agent.tournament import pick_tournament_models, run_tournament
+
+        model_names = pick_tournament_models(settings.tournament_size)
+        logger.info(f"Running tournament of {model_names} (temperature {temperature})...")
+        entries = run_tournament(
+            df,
+            model_names,
+            target_column="survived",
+            temperature=temperature,
+            metadata=metadata,
+            max_retry=4,
+        )
+        pprint([entry.model_dump() for entry in entries], width=120)
+        succeeded = any(entry.status == "ok" for entry in entries)
+    else:
+        selected = select_models(1)
+        # 候補が 1 つもなければ LLM_NAME を使う（未設定なら get_llm が LLMConfigError を出す）
+        llm_name = selected[0] if selected else settings.llm_name
+        logger.info(f"Initializing llm {llm_name} (temperature {temperature})...")
+        # 選んだモデル自体の成績・健全性を記録するので、フォールバックはしない
+        llm = get_llm(model_name=llm_name, temperature=temperature, fallback=False)
+
+        state: WorkflowState = {
+            "df": df,
+            "target_column": "survived",
+            "metadata": metadata,
+            "retries": 0,
+            "llm": llm,
+            "trace": Trace(),
+        }
+
+        logger.info("Running workflow...")
+        workflow = build_workflow(max_retry=4)
+        start = time.perf_counter()
+        with log_context(run_id=uuid.uuid4().hex[:12], llm=llm_name):
+            final_state = workflow.invoke(state, debug=False)
+        elapsed = time.perf_counter() - start
+
+        print_workflow_state(final_state)
+
+        succeeded = final_state['status'] == "ok"
+        errors = [] if succeeded else final_state.get("training_errors") or final_state.get("summary_errors") or []
+        record_model_run(
+            llm_name,
+            success=succeeded,
+            latency_sec=elapsed,
+            rate_limited=any(is_rate_limit_message(e) for e in errors),
+            error=errors[-1] if errors else None,
+        )
+        if succeeded:
+            logger.info("Workflow completed succesfully. Saving results...")
+            save_run_to_db(final_state)
+
+    if segments_mode:
+        # セグメントモード: 新しい行だけを送り、溜まったら compaction する（失敗した実行の記録も送る）
+        logger.info("Publishing new rows as a DB segment")
+        publish_segment(local_db_path, watermarks)
+        compacted_db_path = local_db_path.replace('.db', '.compacted.db')
+        if compact_segments(compacted_db_path, gcs_db_path=gcs_db_path):
+            export_reports(compacted_db_path, gcs_db_path)
     else:
+        logger.info("Uploading db file to GCS")
+        # 失敗した実行の model_run_events もモデル選択に使うので、失敗時もアップロードする
+        # 衝突したら最新の DB にこの実行の行をマージして再試行する（local_db_path もマージ後の DB になる）
+        publish_db(local_db_path, gcs_db_path, generation, watermarks)
+        if succeeded:
+            export_reports(local_db_path, gcs_db_path)
+    if not succeeded:
         logger.error("Workflow failed")
 
     logger.info("All done.")
+    flush_logs()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,41 @@
+"""
+Models for the LLM model catalog and model health statistics.
+"""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class ModelCatalogSnapshot(BaseModel):
+    """
+    Cached list of available models.
+
+    Attributes:
+        fetched_at: Unix time the list was fetched.
+        models: Model ids.
+    """
+
+    fetched_at: float = Field(description="Unix time the list was fetched.")
+    models: list[str] = Field(description="Model ids.")
+
+
+class ModelHealth(BaseModel):
+    """
+    Health statistics of one LLM computed from past runs.
+
+    Attributes:
+        llm_name: Model name.
+        runs: Number of runs in the stats window.
+        success_rate: Fraction of runs that finished successfully.
+        p50_latency_sec: Median workflow wall-clock time.
+        p95_latency_sec: 95th percentile workflow wall-clock time.
+        last_rate_limited_at: Time of the last run that hit a rate limit.
+    """
+
+    llm_name: str = Field(description="Model name.")
+    runs: int = Field(description="Number of runs.")
+    success_rate: float = Field(description="Fraction of successful runs.")
+    p50_latency_sec: float | None = Field(default=None, description="Median latency.")
+    p95_latency_sec: float | None = Field(default=None, description="95th percentile latency.")
+    last_rate_limited_at: datetime | None = Field(default=None, description="Last rate limited run.")
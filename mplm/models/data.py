@@ -3,6 +3,8 @@ Data models for Titanic dataset and metadata.
 Used both for LLM prompts and internal state.
 """
 
+from typing import Any
+
 from pydantic import BaseModel, Field
 
 
@@ -25,3 +27,111 @@ class DatasetMetadata(BaseModel):
     missing_counts: dict[str, int] = Field(
         description="Mapping of column name to count of missing values."
     )
+
+
+class StoredColumn(BaseModel):
+    """
+    One column of a DataFrame persisted by the memory-mapped dataset store.
+
+    Attributes:
+        name: Column label.
+        kind: "array" (plain numpy .npy), "categorical" (codes .npy + categories) or "pickle".
+        file: File name inside the store directory.
+        categories: Category values (categorical only).
+        ordered: Whether the categorical is ordered (categorical only).
+    """
+
+    name: Any = Field(description="Column label.")
+    kind: str = Field(description='"array", "categorical" or "pickle".')
+    file: str = Field(description="File name inside the store directory.")
+    categories: list[Any] | None = Field(default=None, description="Category values of a categorical column.")
+    ordered: bool = Field(default=False, description="Whether the categorical column is ordered.")
+
+
+class StoredFrame(BaseModel):
+    """
+    A DataFrame persisted by the memory-mapped dataset store.
+
+    Attributes:
+        columns: Stored columns in original order.
+        index: Stored index (kind "array" or "pickle").
+        num_rows: Number of rows.
+    """
+
+    columns: list[StoredColumn] = Field(description="Stored columns in original order.")
+    index: StoredColumn = Field(description="Stored row index.")
+    num_rows: int = Field(description="Number of rows.")
+
+
+class SharedDatasetHandle(BaseModel):
+    """
+    Picklable reference to a set of DataFrames stored on disk for zero-copy attach.
+
+    Attributes:
+        root_dir: Directory holding the stored files.
+        frames: Mapping of frame name (e.g. "df_train") to its stored layout.
+    """
+
+    root_dir: str = Field(description="Directory holding the stored files.")
+    frames: dict[str, StoredFrame] = Field(description="Mapping of frame name to stored layout.")
+
+
+class CachedDatasetManifest(BaseModel):
+    """
+    Manifest of a dataset stored in the local dataset cache.
+
+    Attributes:
+        name: Dataset name (e.g. "titanic").
+        version: Dataset version.
+        checksum: Checksum of the source data (OpenML md5 if available); also the data directory name.
+        fingerprint: Content fingerprint of the parsed DataFrame.
+        metadata: Precomputed DatasetMetadata.
+        frame: Stored layout of the DataFrame.
+    """
+
+    name: str = Field(description="Dataset name.")
+    version: int | str = Field(description="Dataset version.")
+    checksum: str = Field(description="Checksum of the source data; data directory name.")
+    fingerprint: str = Field(description="Content fingerprint of the parsed DataFrame.")
+    metadata: DatasetMetadata = Field(description="Precomputed dataset metadata.")
+    frame: StoredFrame = Field(description="Stored layout of the DataFrame.")
+
+
+class ColumnProfile(BaseModel):
+    """
+    Profile of one dataset column.
+
+    Attributes:
+        name: Column name.
+        dtype: dtype string.
+        missing: Number of missing values (always computed on all rows).
+        unique: Number of distinct non-missing values.
+        quantiles: min / 25% / 50% / 75% / max (numeric columns only).
+        mean: Mean (numeric columns only).
+        std: Standard deviation (numeric columns only).
+        top_values: Most frequent values with counts (non-numeric columns only).
+    """
+
+    name: str = Field(description="Column name.")
+    dtype: str = Field(description="dtype string.")
+    missing: int = Field(description="Number of missing values.")
+    unique: int = Field(description="Number of distinct non-missing values.")
+    quantiles: dict[str, float] | None = Field(default=None, description="min/25%/50%/75%/max of numeric columns.")
+    mean: float | None = Field(default=None, description="Mean of numeric columns.")
+    std: float | None = Field(default=None, description="Standard deviation of numeric columns.")
+    top_values: list[tuple[str, int]] | None = Field(default=None, description="Most frequent values and counts.")
+
+
+class DatasetProfile(BaseModel):
+    """
+    Profile of a whole dataset, computed by dataset_profiler.profile_dataset.
+
+    Attributes:
+        num_rows: Total number of rows.
+        sampled_rows: Rows used for unique/quantile/top-k statistics (== num_rows if not sampled).
+        columns: Per-column profiles.
+    """
+
+    num_rows: int = Field(description="Total number of rows.")
+    sampled_rows: int = Field(description="Rows used for unique/quantile/top-k statistics.")
+    columns: list[ColumnProfile] = Field(description="Per-column profiles.")
@@ -0,0 +1,30 @@
+"""
+Models for historical re-evaluation batches.
+"""
+
+from pydantic import BaseModel, Field
+
+
+class ReevaluationSummary(BaseModel):
+    """
+    Outcome of one re-evaluation batch invocation.
+
+    Attributes:
+        batch_id: Identifier of the batch (rows in the reevaluations table share it).
+        dataset_fingerprint: Content hash of the dataset the runs were re-executed on.
+        random_seed: Split seed used.
+        evaluated: Number of runs executed by this invocation.
+        succeeded: Number of those runs that produced accuracies.
+        failed: Number of those runs that failed.
+        skipped: Number of runs already evaluated in the batch by an earlier invocation.
+        elapsed_sec: Wall-clock time of this invocation.
+    """
+
+    batch_id: str = Field(description="Re-evaluation batch id.")
+    dataset_fingerprint: str = Field(description="Dataset content hash.")
+    random_seed: int | None = Field(default=None, description="Split seed.")
+    evaluated: int = Field(default=0, description="Runs executed now.")
+    succeeded: int = Field(default=0, description="Runs executed successfully.")
+    failed: int = Field(default=0, description="Runs that failed.")
+    skipped: int = Field(default=0, description="Runs already evaluated earlier.")
+    elapsed_sec: float = Field(default=0.0, description="Wall-clock seconds.")
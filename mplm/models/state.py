@@ -6,7 +6,8 @@ from typing import Any, TypedDict
 
 import pandas as pd
 
-from .data import DatasetMetadata
+from ..utils.tracing import Trace
+from .data import DatasetMetadata, DatasetProfile
 from .summary import SummaryResult
 from .training import TrainExecutionResult
 
@@ -18,9 +19,11 @@ class WorkflowState(TypedDict, total=False):
     Fields:
         df: pandas DataFrame containing the dataset.
         metadata: Dataset metadata.
+        profile: Dataset profile (computed once by summary_chain and reused on retries).
         target_column: Name of the target column for training.
         summary_result: SummaryResult object returned by summary_chain.
         training_result: TrainExecutionResult returned by training_chain.
+        candidate_results: All successful candidates of parallel_training_chain (best one is training_result).
         retry_count: Number of retry attempts for the current node.
         summary_errors: List of errors encountered during summarization.
         training_errors: List of errors encountered during training.
@@ -30,13 +33,16 @@ class WorkflowState(TypedDict, total=False):
         fixed_code: Code generated by fix_error_training_chain after fixing errors.
         use_fixed_summary: Whether to use a fixed summary for training (boolean flag).
         llm: Optional LLM client instance used for generating code or summaries.
+        trace: Optional Trace collecting per-node timing / resource spans (saved to run_spans).
     """
 
     df: pd.DataFrame
     metadata: DatasetMetadata
+    profile: DatasetProfile | None
     target_column: str
     summary_result: SummaryResult | None
     training_result: TrainExecutionResult | None
+    candidate_results: list[TrainExecutionResult]
     retry_count: int
     summary_errors: list[str]
     training_errors: list[str]
@@ -45,3 +51,4 @@ class WorkflowState(TypedDict, total=False):
     fixed_code: str | None
     use_fixed_summary: bool
     llm: Any | None
+    trace: Trace | None
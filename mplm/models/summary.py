@@ -4,6 +4,8 @@ Models for summary generation logic.
 
 from pydantic import BaseModel, Field
 
+from .data import DatasetProfile
+
 
 class SummaryGenerationRequest(BaseModel):
     """
@@ -29,9 +31,17 @@ class SummaryResult(BaseModel):
     Attributes:
         summary_text: Human readable summary string.
         summary_code: The actual summary code executed (None if fixed logic used).
+        profile: Dataset profile the summary (and its prompt) was based on.
+        cache_id: Id of the summary_cache row the summary was stored in / reused from.
     """
 
     summary_text: str = Field(description="Generated summary text.")
     summary_code: str | None = Field(
         default=None, description="Generated summary Python code."
     )
+    profile: DatasetProfile | None = Field(
+        default=None, description="Dataset profile used for the summary."
+    )
+    cache_id: int | None = Field(
+        default=None, description="summary_cache row id (None if not cached)."
+    )
@@ -0,0 +1,28 @@
+"""
+Models for multi-model tournament runs.
+"""
+
+from pydantic import BaseModel, Field
+
+
+class TournamentEntry(BaseModel):
+    """
+    Outcome of one model in a tournament.
+
+    Attributes:
+        model_name: LLM model name.
+        status: "ok" or "failed".
+        accuracy_val: Validation accuracy of the trained model (None if failed).
+        accuracy_test: Test accuracy of the trained model (None if failed).
+        trained_model_name: Name of the model trained by the generated code.
+        error: Error message when the workflow failed.
+        elapsed_sec: Wall-clock time of the model's workflow.
+    """
+
+    model_name: str = Field(description="LLM model name.")
+    status: str = Field(description='"ok" or "failed".')
+    accuracy_val: float | None = Field(default=None, description="Validation accuracy.")
+    accuracy_test: float | None = Field(default=None, description="Test accuracy.")
+    trained_model_name: str | None = Field(default=None, description="Trained model name.")
+    error: str | None = Field(default=None, description="Error message if failed.")
+    elapsed_sec: float = Field(default=0.0, description="Wall-clock seconds.")
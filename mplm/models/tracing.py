@@ -0,0 +1,40 @@
+"""
+Models for workflow tracing.
+"""
+
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class SpanRecord(BaseModel):
+    """
+    One timed step of a workflow run (node, LLM call, split, code execution).
+
+    Attributes:
+        span_id: Id of the span within its trace.
+        parent_id: Id of the enclosing span (None for top-level spans).
+        name: Span name (e.g. "summary", "llm.train_code", "exec.training").
+        kind: "node", "llm", "split", "exec" or "candidate".
+        start_offset_sec: Start time relative to the start of the trace.
+        wall_sec: Wall-clock duration.
+        cpu_sec: CPU time of the process during the span.
+        peak_rss_mb: Peak RSS of the process at the end of the span.
+        prompt_tokens: Prompt tokens reported by the provider (LLM spans).
+        completion_tokens: Completion tokens reported by the provider (LLM spans).
+        error: Error message if the span raised.
+        attributes: Extra attributes (model name, attempt, candidate index, ...).
+    """
+
+    span_id: int = Field(description="Span id within the trace.")
+    parent_id: int | None = Field(default=None, description="Parent span id.")
+    name: str = Field(description="Span name.")
+    kind: str = Field(description="Span kind.")
+    start_offset_sec: float = Field(default=0.0, description="Start relative to the trace start.")
+    wall_sec: float | None = Field(default=None, description="Wall-clock seconds.")
+    cpu_sec: float | None = Field(default=None, description="Process CPU seconds.")
+    peak_rss_mb: float | None = Field(default=None, description="Peak RSS in MB.")
+    prompt_tokens: int | None = Field(default=None, description="Prompt tokens.")
+    completion_tokens: int | None = Field(default=None, description="Completion tokens.")
+    error: str | None = Field(default=None, description="Error message.")
+    attributes: dict[str, Any] = Field(default_factory=dict, description="Extra attributes.")
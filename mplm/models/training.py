@@ -18,6 +18,20 @@ class TrainCodeRequest(BaseModel):
     train_split_seed: int = Field(description="Seed used for train/val/test splitting.")
 
 
+class ExecutionTimings(BaseModel):
+    """
+    Timings of one execution of generated code.
+
+    Attributes:
+        compile_sec: Seconds spent compiling the source (0.0 on a code cache hit).
+        run_sec: Seconds spent executing the compiled code.
+        cache_hit: Whether the compiled code came from the code cache.
+    """
+    compile_sec: float = Field(description="Compile time in seconds.")
+    run_sec: float = Field(description="Run time in seconds.")
+    cache_hit: bool = Field(default=False, description="Compiled code was cached.")
+
+
 class TrainExecutionResult(BaseModel):
     """
     Result of executing the training code.
@@ -26,6 +40,9 @@ class TrainExecutionResult(BaseModel):
         accuracy: Accuracy on validation and test.
         model_path: Path to saved pickle model.
         code: The generated training code used for exec().
+        compile_sec / run_sec: Compile and run time of the training code.
+        cpu_sec: CPU time of the executing process while the training code ran.
+        peak_rss_mb: Peak RSS of the executing process after the training code ran.
     """
     accuracy_val: float = Field(description="Validation accuracy.")
     accuracy_test: float = Field(description="Test accuracy.")
@@ -34,3 +51,7 @@ class TrainExecutionResult(BaseModel):
     model_name: str = Field(description="Name of model trained via generated code")
     model_path: str | None = Field(default=None, description="Path to model pickle file.")
     llm_name: str | None = Field(default=None, description="LLM model name.")
+    compile_sec: float | None = Field(default=None, description="Compile time of the training code.")
+    run_sec: float | None = Field(default=None, description="Run time of the training code.")
+    cpu_sec: float | None = Field(default=None, description="CPU time of the training code.")
+    peak_rss_mb: float | None = Field(default=None, description="Peak RSS of the executing process in MB.")
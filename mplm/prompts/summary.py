@@ -2,6 +2,8 @@
 LLM prompt template for summary code generation.
 """
 
+import hashlib
+
 from langchain_core.prompts import PromptTemplate
 
 SUMMARY_CODE_PROMPT= PromptTemplate.from_template(
@@ -42,3 +44,6 @@ Only Python code, and always wrap it inside a markdown python block like this:
 Do NOT provide any explanation outside the code block.
 """
 )
+
+# Changes whenever the template text changes; cached summaries are keyed on it.
+SUMMARY_PROMPT_VERSION = hashlib.sha256(SUMMARY_CODE_PROMPT.template.encode()).hexdigest()[:16]
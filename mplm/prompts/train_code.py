@@ -228,3 +228,11 @@ Do NOT provide any explanation outside the code block.
 Before emitting the code block, read the previous code and error carefully and ensure the same mistake does NOT happen again.
 """
 )
+
+# Appended to TRAIN_CODE_PROMPT when several candidates are generated in parallel.
+CANDIDATE_HINT = """
+
+This is candidate {index} of {total} generated independently for the same dataset.
+Prefer a model family or preprocessing approach that differs from the most obvious choice,
+so that the candidates explore different solutions.
+"""
@@ -0,0 +1,55 @@
+"""
+Entry point for re-evaluating all stored training code on the current dataset.
+
+Usage:
+    uv run python mplm/reevaluate.py --seed 7
+    uv run python mplm/reevaluate.py --seed 7 --workers 8 --limit 100
+
+Re-running the same command resumes an interrupted batch.
+"""
+
+import argparse
+from pprint import pprint
+
+from mplm.agent.reevaluation import reevaluate_runs
+from mplm.db.base import init_db
+from mplm.db.session import get_engine
+from mplm.services.data_loader import load_titanic_dataset
+from mplm.settings import settings
+from mplm.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-evaluate stored train_code on a dataset / split seed.")
+    parser.add_argument("--seed", type=int, default=settings.default_random_seed, help="Split seed.")
+    parser.add_argument("--batch-id", default=None, help="Batch id (default: dataset fingerprint + seed).")
+    parser.add_argument("--workers", type=int, default=None, help="Sandbox worker processes (default: CPUs).")
+    parser.add_argument("--limit", type=int, default=None, help="Max number of runs to evaluate in this call.")
+    parser.add_argument("--db", default=settings.db_file, help="SQLite file.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+
+    logger.info("Initializing DB...")
+    init_db(get_engine(args.db))
+
+    logger.info("Loading Titanic dataset...")
+    df, _ = load_titanic_dataset()
+
+    summary = reevaluate_runs(
+        df,
+        random_seed=args.seed,
+        batch_id=args.batch_id,
+        db_path=args.db,
+        num_workers=args.workers,
+        limit=args.limit,
+    )
+    pprint(summary.model_dump(), width=120)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import re
+from collections.abc import AsyncIterable, Iterable
 
 
 def extract_code_from_block(llm_output: str, lang: str = "python") -> str:
@@ -20,3 +21,95 @@ def extract_code_from_block(llm_output: str, lang: str = "python") -> str:
     if not match:
         raise ValueError(f"{lang} code block not found in LLM output")
     return match.group(1).strip()
+
+
+class CodeBlockStreamParser:
+    """
+    ストリーミング出力からコードブロックを逐次検出するパーサ
+
+    チャンクを受け取るたびに新しく届いた部分だけを走査し、閉じフェンス
+    (```) を受信した時点でコードを返す。結果は extract_code_from_block と同じ
+    （最初の ```{lang} から次の ``` まで）。
+
+    Args:
+        lang: 抽出したいコードブロックの言語
+    """
+
+    def __init__(self, lang: str = "python"):
+        self.open_fence = f"```{lang}"
+        self.text = ""
+        self._code_start: int | None = None
+        self._scanned = 0
+
+    def feed(self, chunk: str) -> str | None:
+        """
+        チャンクを追加する
+
+        Returns:
+            コードブロックが完結していればその中身、まだなら None
+        """
+        self.text += chunk
+        if self._code_start is None:
+            # フェンスがチャンク境界をまたぐ場合に備えて少し手前から探す
+            i = self.text.find(self.open_fence, max(0, self._scanned - len(self.open_fence) + 1))
+            if i < 0:
+                self._scanned = len(self.text)
+                return None
+            self._code_start = i + len(self.open_fence)
+            self._scanned = self._code_start
+
+        j = self.text.find("```", max(self._code_start, self._scanned - 2))
+        if j < 0:
+            self._scanned = len(self.text)
+            return None
+        return self.text[self._code_start:j].strip()
+
+
+def _chunk_text(chunk) -> str:
+    if isinstance(chunk, str):
+        return chunk
+    content = getattr(chunk, "content", "")
+    return content if isinstance(content, str) else ""
+
+
+def extract_code_from_stream(chunks: Iterable, lang: str = "python", parser: CodeBlockStreamParser | None = None) -> str:
+    """
+    ストリーミング出力（str または AIMessageChunk のイテレータ）からコードブロックを抽出
+
+    閉じフェンスを受信した時点でストリームを close() し、残りの出力は受信しない。
+    parser を渡すと、失敗時に受信済みのテキスト（parser.text）を呼び出し側で参照できる。
+
+    Raises:
+        ValueError: ストリーム終了までに指定した言語のコードブロックが完結しなかった場合
+    """
+    parser = parser or CodeBlockStreamParser(lang)
+    iterator = iter(chunks)
+    try:
+        for chunk in iterator:
+            code = parser.feed(_chunk_text(chunk))
+            if code is not None:
+                return code
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+    raise ValueError(f"{lang} code block not found in LLM output")
+
+
+async def aextract_code_from_stream(
+    chunks: AsyncIterable, lang: str = "python", parser: CodeBlockStreamParser | None = None
+) -> str:
+    """
+    extract_code_from_stream の非同期版（閉じフェンス受信時に aclose() する）
+    """
+    parser = parser or CodeBlockStreamParser(lang)
+    try:
+        async for chunk in chunks:
+            code = parser.feed(_chunk_text(chunk))
+            if code is not None:
+                return code
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    raise ValueError(f"{lang} code block not found in LLM output")
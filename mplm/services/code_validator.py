@@ -0,0 +1,194 @@
+"""
+Static (AST based) validation of LLM-generated code.
+
+Rejects code that is certain to fail or is not allowed before it is
+executed: syntax errors, forbidden or missing imports, forbidden builtins,
+and required result variables that are never assigned at module level.
+Error messages point at the offending line so they can be fed back to the
+LLM through FIX_ERROR_CODE_PROMPT.
+"""
+
+import ast
+import importlib.util
+from functools import lru_cache
+
+from ..utils.exceptions import CodeValidationError
+
+TRAINING_REQUIRED_NAMES = ("model", "accuracy_val", "accuracy_test")
+SUMMARY_REQUIRED_NAMES = ("summary_text",)
+
+# Modules that give access to the file system, processes or the network
+FORBIDDEN_MODULES = frozenset({
+    "asyncio",
+    "builtins",
+    "ctypes",
+    "ftplib",
+    "http",
+    "importlib",
+    "multiprocessing",
+    "os",
+    "pathlib",
+    "pty",
+    "requests",
+    "shutil",
+    "signal",
+    "smtplib",
+    "socket",
+    "subprocess",
+    "sys",
+    "threading",
+    "urllib",
+})
+
+FORBIDDEN_CALLS = frozenset({
+    "__import__",
+    "breakpoint",
+    "compile",
+    "eval",
+    "exec",
+    "exit",
+    "input",
+    "open",
+    "quit",
+})
+
+
+@lru_cache(maxsize=256)
+def _module_available(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _line(code_lines: list[str], node: ast.AST) -> str:
+    lineno = getattr(node, "lineno", None)
+    if lineno is None or not 0 < lineno <= len(code_lines):
+        return ""
+    return f" (line {lineno}: {code_lines[lineno - 1].strip()})"
+
+
+def _target_names(target: ast.AST) -> set[str]:
+    if isinstance(target, ast.Name):
+        return {target.id}
+    if isinstance(target, ast.Tuple | ast.List):
+        return set().union(*(_target_names(t) for t in target.elts))
+    if isinstance(target, ast.Starred):
+        return _target_names(target.value)
+    return set()
+
+
+class _ModuleScopeVisitor(ast.NodeVisitor):
+    """Collects names bound at module scope (function/class/lambda bodies are skipped)."""
+
+    def __init__(self):
+        self.assigned: set[str] = set()
+
+    def visit_FunctionDef(self, node):
+        self.assigned.add(node.name)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        self.assigned.add(node.name)
+
+    def visit_Lambda(self, node):
+        pass
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            self.assigned |= _target_names(target)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node):
+        if node.value is not None:
+            self.assigned |= _target_names(node.target)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        self.assigned |= _target_names(node.target)
+        self.generic_visit(node)
+
+    def visit_NamedExpr(self, node):
+        self.assigned |= _target_names(node.target)
+        self.generic_visit(node)
+
+    def visit_For(self, node):
+        self.assigned |= _target_names(node.target)
+        self.generic_visit(node)
+
+    visit_AsyncFor = visit_For
+
+    def visit_withitem(self, node):
+        if node.optional_vars is not None:
+            self.assigned |= _target_names(node.optional_vars)
+        self.generic_visit(node)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.assigned.add(alias.asname or alias.name.split(".")[0])
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            self.assigned.add(alias.asname or alias.name)
+
+
+def validate_code(code: str, required_names: tuple[str, ...] = ()) -> None:
+    """
+    Validate generated code without executing it.
+
+    Args:
+        code: Python code string
+        required_names: Variables the code must assign at module level.
+
+    Raises:
+        CodeValidationError: describing the first problem found
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        line = f" (line {e.lineno}: {e.text.strip()})" if e.lineno and e.text else ""
+        raise CodeValidationError(f"SyntaxError: {e.msg}{line}") from e
+
+    lines = code.splitlines()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [(alias.name, node) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                raise CodeValidationError(f"Relative imports are not allowed{_line(lines, node)}")
+            modules = [(node.module, node)]
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FORBIDDEN_CALLS:
+            raise CodeValidationError(f"Calling {node.func.id}() is not allowed{_line(lines, node)}")
+        else:
+            continue
+
+        for module, import_node in modules:
+            top = module.split(".")[0]
+            if top in FORBIDDEN_MODULES:
+                raise CodeValidationError(f"Importing {module} is not allowed{_line(lines, import_node)}")
+            if not _module_available(top):
+                raise CodeValidationError(
+                    f"Module {module} is not installed; use scikit-learn, pandas or numpy instead"
+                    f"{_line(lines, import_node)}"
+                )
+
+    if required_names:
+        visitor = _ModuleScopeVisitor()
+        visitor.visit(tree)
+        missing = [name for name in required_names if name not in visitor.assigned]
+        if missing:
+            raise CodeValidationError(
+                f"Code never assigns required variable(s) {', '.join(missing)} at top level "
+                f"(required: {', '.join(required_names)})"
+            )
+
+
+def validate_training_code(code: str) -> None:
+    """Validate training code (must assign model, accuracy_val and accuracy_test)."""
+    validate_code(code, TRAINING_REQUIRED_NAMES)
+
+
+def validate_summary_code(code: str) -> None:
+    """Validate summary code (must assign summary_text)."""
+    validate_code(code, SUMMARY_REQUIRED_NAMES)
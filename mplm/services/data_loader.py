@@ -1,30 +1,367 @@
 """
-Load Titanic dataset using scikit-learn.
+Dataset loading.
+
+Datasets are read through a registry of sources (local CSV/Parquet,
+OpenML, SQLite query). Every source can be loaded at once or iterated in
+chunks, and DatasetMetadata can be computed in a single streaming pass
+over the chunks, without holding the whole dataset in memory.
+
+Parsed OpenML datasets are kept in the local dataset cache (see
+dataset_cache.py), so only the first run on a machine downloads and
+parses the ARFF data.
 """
 
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+
+import numpy as np
 import pandas as pd
-from sklearn.datasets import fetch_openml
 
 from ..models.data import DatasetMetadata
+from ..settings import settings
+from ..utils.exceptions import DatasetUnavailableError
+from ..utils.logger import get_logger
+from .dataset_cache import load_cached_dataset, save_cached_dataset
 
+logger = get_logger(__name__)
 
-def load_titanic_dataset() -> tuple[pd.DataFrame, DatasetMetadata]:
-    """
-    Load Titanic dataset from scikit-learn (OpenML).
 
-    Returns:
-        df: pandas DataFrame
-        metadata: DatasetMetadata extracted from df
+def fetch_openml(*args, **kwargs):
+    """sklearn.datasets.fetch_openml, imported on first use (sklearn.datasets is slow to import)."""
+    from sklearn.datasets import fetch_openml as _fetch_openml
+
+    return _fetch_openml(*args, **kwargs)
+
+
+def build_metadata(df: pd.DataFrame) -> DatasetMetadata:
     """
+    Extract DatasetMetadata from a DataFrame.
 
-    dataset = fetch_openml("titanic", version=1, as_frame=True)
-    df = dataset.frame
+    Args:
+        df: pandas DataFrame
 
-    metadata = DatasetMetadata(
+    Returns:
+        DatasetMetadata
+    """
+    return DatasetMetadata(
         columns=list(df.columns),
         dtypes={col: str(df[col].dtype) for col in df.columns},
         num_rows=len(df),
         missing_counts=df.isna().sum().to_dict(),
     )
 
+
+class MetadataAccumulator:
+    """
+    Incrementally computes DatasetMetadata over DataFrame chunks.
+
+    Column order follows first appearance; a column whose dtype differs
+    between chunks is reported with the common numpy type if both are
+    numeric, otherwise as "object". Columns missing from a chunk count
+    as missing values for that chunk's rows.
+    """
+
+    def __init__(self):
+        self.num_rows = 0
+        self.dtypes: dict[str, object] = {}
+        self.missing_counts: dict[str, int] = {}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add one chunk."""
+        missing = chunk.isna().sum()
+        for col in chunk.columns:
+            dtype = chunk[col].dtype
+            if col not in self.dtypes:
+                self.dtypes[col] = dtype
+                self.missing_counts[col] = self.num_rows  # 以前のチャンクには存在しなかった列
+            elif self.dtypes[col] != dtype:
+                self.dtypes[col] = self._merge_dtypes(self.dtypes[col], dtype)
+            self.missing_counts[col] += int(missing[col])
+        for col in self.dtypes.keys() - set(chunk.columns):
+            self.missing_counts[col] += len(chunk)
+        self.num_rows += len(chunk)
+
+    @staticmethod
+    def _merge_dtypes(a, b):
+        if isinstance(a, np.dtype) and isinstance(b, np.dtype) and a.kind in "biuf" and b.kind in "biuf":
+            return np.result_type(a, b)
+        return np.dtype("object")
+
+    def result(self) -> DatasetMetadata:
+        """Return metadata of all chunks seen so far."""
+        return DatasetMetadata(
+            columns=list(self.dtypes),
+            dtypes={col: str(dtype) for col, dtype in self.dtypes.items()},
+            num_rows=self.num_rows,
+            missing_counts=dict(self.missing_counts),
+        )
+
+
+def build_metadata_streaming(chunks: Iterable[pd.DataFrame]) -> DatasetMetadata:
+    """
+    Compute DatasetMetadata in one pass over DataFrame chunks.
+
+    Args:
+        chunks: Iterable of DataFrames (e.g. DatasetSource.iter_chunks())
+
+    Returns:
+        DatasetMetadata
+    """
+    accumulator = MetadataAccumulator()
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.result()
+
+
+def load_openml_dataset(
+    name: str,
+    version: int = 1,
+    use_cache: bool = True,
+) -> tuple[pd.DataFrame, DatasetMetadata]:
+    """
+    Load an OpenML dataset, using the local dataset cache when possible.
+
+    Args:
+        name: OpenML dataset name
+        version: OpenML dataset version
+        use_cache: Read from / write to the local dataset cache
+
+    Returns:
+        df: pandas DataFrame
+        metadata: DatasetMetadata extracted from df
+
+    Raises:
+        DatasetUnavailableError: settings.dataset_offline is set and the dataset is not cached
+    """
+    if use_cache:
+        cached = load_cached_dataset(name, version)
+        if cached is not None:
+            return cached
+
+    if settings.dataset_offline:
+        raise DatasetUnavailableError(
+            f"Dataset {name} (version {version}) is not in the local cache ({settings.cache_dir}) "
+            "and DATASET_OFFLINE is set."
+        )
+
+    dataset = fetch_openml(name, version=version, as_frame=True)
+    df = dataset.frame
+    metadata = build_metadata(df)
+
+    if use_cache:
+        try:
+            save_cached_dataset(name, version, df, metadata, checksum=(dataset.details or {}).get("md5_checksum"))
+        except OSError as e:
+            logger.warning(f"Failed to cache dataset {name}: {e}")
+
     return df, metadata
+
+
+def load_titanic_dataset(use_cache: bool = True) -> tuple[pd.DataFrame, DatasetMetadata]:
+    """
+    Load Titanic dataset from scikit-learn (OpenML).
+
+    Args:
+        use_cache: Read from / write to the local dataset cache
+
+    Returns:
+        df: pandas DataFrame
+        metadata: DatasetMetadata extracted from df
+    """
+    return load_openml_dataset("titanic", version=1, use_cache=use_cache)
+
+
+# -------------------------------------------------------
+# Dataset source registry
+# -------------------------------------------------------
+DEFAULT_CHUNKSIZE = 100_000
+
+DATASET_SOURCES: dict[str, type["DatasetSource"]] = {}
+
+
+def register_dataset_source(kind: str) -> Callable[[type["DatasetSource"]], type["DatasetSource"]]:
+    """
+    Class decorator registering a DatasetSource under `kind`.
+
+    Example:
+        @register_dataset_source("csv")
+        class CsvSource(DatasetSource): ...
+    """
+    def decorator(cls: type["DatasetSource"]) -> type["DatasetSource"]:
+        DATASET_SOURCES[kind] = cls
+        return cls
+    return decorator
+
+
+class DatasetSource(ABC):
+    """
+    Base class of dataset sources.
+
+    Subclasses implement iter_chunks(); load() concatenates the chunks
+    unless a subclass provides a faster whole-dataset reader.
+    """
+
+    @abstractmethod
+    def iter_chunks(self, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+        """Yield the dataset as DataFrames of at most `chunksize` rows."""
+
+    def load(self) -> pd.DataFrame:
+        """Load the whole dataset into one DataFrame."""
+        return pd.concat(self.iter_chunks(), ignore_index=True)
+
+    def scan_metadata(self, chunksize: int = DEFAULT_CHUNKSIZE) -> DatasetMetadata:
+        """Compute DatasetMetadata in one streaming pass."""
+        return build_metadata_streaming(self.iter_chunks(chunksize))
+
+
+@register_dataset_source("csv")
+class CsvSource(DatasetSource):
+    """
+    Local CSV file.
+
+    Args:
+        path: CSV file path
+        **read_kwargs: Extra keyword arguments for pandas.read_csv
+    """
+
+    def __init__(self, path: str, **read_kwargs):
+        self.path = path
+        self.read_kwargs = read_kwargs
+
+    def iter_chunks(self, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+        with pd.read_csv(self.path, chunksize=chunksize, **self.read_kwargs) as reader:
+            yield from reader
+
+    def load(self) -> pd.DataFrame:
+        return pd.read_csv(self.path, **self.read_kwargs)
+
+
+@register_dataset_source("parquet")
+class ParquetSource(DatasetSource):
+    """
+    Local Parquet file (requires the optional pyarrow package).
+
+    Args:
+        path: Parquet file path
+        columns: Optional column projection
+    """
+
+    def __init__(self, path: str, columns: list[str] | None = None):
+        self.path = path
+        self.columns = columns
+
+    def iter_chunks(self, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("ParquetSource requires pyarrow. Install it with `uv add pyarrow`.") from e
+
+        parquet_file = pq.ParquetFile(self.path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=self.columns):
+            yield batch.to_pandas()
+
+    def load(self) -> pd.DataFrame:
+        return pd.read_parquet(self.path, columns=self.columns)
+
+
+@register_dataset_source("openml")
+class OpenMLSource(DatasetSource):
+    """
+    OpenML dataset (through the local dataset cache).
+
+    Args:
+        name: OpenML dataset name
+        version: OpenML dataset version
+    """
+
+    def __init__(self, name: str, version: int = 1):
+        self.name = name
+        self.version = version
+
+    def iter_chunks(self, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+        # キャッシュからは memmap で読み込まれるため、スライスはコピーを伴わない
+        df = self.load()
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+
+    def load(self) -> pd.DataFrame:
+        return load_openml_dataset(self.name, version=self.version)[0]
+
+    def scan_metadata(self, chunksize: int = DEFAULT_CHUNKSIZE) -> DatasetMetadata:
+        return load_openml_dataset(self.name, version=self.version)[1]
+
+
+@register_dataset_source("sqlite")
+class SqliteSource(DatasetSource):
+    """
+    Result of a SQL query against a SQLite database file.
+
+    Args:
+        db_path: SQLite database file path
+        query: SELECT statement
+    """
+
+    def __init__(self, db_path: str, query: str):
+        self.db_path = db_path
+        self.query = query
+
+    def _engine(self):
+        from sqlalchemy import create_engine
+
+        return create_engine(f"sqlite:///{self.db_path}")
+
+    def iter_chunks(self, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+        engine = self._engine()
+        try:
+            with engine.connect() as conn:
+                yield from pd.read_sql_query(self.query, conn, chunksize=chunksize)
+        finally:
+            engine.dispose()
+
+    def load(self) -> pd.DataFrame:
+        engine = self._engine()
+        try:
+            with engine.connect() as conn:
+                return pd.read_sql_query(self.query, conn)
+        finally:
+            engine.dispose()
+
+
+def get_dataset_source(kind: str, **options) -> DatasetSource:
+    """
+    Create a registered dataset source.
+
+    Args:
+        kind: Registered source name ("csv", "parquet", "openml", "sqlite", ...)
+        **options: Constructor arguments of the source
+
+    Returns:
+        DatasetSource
+
+    Raises:
+        ValueError: unknown source kind
+    """
+    try:
+        cls = DATASET_SOURCES[kind]
+    except KeyError:
+        raise ValueError(f"Unknown dataset source: {kind} (available: {sorted(DATASET_SOURCES)})") from None
+    return cls(**options)
+
+
+def load_dataset(kind: str, **options) -> tuple[pd.DataFrame, DatasetMetadata]:
+    """
+    Load a whole dataset from a registered source.
+
+    Args:
+        kind: Registered source name
+        **options: Constructor arguments of the source
+
+    Returns:
+        df: pandas DataFrame
+        metadata: DatasetMetadata extracted from df
+    """
+    source = get_dataset_source(kind, **options)
+    if isinstance(source, OpenMLSource):
+        return load_openml_dataset(source.name, version=source.version)
+    df = source.load()
+    return df, build_metadata(df)
@@ -0,0 +1,129 @@
+"""
+Local on-disk cache of parsed datasets.
+
+Layout under settings.cache_dir:
+
+    datasets/<name>/<version>/manifest.json    # CachedDatasetManifest
+    datasets/<name>/<version>/<checksum>/      # columns written by dataset_store
+
+A warm load reads the small manifest and memory-maps the stored columns,
+skipping network I/O, parsing and dtype inference. Copying a populated
+cache directory to another machine allows fully offline runs.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from ..models.data import CachedDatasetManifest, DatasetMetadata, SharedDatasetHandle
+from ..settings import settings
+from ..utils.logger import get_logger
+from .dataset_store import attach_shared_dataset, write_frames
+from .split_cache import dataset_fingerprint, set_dataset_fingerprint
+
+logger = get_logger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+FRAME_NAME = "df"
+
+
+def _dataset_dir(name: str, version: int | str, cache_dir: str | None) -> Path:
+    return Path(cache_dir or settings.cache_dir) / "datasets" / name / str(version)
+
+
+def load_cached_dataset(
+    name: str,
+    version: int | str,
+    cache_dir: str | None = None,
+) -> tuple[pd.DataFrame, DatasetMetadata] | None:
+    """
+    Load a dataset from the local cache.
+
+    Args:
+        name: Dataset name.
+        version: Dataset version.
+        cache_dir: Cache root. Defaults to settings.cache_dir.
+
+    Returns:
+        (df, metadata), or None on cache miss or broken cache entry.
+    """
+    dataset_dir = _dataset_dir(name, version, cache_dir)
+    manifest_path = dataset_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+
+    try:
+        manifest = CachedDatasetManifest.model_validate_json(manifest_path.read_text())
+        handle_dir = dataset_dir / manifest.checksum
+        handle = SharedDatasetHandle(root_dir=str(handle_dir), frames={FRAME_NAME: manifest.frame})
+        frames = attach_shared_dataset(handle)
+    except Exception as e:
+        logger.warning(f"Ignoring broken dataset cache entry {dataset_dir}: {e}")
+        return None
+
+    df = frames[FRAME_NAME]
+    set_dataset_fingerprint(df, manifest.fingerprint)
+    logger.info(f"Loaded dataset {name} (version {version}) from cache: {handle_dir}")
+    return df, manifest.metadata
+
+
+def save_cached_dataset(
+    name: str,
+    version: int | str,
+    df: pd.DataFrame,
+    metadata: DatasetMetadata,
+    checksum: str | None = None,
+    cache_dir: str | None = None,
+) -> Path:
+    """
+    Store a parsed dataset and its metadata in the local cache.
+
+    The data directory is written under a temporary name and renamed, and the
+    manifest is replaced atomically, so concurrent readers never see a partial entry.
+
+    Args:
+        name: Dataset name.
+        version: Dataset version.
+        df: Parsed DataFrame.
+        metadata: Precomputed DatasetMetadata.
+        checksum: Checksum of the source data. Defaults to the content fingerprint.
+        cache_dir: Cache root. Defaults to settings.cache_dir.
+
+    Returns:
+        Path of the written manifest
+    """
+    fingerprint = dataset_fingerprint(df)
+    checksum = checksum or fingerprint[:32]
+
+    dataset_dir = _dataset_dir(name, version, cache_dir)
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    data_dir = dataset_dir / checksum
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{checksum}-", dir=dataset_dir))
+    try:
+        handle = write_frames({FRAME_NAME: df}, tmp_dir)
+        if data_dir.exists():
+            shutil.rmtree(data_dir)
+        os.replace(tmp_dir, data_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    manifest = CachedDatasetManifest(
+        name=name,
+        version=version,
+        checksum=checksum,
+        fingerprint=fingerprint,
+        metadata=metadata,
+        frame=handle.frames[FRAME_NAME],
+    )
+    manifest_path = dataset_dir / MANIFEST_FILE
+    tmp_manifest = dataset_dir / f".{MANIFEST_FILE}.{os.getpid()}.tmp"
+    tmp_manifest.write_text(manifest.model_dump_json(indent=2))
+    os.replace(tmp_manifest, manifest_path)
+
+    logger.info(f"Cached dataset {name} (version {version}) at {data_dir}")
+    return manifest_path
+
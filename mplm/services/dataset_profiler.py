@@ -0,0 +1,120 @@
+"""
+Vectorized dataset profiler.
+
+Computes dtypes, null counts, cardinality, numeric quantiles and top-k
+categories with a fixed number of column-wise vectorized passes instead
+of per-column Python loops, optionally on a row sample, so summary cost
+stays predictable at large row counts.
+"""
+
+import math
+
+import pandas as pd
+
+from ..models.data import ColumnProfile, DatasetProfile
+from ..settings import settings
+
+QUANTILES = {"min": 0.0, "25%": 0.25, "50%": 0.5, "75%": 0.75, "max": 1.0}
+
+
+def _float_or_none(value) -> float | None:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def profile_dataset(
+    df: pd.DataFrame,
+    sample_rows: int | None = settings.profile_sample_rows,
+    top_k: int = 5,
+    random_seed: int | None = settings.default_random_seed,
+) -> DatasetProfile:
+    """
+    Profile a dataset.
+
+    Null counts and dtypes always use all rows; cardinality, quantiles and
+    top-k values use a random sample of `sample_rows` rows when the dataset
+    is larger than that.
+
+    Args:
+        df: pandas DataFrame
+        sample_rows: Max rows used for unique/quantile/top-k statistics (None → all rows)
+        top_k: Number of most frequent values reported for non-numeric columns
+        random_seed: Seed for row sampling
+
+    Returns:
+        DatasetProfile
+    """
+    missing = df.isna().sum()
+
+    if sample_rows is not None and len(df) > sample_rows:
+        sample = df.sample(n=sample_rows, random_state=random_seed)
+    else:
+        sample = df
+
+    unique = sample.nunique(dropna=True)
+
+    numeric = sample.select_dtypes(include="number")
+    if numeric.shape[1] > 0:
+        quantiles = numeric.quantile(list(QUANTILES.values()))
+        means = numeric.mean()
+        stds = numeric.std()
+    else:
+        quantiles = means = stds = None
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        profile = ColumnProfile(
+            name=str(col),
+            dtype=str(df.dtypes.iloc[i]),
+            missing=int(missing.iloc[i]),
+            unique=int(unique.iloc[i]),
+        )
+        if col in numeric.columns:
+            profile.quantiles = {
+                label: _float_or_none(quantiles.at[q, col])
+                for label, q in QUANTILES.items()
+            }
+            profile.mean = _float_or_none(means[col])
+            profile.std = _float_or_none(stds[col])
+        elif top_k > 0:
+            counts = sample.iloc[:, i].value_counts(dropna=True, sort=True).head(top_k)
+            profile.top_values = [(str(value), int(count)) for value, count in counts.items()]
+        columns.append(profile)
+
+    return DatasetProfile(num_rows=len(df), sampled_rows=len(sample), columns=columns)
+
+
+def format_profile(profile: DatasetProfile) -> str:
+    """
+    Render a DatasetProfile as human readable text (used for prompts and summaries).
+
+    Args:
+        profile: DatasetProfile
+
+    Returns:
+        str summary
+    """
+    lines = [f"Rows: {profile.num_rows}"]
+    if profile.sampled_rows < profile.num_rows:
+        lines.append(f"(unique/quantile/top values computed on a sample of {profile.sampled_rows} rows)")
+    lines.append("Columns:")
+
+    for col in profile.columns:
+        parts = [f"{col.dtype}", f"missing={col.missing}", f"unique={col.unique}"]
+        if col.quantiles is not None:
+            parts.extend(
+                f"{label}={value:.4g}" for label, value in col.quantiles.items() if value is not None
+            )
+            if col.mean is not None:
+                parts.append(f"mean={col.mean:.4g}")
+            if col.std is not None:
+                parts.append(f"std={col.std:.4g}")
+        if col.top_values:
+            top = ", ".join(f"{value!r}:{count}" for value, count in col.top_values)
+            parts.append(f"top=[{top}]")
+        lines.append(f"  {col.name}: " + ", ".join(parts))
+
+    return "\n".join(lines)
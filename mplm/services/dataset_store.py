@@ -0,0 +1,150 @@
+"""
+Memory-mapped dataset store.
+
+Split DataFrames are written once, column by column, as .npy files.
+Worker processes attach to them with copy-on-write memory maps, so every
+worker reads the same physical pages without unpickling or copying the
+data, while in-place modifications made by generated code stay private to
+the worker that made them.
+
+Columns that numpy cannot memory-map (object/string columns, extension
+dtypes) are stored as pickles and loaded on attach.
+"""
+
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..models.data import SharedDatasetHandle, StoredColumn, StoredFrame
+from ..settings import settings
+
+
+def _store_array(values, root: Path, file: str) -> None:
+    np.save(root / file, values, allow_pickle=False)
+
+
+def _store_pickle(obj, root: Path, file: str) -> None:
+    with open(root / file, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _is_mappable(dtype) -> bool:
+    return isinstance(dtype, np.dtype) and not dtype.hasobject
+
+
+def _store_series(name, series: pd.Series, root: Path, file: str) -> StoredColumn:
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        _store_array(series.cat.codes.to_numpy(), root, file + ".npy")
+        return StoredColumn(
+            name=name,
+            kind="categorical",
+            file=file + ".npy",
+            categories=list(dtype.categories),
+            ordered=bool(dtype.ordered),
+        )
+    if _is_mappable(dtype):
+        _store_array(series.to_numpy(), root, file + ".npy")
+        return StoredColumn(name=name, kind="array", file=file + ".npy")
+    _store_pickle(series.to_numpy(), root, file + ".pkl")
+    return StoredColumn(name=name, kind="pickle", file=file + ".pkl")
+
+
+def _store_index(index: pd.Index, root: Path, file: str) -> StoredColumn:
+    if not isinstance(index, pd.MultiIndex) and _is_mappable(index.dtype):
+        _store_array(index.to_numpy(), root, file + ".npy")
+        return StoredColumn(name=index.name, kind="array", file=file + ".npy")
+    _store_pickle(index, root, file + ".pkl")
+    return StoredColumn(name=index.name, kind="pickle", file=file + ".pkl")
+
+
+def _load_column(column: StoredColumn, root: Path):
+    path = root / column.file
+    if column.kind == "pickle":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    # 共有メモリはそのままに、np.memmap サブクラスではなく通常の ndarray として見せる
+    values = np.load(path, mmap_mode="c").view(np.ndarray)
+    if column.kind == "categorical":
+        dtype = pd.CategoricalDtype(column.categories, ordered=column.ordered)
+        return pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+    return values
+
+
+def write_frames(frames: dict[str, pd.DataFrame], root: str | Path) -> SharedDatasetHandle:
+    """
+    Write DataFrames column by column into an existing directory.
+
+    Args:
+        frames: Mapping of frame name → DataFrame.
+        root: Target directory (must exist).
+
+    Returns:
+        SharedDatasetHandle pointing at `root`
+    """
+    root = Path(root)
+    stored: dict[str, StoredFrame] = {}
+    for frame_name, df in frames.items():
+        columns = [
+            _store_series(col, df.iloc[:, i], root, f"{frame_name}.c{i}")
+            for i, col in enumerate(df.columns)
+        ]
+        stored[frame_name] = StoredFrame(
+            columns=columns,
+            index=_store_index(df.index, root, f"{frame_name}.index"),
+            num_rows=len(df),
+        )
+    return SharedDatasetHandle(root_dir=str(root), frames=stored)
+
+
+def create_shared_dataset(frames: dict[str, pd.DataFrame], root_dir: str | None = None) -> SharedDatasetHandle:
+    """
+    Write DataFrames to a new store directory.
+
+    Args:
+        frames: Mapping of frame name → DataFrame (e.g. {"df_train": ..., "df_val": ..., "df_test": ...}).
+        root_dir: Parent directory for the store. Defaults to settings.shared_dataset_dir
+            (system temp directory if unset).
+
+    Returns:
+        SharedDatasetHandle (small, picklable; pass it to workers)
+    """
+    root = tempfile.mkdtemp(prefix="mplm-dataset-", dir=root_dir or settings.shared_dataset_dir)
+    return write_frames(frames, root)
+
+
+def attach_shared_dataset(handle: SharedDatasetHandle) -> dict[str, pd.DataFrame]:
+    """
+    Attach to a store created by create_shared_dataset.
+
+    Numeric and categorical columns are copy-on-write memory maps of the stored
+    files; writes made through the returned DataFrames never reach the files.
+
+    Args:
+        handle: SharedDatasetHandle
+
+    Returns:
+        Mapping of frame name → DataFrame
+    """
+    root = Path(handle.root_dir)
+    frames = {}
+    for frame_name, frame in handle.frames.items():
+        index = _load_column(frame.index, root)
+        if not isinstance(index, pd.Index):
+            index = pd.Index(index, name=frame.index.name, copy=False)
+        data = {i: _load_column(column, root) for i, column in enumerate(frame.columns)}
+        df = pd.DataFrame(data, index=index, copy=False)
+        df.columns = pd.Index([column.name for column in frame.columns])
+        frames[frame_name] = df
+    return frames
+
+
+def delete_shared_dataset(handle: SharedDatasetHandle) -> None:
+    """
+    Remove the store directory. Workers that already attached keep their mappings.
+    """
+    shutil.rmtree(handle.root_dir, ignore_errors=True)
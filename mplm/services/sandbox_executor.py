@@ -0,0 +1,356 @@
+"""
+Sandboxed execution engine for LLM-generated training code.
+
+Each program runs in a pre-started worker process instead of the
+orchestrator process. The parent enforces a wall-clock timeout and an
+RSS limit per run, kills the worker on violation and replaces it, and
+recycles healthy workers after a fixed number of runs so that memory
+leaked by previous attempts is reclaimed.
+
+Datasets are handed to workers through the memory-mapped dataset store
+(see dataset_store.py): the split frames are written once and every run
+only sends a small handle over the pipe.
+"""
+
+import atexit
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from multiprocessing.connection import Connection
+from typing import Any
+
+from ..models.data import SharedDatasetHandle
+from ..models.training import TrainExecutionResult
+from ..settings import settings
+from ..utils.exceptions import CodeExecutionError, CodeExecutionMemoryError, CodeExecutionTimeoutError
+from ..utils.logger import get_logger
+from .dataset_store import attach_shared_dataset, create_shared_dataset, delete_shared_dataset
+
+logger = get_logger(__name__)
+
+POLL_INTERVAL_SEC = 0.1
+MAX_SHARED_DATASETS = 2
+
+
+def read_rss_bytes(pid: int) -> int | None:
+    """
+    Read the resident set size of a process.
+
+    Args:
+        pid: Process id.
+
+    Returns:
+        RSS in bytes, or None if it cannot be determined (non-Linux or process gone).
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return rss_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _worker_main(conn: Connection) -> None:
+    """
+    Worker process loop: receive a job, run it, send back ("ok", result) or ("error", message).
+    A None job (or a closed pipe) stops the worker.
+    """
+    from .training_executor import run_training_code
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+
+        try:
+            if job.get("dataset") is not None:
+                # 実行ごとに attach し直す（前回の実行による in-place 変更を持ち越さない）
+                frames = attach_shared_dataset(job["dataset"])
+            else:
+                frames = job
+            result = run_training_code(
+                code=job["code"],
+                df_train=frames["df_train"],
+                df_val=frames["df_val"],
+                df_test=frames["df_test"],
+            )
+        except Exception as e:
+            conn.send(("error", str(e)))
+            continue
+
+        try:
+            conn.send(("ok", result))
+        except Exception as e:
+            conn.send(("error", f"Trained model could not be sent back from sandbox worker: {e}"))
+
+
+class _Worker:
+    """A single worker process and the parent end of its pipe."""
+
+    def __init__(self, ctx):
+        parent_conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=False)
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.runs = 0
+
+    @property
+    def pid(self) -> int | None:
+        return self.process.pid
+
+    def stop(self, kill: bool = False) -> None:
+        """Stop the worker, gracefully unless `kill` is True."""
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class SandboxExecutor:
+    """
+    Pool of pre-started worker processes executing training code with resource limits.
+
+    `run()` is thread-safe: concurrent callers are served by different workers
+    and block until one becomes idle.
+
+    Args:
+        num_workers: Number of worker processes.
+        timeout_sec: Wall-clock limit per run.
+        max_rss_mb: RSS limit of a worker in MB (None → unlimited).
+        max_runs_per_worker: Worker is replaced after this many runs.
+        start_method: multiprocessing start method ("spawn", "forkserver", "fork").
+    """
+
+    def __init__(
+        self,
+        num_workers: int = settings.execution_num_workers,
+        timeout_sec: float = settings.execution_timeout_sec,
+        max_rss_mb: int | None = settings.execution_max_rss_mb,
+        max_runs_per_worker: int = settings.execution_max_runs_per_worker,
+        start_method: str = settings.execution_start_method,
+    ):
+        if num_workers < 1:
+            raise ValueError("num_workers must be >= 1")
+        self.num_workers = num_workers
+        self.timeout_sec = timeout_sec
+        self.max_rss_mb = max_rss_mb
+        self.max_runs_per_worker = max_runs_per_worker
+        self._ctx = mp.get_context(start_method)
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._shared: OrderedDict[Hashable, tuple[Any, SharedDatasetHandle]] = OrderedDict()
+        for _ in range(num_workers):
+            self._idle.put(_Worker(self._ctx))
+
+    def __enter__(self) -> "SandboxExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def share_frames(
+        self,
+        key: Hashable,
+        make_frames: Callable[[], dict[str, Any]],
+        keepalive: Any = None,
+    ) -> SharedDatasetHandle:
+        """
+        Return the shared dataset for `key`, creating it with `make_frames()` on first use.
+
+        The most recent MAX_SHARED_DATASETS datasets are kept; older ones are deleted.
+
+        Args:
+            key: Cache key identifying the dataset and its split.
+            make_frames: Builds {"df_train": ..., "df_val": ..., "df_test": ...}.
+            keepalive: Object kept referenced while the dataset is cached
+                (e.g. the source DataFrame when `key` contains its id()).
+
+        Returns:
+            SharedDatasetHandle
+        """
+        with self._lock:
+            if key in self._shared:
+                self._shared.move_to_end(key)
+                return self._shared[key][1]
+
+        handle = create_shared_dataset(make_frames())
+
+        with self._lock:
+            self._shared[key] = (keepalive, handle)
+            evicted = []
+            while len(self._shared) > MAX_SHARED_DATASETS:
+                evicted.append(self._shared.popitem(last=False)[1][1])
+        for old in evicted:
+            delete_shared_dataset(old)
+        return handle
+
+    def run(
+        self,
+        code: str,
+        *,
+        dataset: SharedDatasetHandle | None = None,
+        df_train=None,
+        df_val=None,
+        df_test=None,
+        timeout_sec: float | None = None,
+    ) -> TrainExecutionResult:
+        """
+        Execute training code in a worker process.
+
+        Args:
+            code: Training code string.
+            dataset: Shared dataset holding df_train/df_val/df_test (see share_frames).
+            df_train, df_val, df_test: Split datasets pickled to the worker (used if dataset is None).
+            timeout_sec: Optional override of the per-run wall-clock limit.
+
+        Returns:
+            TrainExecutionResult (model_path is not set)
+
+        Raises:
+            CodeExecutionTimeoutError: time budget exceeded (worker is killed).
+            CodeExecutionMemoryError: RSS budget exceeded (worker is killed).
+            CodeExecutionError: code raised or the worker died.
+        """
+        if self._closed:
+            raise RuntimeError("SandboxExecutor is closed.")
+
+        job = {"code": code, "dataset": dataset, "df_train": df_train, "df_val": df_val, "df_test": df_test}
+        worker = self._acquire()
+        replace = False
+        try:
+            status, payload = self._run_on_worker(worker, job, timeout_sec or self.timeout_sec)
+            worker.runs += 1
+        except CodeExecutionError:
+            replace = True
+            raise
+        finally:
+            if replace or worker.runs >= self.max_runs_per_worker:
+                self._replace(worker, kill=replace)
+            else:
+                self._release(worker)
+
+        if status == "error":
+            raise CodeExecutionError(payload)
+        return payload
+
+    def _acquire(self) -> _Worker:
+        # close() 後はワーカーがプールに戻らないので、待ち続けずに失敗させる
+        while True:
+            try:
+                worker = self._idle.get(timeout=POLL_INTERVAL_SEC)
+            except queue.Empty:
+                if self._closed:
+                    raise RuntimeError("SandboxExecutor is closed.") from None
+                continue
+            if self._closed:
+                worker.stop()
+                raise RuntimeError("SandboxExecutor is closed.")
+            return worker
+
+    def _run_on_worker(self, worker: _Worker, job: dict[str, Any], timeout_sec: float) -> tuple[str, Any]:
+        try:
+            worker.conn.send(job)
+        except (OSError, ValueError) as e:
+            raise CodeExecutionError(f"Failed to send job to sandbox worker: {e}") from e
+
+        max_rss_bytes = self.max_rss_mb * 1024 * 1024 if self.max_rss_mb else None
+        deadline = time.monotonic() + timeout_sec
+        while not worker.conn.poll(POLL_INTERVAL_SEC):
+            if not worker.process.is_alive():
+                raise CodeExecutionError(f"Sandbox worker died while executing code (exit code {worker.process.exitcode}).")
+            if max_rss_bytes is not None:
+                rss = read_rss_bytes(worker.pid)
+                if rss is not None and rss > max_rss_bytes:
+                    raise CodeExecutionMemoryError(
+                        f"Training code exceeded memory limit ({rss / 1024 / 1024:.0f}MB > {self.max_rss_mb}MB)."
+                    )
+            if time.monotonic() > deadline:
+                raise CodeExecutionTimeoutError(f"Training code exceeded time limit ({timeout_sec:.0f} sec).")
+
+        try:
+            return worker.conn.recv()
+        except (EOFError, OSError) as e:
+            raise CodeExecutionError(f"Sandbox worker died while sending result: {e}") from e
+
+    def _release(self, worker: _Worker) -> None:
+        # close() 中に実行していたワーカーは close() の停止対象から漏れるので、ここで止める
+        with self._lock:
+            if not self._closed:
+                self._idle.put(worker)
+                return
+        worker.stop()
+
+    def _replace(self, worker: _Worker, kill: bool) -> None:
+        logger.info(f"Recycling sandbox worker pid={worker.pid} (runs={worker.runs}, kill={kill})")
+        worker.stop(kill=kill)
+        with self._lock:
+            if self._closed:
+                return
+            self._idle.put(_Worker(self._ctx))
+
+    def close(self) -> None:
+        """
+        Stop all idle workers and delete shared datasets. Safe to call more than once.
+
+        Workers busy in run() are stopped when their run finishes.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            shared = [handle for _, handle in self._shared.values()]
+            self._shared.clear()
+        for handle in shared:
+            delete_shared_dataset(handle)
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+
+
+_default_executor: SandboxExecutor | None = None
+_default_executor_lock = threading.Lock()
+
+
+def get_default_executor() -> SandboxExecutor | None:
+    """
+    Return the process-wide executor selected by settings.execution_backend.
+
+    The pool has at least settings.num_training_candidates workers so that
+    parallel training candidates are not serialized on a smaller pool.
+
+    Returns:
+        None for "inprocess" (caller runs exec() itself), a shared SandboxExecutor for "sandbox".
+    """
+    global _default_executor
+
+    backend = settings.execution_backend
+    if backend == "inprocess":
+        return None
+    if backend != "sandbox":
+        raise ValueError(f"Unknown execution_backend: {backend}")
+
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = SandboxExecutor(num_workers=max(settings.execution_num_workers, settings.num_training_candidates))
+            atexit.register(_default_executor.close)
+        return _default_executor
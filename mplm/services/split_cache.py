@@ -0,0 +1,182 @@
+"""
+Cache of train/val/test split indices.
+
+Splits are identified by the dataset content fingerprint, the random seed
+and the split ratios. Only the integer position arrays are cached (in
+memory and as .npz files under settings.cache_dir), and the split
+DataFrames are materialized lazily from them on first access.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import weakref
+from collections import OrderedDict
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..settings import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TEST_SIZE = 0.2
+VAL_SIZE = 0.15
+MAX_MEMORY_ENTRIES = 16
+
+_fingerprints: dict[int, str] = {}
+_splits: OrderedDict[tuple, tuple[np.ndarray, np.ndarray, np.ndarray]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame (values, index, column names and dtypes).
+
+    The result is memoized per DataFrame object for its lifetime, so repeated
+    calls during a run cost nothing. Do not mutate a DataFrame after hashing it.
+
+    Args:
+        df: pandas DataFrame
+
+    Returns:
+        Hex digest string
+    """
+    key = id(df)
+    with _lock:
+        cached = _fingerprints.get(key)
+    if cached is not None:
+        return cached
+
+    h = hashlib.sha256()
+    h.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    try:
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    except TypeError:
+        # unhashable cell values (lists, dicts, ...)
+        h.update(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+    fingerprint = h.hexdigest()
+
+    set_dataset_fingerprint(df, fingerprint)
+    return fingerprint
+
+
+def set_dataset_fingerprint(df: pd.DataFrame, fingerprint: str) -> None:
+    """
+    Register a known fingerprint for a DataFrame object (e.g. one loaded from a
+    cache that stored it), so dataset_fingerprint() does not have to hash it.
+    """
+    key = id(df)
+    with _lock:
+        _fingerprints[key] = fingerprint
+    weakref.finalize(df, _fingerprints.pop, key, None)
+
+
+class DatasetSplit:
+    """
+    Train/val/test row positions of a dataset with lazily materialized frames.
+
+    Attributes:
+        df: Source DataFrame.
+        train_idx, val_idx, test_idx: Row positions (np.ndarray of int).
+    """
+
+    def __init__(self, df: pd.DataFrame, train_idx: np.ndarray, val_idx: np.ndarray, test_idx: np.ndarray):
+        self.df = df
+        self.train_idx = train_idx
+        self.val_idx = val_idx
+        self.test_idx = test_idx
+
+    @cached_property
+    def df_train(self) -> pd.DataFrame:
+        return self.df.iloc[self.train_idx]
+
+    @cached_property
+    def df_val(self) -> pd.DataFrame:
+        return self.df.iloc[self.val_idx]
+
+    @cached_property
+    def df_test(self) -> pd.DataFrame:
+        return self.df.iloc[self.test_idx]
+
+    def frames(self) -> dict[str, pd.DataFrame]:
+        """Return {"df_train": ..., "df_val": ..., "df_test": ...}."""
+        return {"df_train": self.df_train, "df_val": self.df_val, "df_test": self.df_test}
+
+
+def _compute_split_indices(num_rows: int, random_seed: int | None, test_size: float, val_size: float):
+    from sklearn.model_selection import train_test_split  # キャッシュにヒットすれば sklearn を読み込まない
+
+    # DataFrame を直接分割した場合と同じ位置になる（train_test_split は行数のみから並びを決める）
+    positions = np.arange(num_rows)
+    train_full, test = train_test_split(positions, test_size=test_size, random_state=random_seed, shuffle=True)
+    train, val = train_test_split(train_full, test_size=val_size, random_state=random_seed, shuffle=True)
+    return train, val, test
+
+
+def _cache_file(key: tuple) -> Path:
+    fingerprint, seed, test_size, val_size = key
+    return Path(settings.cache_dir) / "splits" / f"{fingerprint}-{seed}-{test_size}-{val_size}.npz"
+
+
+def get_dataset_split(
+    df: pd.DataFrame,
+    random_seed: int | None = settings.default_random_seed,
+    test_size: float = TEST_SIZE,
+    val_size: float = VAL_SIZE,
+) -> DatasetSplit:
+    """
+    Return the train/val/test split of df, reusing cached indices when available.
+
+    Lookup order: in-memory cache → .npz file in settings.cache_dir → compute.
+    random_seed=None means a non-reproducible split, which is never cached.
+
+    Args:
+        df: pandas DataFrame
+        random_seed: random seed for train/val/test split
+        test_size: fraction of rows used for test
+        val_size: fraction of the remaining rows used for validation
+
+    Returns:
+        DatasetSplit
+    """
+    if random_seed is None:
+        return DatasetSplit(df, *_compute_split_indices(len(df), None, test_size, val_size))
+
+    key = (dataset_fingerprint(df), random_seed, test_size, val_size)
+    with _lock:
+        indices = _splits.get(key)
+        if indices is not None:
+            _splits.move_to_end(key)
+    if indices is not None:
+        return DatasetSplit(df, *indices)
+
+    path = _cache_file(key)
+    if path.exists():
+        try:
+            with np.load(path) as npz:
+                indices = (npz["train"], npz["val"], npz["test"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring broken split cache file {path}: {e}")
+            indices = None
+
+    if indices is None:
+        indices = _compute_split_indices(len(df), random_seed, test_size, val_size)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, train=indices[0], val=indices[1], test=indices[2])
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write split cache file {path}: {e}")
+
+    with _lock:
+        _splits[key] = indices
+        while len(_splits) > MAX_MEMORY_ENTRIES:
+            _splits.popitem(last=False)
+    return DatasetSplit(df, *indices)
@@ -0,0 +1,117 @@
+"""
+Dataset summary cache.
+
+Generated summaries are stored in the run database (summary_cache table)
+keyed on the dataset content fingerprint and the summary prompt version,
+so a re-run on an unchanged dataset can skip the summary LLM call and
+the execution of the summary code.
+
+Modes (settings.summary_cache_mode):
+    off: never reuse summaries
+    latest: reuse the most recently generated summary
+    best: reuse one of the N summaries whose runs reached the best validation accuracy
+"""
+
+import random
+
+import pandas as pd
+
+from ..db.crud import (
+    create_summary_cache_record,
+    get_summary_cache_records,
+    mark_summary_cache_used,
+    update_summary_cache_accuracy,
+)
+from ..db.session import get_session
+from ..models.summary import SummaryResult
+from ..prompts.summary import SUMMARY_PROMPT_VERSION
+from ..settings import settings
+from ..utils.logger import get_logger
+from .split_cache import dataset_fingerprint
+
+logger = get_logger(__name__)
+
+SUMMARY_CACHE_MODES = ("off", "latest", "best")
+
+
+def load_cached_summary(
+    df: pd.DataFrame,
+    mode: str | None = None,
+    best_n: int | None = None,
+    db_path: str | None = None,
+) -> SummaryResult | None:
+    """
+    Look up a stored summary for df.
+
+    Args:
+        df: pandas DataFrame
+        mode: "off", "latest" or "best". Defaults to settings.summary_cache_mode.
+        best_n: Number of best summaries to choose from in "best" mode. Defaults to settings.summary_cache_best_n.
+        db_path: SQLite file. Defaults to settings.db_file.
+
+    Returns:
+        SummaryResult (with cache_id set), or None on cache miss / mode "off".
+    """
+    mode = mode or settings.summary_cache_mode
+    if mode not in SUMMARY_CACHE_MODES:
+        raise ValueError(f"Unknown summary cache mode: {mode}")
+    if mode == "off":
+        return None
+
+    limit = max(best_n or settings.summary_cache_best_n, 1) if mode == "best" else 1
+
+    SessionLocal = get_session(db_path or settings.db_file)
+    with SessionLocal() as db:
+        records = get_summary_cache_records(
+            db,
+            dataset_fingerprint=dataset_fingerprint(df),
+            prompt_version=SUMMARY_PROMPT_VERSION,
+            order_by=mode,
+            limit=limit,
+        )
+        if not records:
+            return None
+        record = random.choice(records)
+        mark_summary_cache_used(db, record.id)
+        result = SummaryResult(
+            summary_text=record.summary_text,
+            summary_code=record.summary_code,
+            cache_id=record.id,
+        )
+
+    logger.info(f"Reusing cached summary {result.cache_id} ({mode})")
+    return result
+
+
+def store_summary(df: pd.DataFrame, result: SummaryResult, db_path: str | None = None) -> int:
+    """
+    Store a generated summary and set result.cache_id.
+
+    Args:
+        df: Dataset the summary was generated for.
+        result: SummaryResult
+        db_path: SQLite file. Defaults to settings.db_file.
+
+    Returns:
+        summary_cache row id
+    """
+    SessionLocal = get_session(db_path or settings.db_file)
+    with SessionLocal() as db:
+        record = create_summary_cache_record(
+            db,
+            dataset_fingerprint=dataset_fingerprint(df),
+            prompt_version=SUMMARY_PROMPT_VERSION,
+            summary_text=result.summary_text,
+            summary_code=result.summary_code,
+        )
+        result.cache_id = record.id
+    return result.cache_id
+
+
+def record_summary_accuracy(cache_id: int, accuracy_val: float, db_path: str | None = None) -> None:
+    """
+    Record the validation accuracy reached with a cached summary (used by "best" mode).
+    """
+    SessionLocal = get_session(db_path or settings.db_file)
+    with SessionLocal() as db:
+        update_summary_cache_accuracy(db, cache_id, accuracy_val)
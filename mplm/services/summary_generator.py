@@ -9,9 +9,14 @@ import pandas as pd
 from ..llm import get_llm
 from ..models.summary import SummaryResult
 from ..prompts.summary import SUMMARY_CODE_PROMPT
+from ..settings import settings
 from ..utils.exceptions import CodeExecutionError
 from ..utils.logger import get_logger
-from .code_parser import extract_code_from_block
+from ..utils.tracing import llm_span, observe_stream, record_llm_usage, span
+from .code_executor import execute_code
+from .code_parser import CodeBlockStreamParser, extract_code_from_block, extract_code_from_stream
+from .code_validator import validate_summary_code
+from .dataset_profiler import format_profile, profile_dataset
 
 logger = get_logger(__name__)
 
@@ -26,15 +31,7 @@ def fixed_summary_logic(df) -> str:
     Returns:
         str summary
     """
-    lines = [
-        f"Rows: {len(df)}",
-        "Columns:",
-    ]
-
-    for col in df.columns:
-        lines.append(f"  {col}: {df[col].dtype}, missing={df[col].isna().sum()}")
-
-    return "\n".join(lines)
+    return format_profile(profile_dataset(df))
 
 
 def generate_summary_with_llm(
@@ -65,26 +62,41 @@ def generate_summary_with_llm(
         training_code_error=training_code_error,
     )
 
-    llm_res = llm.invoke(prompt)
-    if isinstance(llm_res, str):
-        llm_res_str = llm_res
-    elif hasattr(llm_res, 'content'):
-        llm_res_str = llm_res.content
+    if settings.llm_streaming:
+        parser = CodeBlockStreamParser()
+        try:
+            with llm_span("llm.summary_code", llm) as record:
+                code = extract_code_from_stream(observe_stream(llm.stream(prompt), record), parser=parser)
+        except ValueError as e:
+            if debug:
+                logger.info(f"llm_res_str : {parser.text}")
+            raise e
     else:
-        raise RuntimeError(f'unsupported response format : {llm_res}')
-    try:
-        code = extract_code_from_block(llm_res_str)
-    except ValueError as e:
-        if debug:
-            logger.info(f"llm_res_str : {llm_res_str}")
-        raise e
+        with llm_span("llm.summary_code", llm) as record:
+            llm_res = llm.invoke(prompt)
+            record_llm_usage(record, llm_res)
+        if isinstance(llm_res, str):
+            llm_res_str = llm_res
+        elif hasattr(llm_res, 'content'):
+            llm_res_str = llm_res.content
+        else:
+            raise RuntimeError(f'unsupported response format : {llm_res}')
+        try:
+            code = extract_code_from_block(llm_res_str)
+        except ValueError as e:
+            if debug:
+                logger.info(f"llm_res_str : {llm_res_str}")
+            raise e
 
     # logger.info("Generated summary code from LLM:\n%s", code)
 
+    validate_summary_code(code)
+
     local_vars: dict[str, Any] = {"df": df}
 
     try:
-        exec(code, {}, local_vars)
+        with span("exec.summary", kind="exec"):
+            execute_code(code, {}, local_vars)
     except Exception as e:
         logger.error('Generated code with error : \n')
         if debug:
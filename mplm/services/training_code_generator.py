@@ -3,9 +3,11 @@ Generate ML training/evaluation code using LLM.
 """
 
 from ..llm import get_llm
-from ..prompts.train_code import FIX_ERROR_CODE_PROMPT, TRAIN_CODE_PROMPT
+from ..prompts.train_code import CANDIDATE_HINT, FIX_ERROR_CODE_PROMPT, TRAIN_CODE_PROMPT
+from ..settings import settings
 from ..utils.logger import get_logger
-from .code_parser import extract_code_from_block
+from ..utils.tracing import aobserve_stream, llm_span, observe_stream, record_llm_usage
+from .code_parser import aextract_code_from_stream, extract_code_from_block, extract_code_from_stream
 
 logger = get_logger(__name__)
 
@@ -38,7 +40,12 @@ def generate_training_code(
         training_code_error=training_code_error,
     )
 
-    llm_res = llm.invoke(prompt)
+    with llm_span("llm.train_code", llm) as record:
+        if settings.llm_streaming:
+            return extract_code_from_stream(observe_stream(llm.stream(prompt), record))
+        llm_res = llm.invoke(prompt)
+        record_llm_usage(record, llm_res)
+
     if isinstance(llm_res, str):
         llm_res_str = llm_res
     elif hasattr(llm_res, 'content'):
@@ -53,6 +60,58 @@ def generate_training_code(
     return code
 
 
+async def agenerate_training_code(
+    dataset_summary: str,
+    target_column: str,
+    candidate_index: int = 0,
+    num_candidates: int = 1,
+    training_code_error: str = 'no error',
+    llm=None,
+) -> str:
+    """
+    Async variant of generate_training_code used for parallel candidate generation.
+
+    When several candidates are requested, the prompt asks each one for a
+    different approach (this also keeps their LLM cache keys distinct).
+
+    Args:
+        dataset_summary: Dataset summary string
+        target_column: Name of the target variable
+        candidate_index: Index of this candidate (0-based)
+        num_candidates: Total number of candidates generated in parallel
+        llm: Optional LLM client instance
+
+    Returns:
+        str: Python code string
+    """
+
+    if llm is None:
+        llm = get_llm()
+
+    prompt = TRAIN_CODE_PROMPT.format(
+        dataset_summary=dataset_summary,
+        target_column=target_column,
+        training_code_error=training_code_error,
+    )
+    if num_candidates > 1:
+        prompt += CANDIDATE_HINT.format(index=candidate_index + 1, total=num_candidates)
+
+    with llm_span("llm.train_code", llm, candidate=candidate_index) as record:
+        if settings.llm_streaming:
+            return await aextract_code_from_stream(aobserve_stream(llm.astream(prompt), record))
+        llm_res = await llm.ainvoke(prompt)
+        record_llm_usage(record, llm_res)
+
+    if isinstance(llm_res, str):
+        llm_res_str = llm_res
+    elif hasattr(llm_res, 'content'):
+        llm_res_str = llm_res.content
+    else:
+        raise RuntimeError(f'unsupported response format : {llm_res}')
+
+    return extract_code_from_block(llm_res_str)
+
+
 def generate_error_fixed_training_code(
     previous_code: str,
     previous_error: str,
@@ -83,7 +142,12 @@ def generate_error_fixed_training_code(
         target_column=target_column,
     )
 
-    llm_res = llm.invoke(prompt)
+    with llm_span("llm.fix_train_code", llm) as record:
+        if settings.llm_streaming:
+            return extract_code_from_stream(observe_stream(llm.stream(prompt), record))
+        llm_res = llm.invoke(prompt)
+        record_llm_usage(record, llm_res)
+
     if isinstance(llm_res, str):
         llm_res_str = llm_res
     elif hasattr(llm_res, "content"):
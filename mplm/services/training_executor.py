@@ -2,40 +2,54 @@
 Executes LLM-generated training/evaluation code.
 """
 
+import time
 from typing import Any
 
-from sklearn.model_selection import train_test_split
-
 from ..models.training import TrainExecutionResult
 from ..settings import settings
 from ..utils.exceptions import CodeExecutionError
 from ..utils.fileio import save_pickle
 from ..utils.logger import get_logger
+from ..utils.tracing import peak_rss_mb, span
+from .code_executor import execute_code
+from .code_validator import validate_training_code
+from .sandbox_executor import SandboxExecutor, get_default_executor
+from .split_cache import dataset_fingerprint, get_dataset_split
 
 logger = get_logger(__name__)
 
 
-def execute_training_code(
-    df,
-    code: str,
-    model_output_path: str | None = None,
-    random_seed: int | None = settings.default_random_seed,
-) -> TrainExecutionResult:
+def split_dataset(df, random_seed: int | None = settings.default_random_seed):
     """
-    Execute training code generated by LLM.
+    Split dataset into train/val/test (68% / 12% / 20%).
+
+    Split indices are cached per dataset fingerprint and seed (see split_cache.py),
+    so retries and repeated runs on the same data do not recompute the split.
 
     Args:
         df: pandas DataFrame
-        code: Training code string
-        model_output_path: pickle model output filepath
         random_seed: random seed for train/val/test split
 
     Returns:
-        TrainExecutionResult
+        (df_train, df_val, df_test)
+    """
+    split = get_dataset_split(df, random_seed=random_seed)
+    return split.df_train, split.df_val, split.df_test
+
+
+def run_training_code(code: str, df_train, df_val, df_test) -> TrainExecutionResult:
     """
-    df_train_full, df_test = train_test_split(df, test_size=0.2, random_state=random_seed, shuffle=True)
-    df_train, df_val = train_test_split(df_train_full, test_size=0.15, random_state=random_seed, shuffle=True)
+    Execute training code on already split datasets in the current process.
 
+    Args:
+        code: Training code string
+        df_train: training DataFrame
+        df_val: validation DataFrame
+        df_test: test DataFrame
+
+    Returns:
+        TrainExecutionResult (model_path is not set)
+    """
     # local_vars に分割済みデータフレームを渡す
     local_vars: dict[str, Any] = {
         "df_train": df_train,
@@ -45,12 +59,17 @@ def execute_training_code(
 
     # logger.info("Executing training code:\n%s", code)
 
+    cpu_start = time.process_time()
     try:
-        exec(code, {}, local_vars)
+        timings = execute_code(code, {}, local_vars)
     except Exception as e:
         logger.error('Error occured when executing generated training code')
         # logger.error(code)
         raise CodeExecutionError(f"Error executing training code: {e}") from e
+    logger.info(
+        f"Training code executed (compile {timings.compile_sec:.3f}s"
+        f"{', cached' if timings.cache_hit else ''}, run {timings.run_sec:.1f}s)"
+    )
 
     accuracy_val = local_vars.get("accuracy_val")
     accuracy_test = local_vars.get("accuracy_test")
@@ -61,15 +80,76 @@ def execute_training_code(
     if accuracy_val is None or accuracy_test is None:
         raise CodeExecutionError("Training code did not produce accuracy_val or accuracy_test.")
 
-    if model_output_path is not None:
-        save_pickle(model, model_output_path)
-        logger.info(f"Saved model to {model_output_path}")
-
     return TrainExecutionResult(
         accuracy_val=float(accuracy_val),
         accuracy_test=float(accuracy_test),
-        model_path=model_output_path,
         model=model,
         code=code,
         model_name=str(model),
+        compile_sec=timings.compile_sec,
+        run_sec=timings.run_sec,
+        cpu_sec=time.process_time() - cpu_start,
+        peak_rss_mb=peak_rss_mb(),
     )
+
+
+def execute_training_code(
+    df,
+    code: str,
+    model_output_path: str | None = None,
+    random_seed: int | None = settings.default_random_seed,
+    executor: SandboxExecutor | None = None,
+) -> TrainExecutionResult:
+    """
+    Execute training code generated by LLM.
+
+    Args:
+        df: pandas DataFrame
+        code: Training code string
+        model_output_path: pickle model output filepath
+        random_seed: random seed for train/val/test split
+        executor: sandbox executor to run the code in.
+            If None, the default of settings.execution_backend is used
+            ("inprocess" → exec in the current process).
+
+    Returns:
+        TrainExecutionResult
+
+    Raises:
+        CodeValidationError: if the code fails static validation (nothing is executed)
+        CodeExecutionError: if the execution fails
+    """
+    # 実行前に静的検証（分割・学習を始める前に確実に失敗するコードを弾く）
+    validate_training_code(code)
+
+    if executor is None:
+        executor = get_default_executor()
+
+    if executor is None:
+        with span("split", kind="split"):
+            df_train, df_val, df_test = split_dataset(df, random_seed=random_seed)
+        with span("exec.training", kind="exec", backend="inprocess") as record:
+            result = run_training_code(code, df_train, df_val, df_test)
+    else:
+        # 分割・共有はデータセットごとに 1 回だけ（リトライ時は同じ共有データを再利用）
+        with span("split", kind="split"):
+            split = get_dataset_split(df, random_seed=random_seed)
+            dataset = executor.share_frames(
+                key=("split", dataset_fingerprint(df), random_seed),
+                make_frames=split.frames,
+            )
+        with span("exec.training", kind="exec", backend="sandbox") as record:
+            result = executor.run(code, dataset=dataset)
+
+    if record is not None:
+        # 実行したプロセス（sandbox ではワーカー）で計測した値を使う
+        record.cpu_sec = result.cpu_sec
+        record.peak_rss_mb = result.peak_rss_mb
+        record.attributes.update(compile_sec=result.compile_sec, run_sec=result.run_sec, model_name=result.model_name)
+
+    if model_output_path is not None:
+        save_pickle(result.model, model_output_path)
+        logger.info(f"Saved model to {model_output_path}")
+    result.model_path = model_output_path
+
+    return result
@@ -13,10 +13,58 @@ class Settings(BaseSettings):
     Attributes:
         openrouter_api_key: API key for OpenRouter (required for LLM).
         llm_name: Optional model name. If None → must be set in .env.
+        llm_streaming: Stream LLM responses and stop reading at the end of the first code block.
+        llm_fallback_models: Models tried (in order) when the requested model is rate limited.
+        llm_requests_per_min: Client-side request rate per model (None → no throttling).
+        llm_burst: Token bucket capacity (max burst of requests) per model.
+        llm_max_attempts: Max LLM calls (over all models) per request before giving up.
+        llm_backoff_base_sec: First backoff when the provider sends no Retry-After; doubles per failure.
+        llm_backoff_max_sec: Upper limit of a single backoff / Retry-After wait.
+        llm_cache_file: SQLite file of the LLM response cache (None → caching disabled).
+        llm_cache_ttl_sec: Lifetime of cached LLM responses in seconds (None → never expire).
+        llm_cache_max_entries: Max cached LLM responses; least recently used ones are evicted.
+        llm_cache_max_temperature: Only calls at or below this temperature are cached (None → all calls).
+        log_level: Level of the application loggers.
+        log_format: "text" or "json" (one JSON object per line, for Cloud Logging).
+        log_debug_sample_every: Only every N-th DEBUG record of each call site is written.
         db_file: SQLite database file path.
+        db_sync_mode: "full" (download / upload the whole DB file) or "segments" (append-only segment files + compaction).
+        db_compact_every: Segments mode: compact once this many segment files are pending.
+        db_load_history: Segments mode: always load the DB history at startup (otherwise only when needed: summary cache or health-based model selection).
+        db_publish_max_attempts: Conditional (generation-match) uploads of the DB file before giving up on conflicts.
+        db_publish_backoff_sec: Base wait between conflicting uploads (jittered).
+        report_export_mode: "full" (rewrite the whole run records CSV) or "incremental" (month-partitioned gzip CSV + manifest).
+        report_figure_format: Accuracy summary figure format: "png", "svg" or "json" (spec for the dashboard).
+        plot_max_points: Max points per LLM in time series plots (LTTB downsampling).
+        plot_dpi: Resolution of PNG figures.
         model_save_dir: Directory to store trained model binaries.
+        cache_dir: Directory for local caches (split indices, datasets, ...).
+        dataset_offline: If True, never fetch datasets over the network (cache only).
+        profile_sample_rows: Row sample size for dataset profiling statistics (None → all rows).
+        summary_cache_mode: Reuse of stored dataset summaries: "off", "latest" or "best".
+        summary_cache_best_n: With "best", a summary is picked at random from the N best-performing ones.
         max_retry: Maximum retry count for LLM-generated code execution.
+        num_training_candidates: Training programs generated and executed in parallel per run (1 → sequential).
+        model_catalog_ttl_sec: Lifetime of the cached OpenRouter model list.
+        model_catalog_timeout_sec: HTTP timeout for fetching the model list.
+        model_health_window_days: Past runs used for model health stats (0 → health-based selection off).
+        model_health_min_runs: Success rate / latency are only judged with at least this many runs.
+        model_min_success_rate: Models with a lower success rate are not selected.
+        model_max_p95_latency_sec: Models with a slower p95 run time are not selected (None → no limit).
+        model_rate_limit_cooldown_sec: Models rate limited within this period are not selected.
+        tournament_size: Number of LLMs compared concurrently per run (0 → single random model).
+        tournament_max_workers: Max number of tournament models running at the same time.
+        tournament_max_per_provider: Max number of concurrently running tournament models per provider.
         default_random_seed: Seed for train/val/test splitting.
+        code_cache_size: Max number of compiled generated programs kept in memory (LRU).
+        execution_backend: "inprocess" (exec in orchestrator) or "sandbox" (worker processes).
+        execution_timeout_sec: Wall-clock limit for one training code execution (sandbox only).
+        execution_max_rss_mb: RSS limit of a sandbox worker process in MB.
+        execution_num_workers: Number of pre-forked sandbox worker processes.
+        execution_max_runs_per_worker: Sandbox worker is recycled after this many runs.
+        execution_start_method: multiprocessing start method for sandbox workers.
+        reevaluation_num_workers: Sandbox workers of a re-evaluation batch (None → number of CPUs).
+        shared_dataset_dir: Parent directory of memory-mapped datasets shared with workers (None → system temp dir).
         project_id: GCP Project ID.
         region: GCP region.
         artifact_repo_name: Artifact Registry repository name.
@@ -28,11 +76,62 @@ class Settings(BaseSettings):
     openrouter_api_key: str
     llm_name: str | None
 
+    llm_streaming: bool = False
+    llm_fallback_models: list[str] = []
+    llm_requests_per_min: float | None = None
+    llm_burst: int = 2
+    llm_max_attempts: int = 6
+    llm_backoff_base_sec: float = 2.0
+    llm_backoff_max_sec: float = 60.0
+    llm_cache_file: str | None = None
+    llm_cache_ttl_sec: float | None = 7 * 24 * 3600
+    llm_cache_max_entries: int | None = 10_000
+    llm_cache_max_temperature: float | None = 0.0
+
+    log_level: str = "INFO"
+    log_format: str = "text"
+    log_debug_sample_every: int = 1
+
     db_file: str = "./db/model_eval_results.db"
+    db_sync_mode: str = "full"
+    db_compact_every: int = 10
+    db_load_history: bool = False
+    db_publish_max_attempts: int = 5
+    db_publish_backoff_sec: float = 1.0
+    report_export_mode: str = "full"
+    report_figure_format: str = "png"
+    plot_max_points: int = 500
+    plot_dpi: int = 150
     model_save_dir: str = "./models_saved"
+    cache_dir: str = "./cache"
+    dataset_offline: bool = False
+    profile_sample_rows: int | None = 200_000
+    summary_cache_mode: str = "off"
+    summary_cache_best_n: int = 3
     max_retry: int = 3
+    num_training_candidates: int = 1
+    model_catalog_ttl_sec: float = 6 * 3600
+    model_catalog_timeout_sec: float = 10.0
+    model_health_window_days: float = 14.0
+    model_health_min_runs: int = 3
+    model_min_success_rate: float = 0.2
+    model_max_p95_latency_sec: float | None = 1800.0
+    model_rate_limit_cooldown_sec: float = 3600.0
+    tournament_size: int = 0
+    tournament_max_workers: int = 4
+    tournament_max_per_provider: int = 1
     default_random_seed: int = 42
 
+    code_cache_size: int = 128
+    execution_backend: str = "inprocess"
+    execution_timeout_sec: float = 600.0
+    execution_max_rss_mb: int = 768
+    execution_num_workers: int = 1
+    execution_max_runs_per_worker: int = 5
+    execution_start_method: str = "spawn"
+    reevaluation_num_workers: int | None = None
+    shared_dataset_dir: str | None = None
+
     project_id: str | None = None
     region: str = "asia-northeast1"
     artifact_repo_name: str | None = None
@@ -53,6 +152,26 @@ class Settings(BaseSettings):
         normalized = self.db_file.lstrip("./").lstrip("/")
         return f"gs://{self.bucket_name}/{normalized}"
 
+    @property
+    def db_segments_gcs(self) -> str:
+        """
+        GCS prefix of the append-only DB segment files (db_sync_mode "segments").
+
+        Example:
+            gs://my-bucket/db/titanic_models_segments/
+        """
+        return self.db_file_gcs.removesuffix(".db") + "_segments/"
+
+    @property
+    def export_gcs_prefix(self) -> str:
+        """
+        GCS prefix of the incremental run records export (report_export_mode "incremental").
+
+        Example:
+            gs://my-bucket/db/titanic_models_export/
+        """
+        return self.db_file_gcs.removesuffix(".db") + "_export/"
+
     @property
     def result_csv_public_url(self) -> str:
         csv_filepath = self.db_file.lstrip("./").lstrip("/").replace('.db', '.csv')
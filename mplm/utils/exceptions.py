@@ -8,6 +8,36 @@ class LLMConfigError(Exception):
     pass
 
 
+class LLMRateLimitError(Exception):
+    """Raised when every configured LLM stays rate limited (or failing) after all retries."""
+    pass
+
+
 class CodeExecutionError(Exception):
     """Raised when executing LLM-generated code fails."""
     pass
+
+
+class CodeValidationError(CodeExecutionError):
+    """Raised when LLM-generated code is rejected by static validation before execution."""
+    pass
+
+
+class CodeExecutionTimeoutError(CodeExecutionError):
+    """Raised when LLM-generated code exceeds its wall-clock time budget."""
+    pass
+
+
+class CodeExecutionMemoryError(CodeExecutionError):
+    """Raised when LLM-generated code exceeds its memory (RSS) budget."""
+    pass
+
+
+class DatasetUnavailableError(Exception):
+    """Raised when a dataset can be neither loaded from cache nor fetched."""
+    pass
+
+
+class DBPublishConflictError(Exception):
+    """Raised when the DB file on GCS keeps being changed by other jobs while publishing."""
+    pass
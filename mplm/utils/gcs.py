@@ -1,13 +1,17 @@
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from google.cloud import storage
+if TYPE_CHECKING:
+    from google.cloud import storage
 
 
-def get_gcs_client() -> storage.Client:
+def get_gcs_client() -> "storage.Client":
     """
     Returns a GCS client using application default credentials.
     GOOGLE_APPLICATION_CREDENTIALS must be set unless running on GCP.
     """
+    from google.cloud import storage  # 読み込みが重いので、GCS を使う時だけ import する
+
     return storage.Client()
 
 
@@ -35,6 +39,9 @@ def upload_file_to_gcs(
     gcs_path: str,
     *,
     make_public: bool = False,
+    content_type: str | None = None,
+    content_encoding: str | None = None,
+    cache_control: str | None = None,
 ) -> str:
     """
     Upload a local file to GCS.
@@ -43,6 +50,9 @@ def upload_file_to_gcs(
         local_path: Local file path
         gcs_path: 'gs://bucket/path/to/file'
         make_public: Whether to make the uploaded file publicly readable (default: False)
+        content_type: Content-Type metadata (guessed from the file name if None)
+        content_encoding: Content-Encoding metadata (e.g. "gzip": browsers decompress transparently)
+        cache_control: Cache-Control metadata
 
     Returns:
         If make_public=True → the public HTTPS URL
@@ -56,9 +66,16 @@ def upload_file_to_gcs(
     client = get_gcs_client()
     bucket = client.bucket(bucket_name)
     blob = bucket.blob(blob_path)
+    if content_encoding is not None:
+        blob.content_encoding = content_encoding
+    if cache_control is not None:
+        blob.cache_control = cache_control
 
     # Upload file
-    blob.upload_from_filename(str(local_path))
+    if content_type is not None:
+        blob.upload_from_filename(str(local_path), content_type=content_type)
+    else:
+        blob.upload_from_filename(str(local_path))
 
     # Optionally make public
     if make_public:
@@ -112,3 +129,105 @@ def gcs_exists(gcs_path: str) -> bool:
     blob = bucket.blob(blob_path)
 
     return blob.exists()
+
+
+# -------------------------------------------------------
+# 4. List / Delete
+# -------------------------------------------------------
+def list_gcs_files(gcs_prefix: str) -> list[str]:
+    """
+    List GCS files under a prefix.
+
+    Args:
+        gcs_prefix: 'gs://bucket/path/to/dir/'
+    Returns:
+        Sorted list of 'gs://bucket/...' paths
+    """
+    bucket_name, prefix = parse_gcs_path(gcs_prefix)
+    client = get_gcs_client()
+    return sorted(f"gs://{bucket_name}/{blob.name}" for blob in client.list_blobs(bucket_name, prefix=prefix))
+
+
+def delete_gcs_file(gcs_path: str) -> None:
+    """
+    Delete a GCS file (missing files are ignored).
+
+    Args:
+        gcs_path: 'gs://bucket/path/to/file'
+    """
+    from google.api_core.exceptions import NotFound
+
+    bucket_name, blob_path = parse_gcs_path(gcs_path)
+    client = get_gcs_client()
+    try:
+        client.bucket(bucket_name).blob(blob_path).delete()
+    except NotFound:
+        pass
+
+
+# -------------------------------------------------------
+# 5. Generation preconditions (optimistic concurrency)
+# -------------------------------------------------------
+def download_file_from_gcs_with_generation(gcs_path: str, local_path: str | Path) -> int:
+    """
+    Download a GCS file together with the generation that was read.
+
+    The download is pinned to the generation, so the local file and the
+    returned generation always match even if the object is overwritten meanwhile.
+
+    Args:
+        gcs_path: GCS path
+        local_path: desired local save path
+
+    Returns:
+        Generation of the downloaded object, or 0 if it does not exist (nothing is downloaded)
+    """
+    bucket_name, blob_path = parse_gcs_path(gcs_path)
+    client = get_gcs_client()
+    blob = client.bucket(bucket_name).get_blob(blob_path)
+    if blob is None:
+        return 0
+
+    local_path = Path(local_path)
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    blob.download_to_filename(str(local_path), if_generation_match=blob.generation)
+    return blob.generation
+
+
+def upload_file_to_gcs_if_generation_match(
+    local_path: str | Path,
+    gcs_path: str,
+    generation: int,
+    *,
+    make_public: bool = False,
+    cache_control: str | None = None,
+) -> int:
+    """
+    Upload a local file only if the GCS object still has `generation`.
+
+    Args:
+        local_path: Local file path
+        gcs_path: 'gs://bucket/path/to/file'
+        generation: Expected current generation (0 → the object must not exist yet)
+        make_public: Whether to make the uploaded file publicly readable (default: False)
+        cache_control: Cache-Control metadata
+
+    Returns:
+        Generation of the uploaded object
+
+    Raises:
+        google.api_core.exceptions.PreconditionFailed: if the object was changed by someone else
+    """
+    local_path = Path(local_path)
+    if not local_path.exists():
+        raise FileNotFoundError(f"Local file not found: {local_path}")
+
+    bucket_name, blob_path = parse_gcs_path(gcs_path)
+    client = get_gcs_client()
+    blob = client.bucket(bucket_name).blob(blob_path)
+    if cache_control is not None:
+        blob.cache_control = cache_control
+    blob.upload_from_filename(str(local_path), if_generation_match=generation)
+    if make_public:
+        blob.make_public()
+    return blob.generation
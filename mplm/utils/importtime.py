@@ -0,0 +1,77 @@
+"""
+Cold-start import cost, measured with `python -X importtime`.
+
+The Cloud Run job pays the import time of mplm.main on every execution, so
+heavy modules that are only needed on some paths (matplotlib for the report
+figure, google-cloud-storage for syncing, sklearn on split cache misses, ...)
+are imported inside the functions that use them. This module measures the
+import in a fresh interpreter so that tests can check it stays that way.
+
+Usage:
+    python -m mplm.utils.importtime [module] [--top N]
+"""
+
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass
+
+
+@dataclass
+class ImportTimes:
+    """Import times of one fresh-interpreter import, in seconds."""
+
+    total_sec: float
+    self_sec: dict[str, float]
+    cumulative_sec: dict[str, float]
+
+    def imported(self, prefix: str) -> bool:
+        """Whether the module or any of its submodules was imported."""
+        return any(name == prefix or name.startswith(prefix + ".") for name in self.self_sec)
+
+    def top(self, n: int = 15) -> list[tuple[str, float]]:
+        """Modules with the largest self time."""
+        return sorted(self.self_sec.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def measure_import_time(module: str = "mplm.main") -> ImportTimes:
+    """
+    Import `module` in a new interpreter with -X importtime and parse its report.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    self_sec: dict[str, float] = {}
+    cumulative_sec: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|", 2)
+        name = name.strip()
+        self_sec[name] = int(self_us) / 1e6
+        cumulative_sec[name] = int(cumulative_us) / 1e6
+    return ImportTimes(
+        total_sec=cumulative_sec.get(module, sum(self_sec.values())),
+        self_sec=self_sec,
+        cumulative_sec=cumulative_sec,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the cold-start import time of a module.")
+    parser.add_argument("module", nargs="?", default="mplm.main")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to show")
+    args = parser.parse_args()
+
+    times = measure_import_time(args.module)
+    print(f"import {args.module}: {times.total_sec:.3f}s ({len(times.self_sec)} modules)")
+    for name, sec in times.top(args.top):
+        print(f"  {sec * 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
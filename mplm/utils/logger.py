@@ -1,9 +1,182 @@
 """
 Application-wide logger setup.
+
+Loggers do not write to stdout themselves. Every logger gets the shared
+QueueHandler, which only puts the record on an in-memory queue, and one
+QueueListener thread formats the records and writes them to stdout. Parallel
+candidate threads therefore never wait on each other for stdout.
+
+Records carry the context fields set with log_context() (run_id, node,
+attempt, ...). With settings.log_format == "json" every line is a JSON object
+that Cloud Logging parses into a structured entry (severity, message and the
+context fields). DEBUG records can be sampled per call site with
+settings.log_debug_sample_every so hot loops stay cheap.
 """
 
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from typing import Any
+
+from ..settings import settings
+
+TEXT_FORMAT = "[%(asctime)s] [%(levelname)s] %(name)s: %(message)s"
+
+_log_context: contextvars.ContextVar[dict[str, Any] | None] = contextvars.ContextVar("mplm_log_context", default=None)
+
+_queue_handler: "_QueueHandler | None" = None
+_listener: logging.handlers.QueueListener | None = None
+_setup_lock = threading.Lock()
+
+
+@contextmanager
+def log_context(**fields) -> Iterator[None]:
+    """
+    Add context fields (e.g. run_id, node, attempt) to every record logged in this context.
+
+    Fields are kept in a context variable, so they follow asyncio tasks and
+    threads started with contextvars.copy_context().run.
+    """
+    token = _log_context.set({**(_log_context.get() or {}), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def get_log_context() -> dict[str, Any]:
+    return dict(_log_context.get() or {})
+
+
+class ContextFilter(logging.Filter):
+    """
+    Attaches the current log_context() fields to the record (runs in the calling thread).
+
+    DEBUG records are sampled: only every `debug_sample_every`-th record of
+    each call site (logger, file, line) passes.
+    """
+
+    def __init__(self, debug_sample_every: int = 1):
+        super().__init__()
+        self.debug_sample_every = max(1, debug_sample_every)
+        self._counts: dict[tuple[str, str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.DEBUG and self.debug_sample_every > 1:
+            key = (record.name, record.pathname, record.lineno)
+            with self._lock:
+                count = self._counts.get(key, 0)
+                self._counts[key] = count + 1
+            if count % self.debug_sample_every:
+                return False
+            record.sample_every = self.debug_sample_every
+        record.log_context = _log_context.get() or {}
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record, using the field names Cloud Logging recognizes.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "severity": record.levelname,
+            "message": record.getMessage(),
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "logger": record.name,
+            "thread": record.threadName,
+        }
+        entry.update(getattr(record, "log_context", None) or {})
+        if getattr(record, "sample_every", None):
+            entry["sample_every"] = record.sample_every
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The plain text format, followed by the context fields (if any)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        context = getattr(record, "log_context", None)
+        if context:
+            text += " " + " ".join(f"{k}={v}" for k, v in context.items())
+        return text
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    Only the message arguments and the exception traceback are rendered here
+    (they may reference objects that change after the call returns).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _create_formatter(log_format: str) -> logging.Formatter:
+    if log_format == "json":
+        return JsonFormatter()
+    if log_format == "text":
+        return TextFormatter(TEXT_FORMAT)
+    raise ValueError(f"Unknown log_format: {log_format}")
+
+
+def _get_queue_handler() -> _QueueHandler:
+    """Shared QueueHandler; starts the QueueListener writing to stdout on first use."""
+    global _queue_handler, _listener
+    with _setup_lock:
+        if _queue_handler is None:
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            stream_handler = logging.StreamHandler(sys.stdout)
+            stream_handler.setFormatter(_create_formatter(settings.log_format))
+
+            handler = _QueueHandler(log_queue)
+            handler.addFilter(ContextFilter(settings.log_debug_sample_every))
+
+            _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+            _listener.start()
+            atexit.register(_stop_listener)
+            _queue_handler = handler
+        return _queue_handler
+
+
+def flush_logs() -> None:
+    """Block until every queued record has been written to stdout."""
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()  # 残っているレコードを書き出してからスレッドを終了する
+            _listener.start()
+
+
+def _stop_listener() -> None:
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -19,12 +192,7 @@ def get_logger(name: str) -> logging.Logger:
 
     logger = logging.getLogger(name)
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        formatter = logging.Formatter(
-            "[%(asctime)s] [%(levelname)s] %(name)s: %(message)s"
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
+        logger.addHandler(_get_queue_handler())
+        logger.setLevel(settings.log_level)
 
     return logger
@@ -0,0 +1,216 @@
+"""
+Lightweight tracing of workflow runs.
+
+A Trace is created per workflow run and carried in WorkflowState["trace"].
+Nodes wrapped with traced_node() activate it for the duration of the node,
+and service code opens spans with `span(...)` around LLM calls, dataset
+splits and code execution. Each span records wall time, process CPU time
+and the process's peak RSS; LLM spans also record the token usage reported
+by the provider.
+
+The active trace and span live in context variables, so spans opened in
+asyncio tasks or in threads started with contextvars.copy_context().run are
+attached to the right parent. When no trace is active, span() does nothing.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from ..models.tracing import SpanRecord
+from .logger import log_context
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_current_trace: contextvars.ContextVar["Trace | None"] = contextvars.ContextVar("mplm_trace", default=None)
+_current_span: contextvars.ContextVar[SpanRecord | None] = contextvars.ContextVar("mplm_span", default=None)
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of the current process in MB (None if unavailable)."""
+    if resource is None:
+        return None
+    # Linux reports ru_maxrss in KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Trace:
+    """
+    Thread-safe collection of the spans of one workflow run.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._spans: list[SpanRecord] = []
+        self._lock = threading.Lock()
+
+    def new_span(self, name: str, kind: str, parent_id: int | None, attributes: dict[str, Any]) -> SpanRecord:
+        with self._lock:
+            record = SpanRecord(
+                span_id=len(self._spans),
+                parent_id=parent_id,
+                name=name,
+                kind=kind,
+                start_offset_sec=time.perf_counter() - self.started_at,
+                attributes=attributes,
+            )
+            self._spans.append(record)
+            return record
+
+    @property
+    def spans(self) -> list[SpanRecord]:
+        with self._lock:
+            return list(self._spans)
+
+    def totals_by_kind(self) -> dict[str, float]:
+        """Total wall seconds per span kind (nested spans of the same kind are counted once)."""
+        spans = self.spans
+        by_id = {s.span_id: s for s in spans}
+        totals: dict[str, float] = {}
+        for s in spans:
+            parent = by_id.get(s.parent_id)
+            while parent is not None and parent.kind != s.kind:
+                parent = by_id.get(parent.parent_id)
+            if parent is None:
+                totals[s.kind] = totals.get(s.kind, 0.0) + (s.wall_sec or 0.0)
+        return totals
+
+
+def current_trace() -> Trace | None:
+    return _current_trace.get()
+
+
+@contextmanager
+def use_trace(trace: Trace | None) -> Iterator[Trace | None]:
+    """Activate `trace` for spans opened in this context."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, kind: str = "step", **attributes) -> Iterator[SpanRecord | None]:
+    """
+    Record a span in the active trace.
+
+    Yields:
+        The SpanRecord (attributes / token counts may be updated inside the block),
+        or None when no trace is active.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    record = trace.new_span(name, kind, parent.span_id if parent is not None else None, attributes)
+    token = _current_span.set(record)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield record
+    except BaseException as e:
+        record.error = str(e) or type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        record.wall_sec = time.perf_counter() - wall_start
+        if record.cpu_sec is None:
+            record.cpu_sec = time.process_time() - cpu_start
+        if record.peak_rss_mb is None:
+            record.peak_rss_mb = peak_rss_mb()
+
+
+def traced_node(name: str, fn: Callable[[dict], dict]) -> Callable[[dict], dict]:
+    """
+    Wrap a LangGraph node so that it runs as a "node" span of state["trace"]
+    (when the state carries a trace) with node / attempt log context fields.
+    """
+
+    @functools.wraps(fn)
+    def node(state):
+        attempt = state.get("retry_count", 0)
+        with log_context(node=name, attempt=attempt):
+            trace = state.get("trace")
+            if trace is None:
+                return fn(state)
+            with use_trace(trace), span(name, kind="node", attempt=attempt):
+                return fn(state)
+
+    return node
+
+
+def llm_model_name(llm: Any) -> str:
+    """Model name of an LLM client (for RateLimitedLLM: the model that answered the last call)."""
+    for attr in ("model_name", "model"):
+        value = getattr(llm, attr, None)
+        if isinstance(value, str):
+            return value
+    return type(llm).__name__
+
+
+@contextmanager
+def llm_span(name: str, llm: Any, **attributes) -> Iterator[SpanRecord | None]:
+    """An "llm" span that records the answering model name when it ends."""
+    with span(name, kind="llm", **attributes) as record:
+        try:
+            yield record
+        finally:
+            if record is not None:
+                record.attributes["model"] = llm_model_name(llm)
+
+
+def record_llm_usage(record: SpanRecord | None, response: Any) -> None:
+    """
+    Add the token usage of an LLM response (or streamed chunk) to an LLM span.
+    """
+    if record is None:
+        return
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+        usage = {
+            "input_tokens": token_usage.get("prompt_tokens"),
+            "output_tokens": token_usage.get("completion_tokens"),
+        }
+    if usage.get("input_tokens") is not None:
+        record.prompt_tokens = (record.prompt_tokens or 0) + usage["input_tokens"]
+    if usage.get("output_tokens") is not None:
+        record.completion_tokens = (record.completion_tokens or 0) + usage["output_tokens"]
+    content = response if isinstance(response, str) else getattr(response, "content", None)
+    if isinstance(content, str):
+        record.attributes["completion_chars"] = record.attributes.get("completion_chars", 0) + len(content)
+
+
+def observe_stream(chunks: Iterable, record: SpanRecord | None) -> Iterator:
+    """Pass streamed chunks through, recording their token usage; closing it closes the source."""
+    iterator = iter(chunks)
+    try:
+        for chunk in iterator:
+            record_llm_usage(record, chunk)
+            yield chunk
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+async def aobserve_stream(chunks: AsyncIterable, record: SpanRecord | None) -> AsyncIterator:
+    """Async variant of observe_stream."""
+    try:
+        async for chunk in chunks:
+            record_llm_usage(record, chunk)
+            yield chunk
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -1,10 +1,203 @@
-import matplotlib.pyplot as plt
+"""
+Accuracy summary figures.
+
+A figure is built in two steps: the data is first reduced to a small spec
+(time series downsampled with LTTB, histograms and KDEs precomputed with
+NumPy on binned data), then the spec is rendered with the Agg canvas
+directly (no pyplot / seaborn global state, safe in headless jobs) as PNG or
+SVG, or written as JSON for the dashboard to draw itself.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
-import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.dates import DateFormatter
+from matplotlib.figure import Figure
+
+from ..settings import settings
+from .downsample import lttb
 
+FIGURE_FORMATS = ("png", "svg", "json")
+METRICS = (("val", "Validation"), ("test", "Test"))
+COLORS = ("#4c72b0", "#dd8452", "#55a868", "#c44e52", "#8172b3", "#937860", "#da8bc3", "#8c8c8c", "#ccb974", "#64b5cd")
+
+
+def binned_kde(counts: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Gaussian KDE of binned data, scaled to counts per bin (like seaborn histplot(kde=True)).
 
-def plot_accuracy_summary(df_record: pd.DataFrame, output_filepath: str):
+    The bandwidth follows Scott's rule on the binned values and the kernel is
+    convolved with the bin counts, so the cost depends on the number of bins only.
+    """
+    counts = np.asarray(counts, dtype=float)
+    n = counts.sum()
+    if n < 2:
+        return counts.copy()
+    width = edges[1] - edges[0]
+    centers = (edges[:-1] + edges[1:]) / 2
+    mean = np.average(centers, weights=counts)
+    std = np.sqrt(np.average((centers - mean) ** 2, weights=counts))
+    sigma_bins = max(1.06 * std * n ** (-1 / 5) / width, 1e-6)
+    half = max(int(np.ceil(3 * sigma_bins)), 1)
+    offsets = np.arange(-half, half + 1)
+    kernel = np.exp(-0.5 * (offsets / sigma_bins) ** 2)
+    return np.convolve(np.pad(counts, half), kernel / kernel.sum(), mode="valid")
+
+
+def _series(days: pd.Series, values: pd.Series, max_points: int, *bands: pd.Series) -> dict:
+    t = days.astype("int64").to_numpy() // 10**6  # epoch ms
+    y = values.to_numpy(dtype=float)
+    kept = lttb(t, y, max_points)
+    series = {"t": t[kept].tolist(), "y": y[kept].tolist()}
+    if bands:
+        series["low"] = bands[0].to_numpy(dtype=float)[kept].tolist()
+        series["high"] = bands[1].to_numpy(dtype=float)[kept].tolist()
+    return series
+
+
+def _histogram(counts_by_llm: dict[str, np.ndarray], edges: np.ndarray) -> dict:
+    return {
+        "edges": edges.tolist(),
+        "counts": {llm: counts.tolist() for llm, counts in counts_by_llm.items()},
+        "kde": {llm: binned_kde(counts, edges).tolist() for llm, counts in counts_by_llm.items()},
+    }
+
+
+def accuracy_summary_spec(df_record: pd.DataFrame, bins: int = 70, max_points: int | None = None) -> dict:
+    """
+    実行記録から、精度の時系列（LLM ごと、LTTB で間引き）と分布（ヒストグラム + KDE）の spec を作る。
+
+    Args:
+        df_record (pd.DataFrame): RunRecord データフレーム
+            必須カラム: ["created_at", "accuracy_val", "accuracy_test", "llm_name"]
+        bins (int): ヒストグラムのビン数
+        max_points (int | None): LLM ごとの時系列の最大点数（None → settings.plot_max_points）
+    """
+    max_points = max_points or settings.plot_max_points
+    df = df_record.assign(created_at=pd.to_datetime(df_record["created_at"])).sort_values("created_at")
+    llm_names = sorted(df["llm_name"].fillna("unknown").unique())
+    df = df.assign(llm_name=df["llm_name"].fillna("unknown"))
+
+    spec = {"kind": "accuracy_summary", "llm_names": llm_names, "series": {}, "histograms": {}}
+    for metric, _ in METRICS:
+        column = f"accuracy_{metric}"
+        spec["series"][metric] = {
+            llm: _series(group["created_at"], group[column], max_points) for llm, group in df.groupby("llm_name")
+        }
+        edges = np.histogram_bin_edges(df[column].to_numpy(dtype=float), bins=bins) if len(df) else np.linspace(0, 1, bins + 1)
+        spec["histograms"][metric] = _histogram(
+            {llm: np.histogram(group[column], bins=edges)[0] for llm, group in df.groupby("llm_name")}, edges
+        )
+    return spec
+
+
+def accuracy_rollup_spec(df_rollup: pd.DataFrame, max_points: int | None = None) -> dict:
+    """
+    accuracy_rollups（LLM・日ごとの集計）から同じ構成の spec を作る。
+
+    時系列は日次の中央値と 10〜90% 区間、分布は保存済みのヒストグラムの合計なので、
+    実行記録の件数に依存しない時間で作れる。
+
+    Args:
+        df_rollup (pd.DataFrame): rollup.get_accuracy_rollups_as_df の結果
+        max_points (int | None): LLM ごとの時系列の最大点数（None → settings.plot_max_points）
+    """
+    max_points = max_points or settings.plot_max_points
+    llm_names = sorted(df_rollup["llm_name"].unique()) if not df_rollup.empty else []
+    runs = df_rollup[df_rollup["run_count"] > 0] if not df_rollup.empty else df_rollup
+
+    spec = {"kind": "accuracy_rollup", "llm_names": llm_names, "series": {}, "histograms": {}}
+    for metric, _ in METRICS:
+        spec["series"][metric] = {
+            llm: _series(group["day"], group[f"{metric}_p50"], max_points, group[f"{metric}_p10"], group[f"{metric}_p90"])
+            for llm, group in runs.groupby("llm_name")
+        }
+        counts_by_llm = {
+            llm: np.sum(np.stack(group[f"{metric}_hist"].to_list()), axis=0) for llm, group in runs.groupby("llm_name")
+        }
+        n_bins = len(next(iter(counts_by_llm.values()))) if counts_by_llm else 1
+        edges = np.linspace(0, 1, n_bins + 1)
+        if counts_by_llm:
+            # 使われているビンの範囲だけを残す
+            used = np.nonzero(np.sum(list(counts_by_llm.values()), axis=0))[0]
+            if len(used):
+                lo, hi = used[0], used[-1] + 1
+                edges = edges[lo:hi + 1]
+                counts_by_llm = {llm: counts[lo:hi] for llm, counts in counts_by_llm.items()}
+        spec["histograms"][metric] = _histogram(counts_by_llm, edges)
+    return spec
+
+
+def render_accuracy_spec(spec: dict, output_filepath: str, fmt: str | None = None, dpi: int | None = None) -> str:
+    """
+    spec を画像（png / svg、Agg で描画）または JSON として書き出す。
+
+    Args:
+        spec (dict): accuracy_summary_spec / accuracy_rollup_spec の結果
+        output_filepath (str): 出力ファイルパス
+        fmt (str | None): "png", "svg" または "json"（None → 拡張子から判断）
+        dpi (int | None): png の解像度（None → settings.plot_dpi）
+
+    Returns:
+        output_filepath
+    """
+    fmt = fmt or Path(output_filepath).suffix.lstrip(".").lower()
+    if fmt not in FIGURE_FORMATS:
+        raise ValueError(f"Unknown figure format: {fmt}")
+    if fmt == "json":
+        Path(output_filepath).write_text(json.dumps(spec), encoding="utf-8")
+        return output_filepath
+
+    colors = {llm: COLORS[i % len(COLORS)] for i, llm in enumerate(spec["llm_names"])}
+    band = spec["kind"] == "accuracy_rollup"
+
+    fig = Figure(figsize=(16, 10))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(2, 2)  # 2行2列
+    for col, (metric, label) in enumerate(METRICS):
+        # --- 時系列 ---
+        ax = axes[0, col]
+        for llm, series in spec["series"][metric].items():
+            t = pd.to_datetime(series["t"], unit="ms")
+            ax.plot(t, series["y"], marker="o", markersize=3, color=colors[llm], label=llm)
+            if band:
+                ax.fill_between(t, series["low"], series["high"], color=colors[llm], alpha=0.2)
+        title = f"{label} Accuracy over Time" + (" (daily median, p10-p90)" if band else "")
+        ax.set_title(title)
+        ax.set_ylabel(f"accuracy_{metric}")
+        ax.tick_params(axis='x', rotation=45)
+        ax.xaxis.set_major_formatter(DateFormatter("%Y-%m-%d"))
+        ax.grid(True, alpha=0.3)
+        if col == 0 and spec["series"][metric]:
+            ax.legend(title="LLM Name", bbox_to_anchor=(1.05, 1), loc="upper left")
+
+        # --- 分布（LLM ごとに積み上げ + KDE） ---
+        ax = axes[1, col]
+        histogram = spec["histograms"][metric]
+        edges = np.asarray(histogram["edges"])
+        centers = (edges[:-1] + edges[1:]) / 2
+        bottom = np.zeros(len(edges) - 1)
+        kde_bottom = np.zeros(len(edges) - 1)
+        for llm, counts in histogram["counts"].items():
+            counts = np.asarray(counts, dtype=float)
+            ax.bar(edges[:-1], counts, width=np.diff(edges), bottom=bottom, align="edge", color=colors[llm], alpha=0.6)
+            kde_bottom = kde_bottom + np.asarray(histogram["kde"][llm])
+            ax.plot(centers, kde_bottom, color=colors[llm])
+            bottom = bottom + counts
+        ax.set_title(f"{label} Accuracy Distribution")
+        ax.set_xlabel(f"accuracy_{metric}")
+        ax.set_ylabel("Count")
+        ax.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+    fig.savefig(output_filepath, format=fmt, dpi=dpi or settings.plot_dpi)
+    return output_filepath
+
+
+def plot_accuracy_summary(df_record: pd.DataFrame, output_filepath: str, fmt: str | None = None):
     """
     df_record の accuracy_val / accuracy_test の時系列推移と分布を1枚の画像にまとめて出力する。
 
@@ -12,59 +205,18 @@ def plot_accuracy_summary(df_record: pd.DataFrame, output_filepath: str):
         df_record (pd.DataFrame): RunRecord データフレーム
             必須カラム: ["created_at", "accuracy_val", "accuracy_test", "llm_name"]
         output_filepath (str): 出力する画像ファイルパス（例: "accuracy_summary.png"）
+        fmt (str | None): "png", "svg" または "json"（None → 拡張子から判断）
+    """
+    return render_accuracy_spec(accuracy_summary_spec(df_record), output_filepath, fmt)
+
+
+def plot_accuracy_rollup(df_rollup: pd.DataFrame, output_filepath: str, fmt: str | None = None):
+    """
+    accuracy_rollups（LLM・日ごとの集計）から、日次の推移と分布を1枚の画像にまとめて出力する。
+
+    Args:
+        df_rollup (pd.DataFrame): rollup.get_accuracy_rollups_as_df の結果
+        output_filepath (str): 出力する画像ファイルパス（例: "accuracy_summary.png"）
+        fmt (str | None): "png", "svg" または "json"（None → 拡張子から判断）
     """
-    df = df_record.sort_values("created_at")
-
-    sns.set(style="whitegrid", palette="pastel", font_scale=1.1)
-
-    fig, axes = plt.subplots(2, 2, figsize=(16, 10))  # 2行2列
-
-    # --- Validation Accuracy 時系列 ---
-    sns.lineplot(
-        data=df,
-        x="created_at",
-        y="accuracy_val",
-        hue="llm_name",
-        marker="o",
-        ax=axes[0, 0]
-    )
-    axes[0, 0].set_title("Validation Accuracy over Time")
-    axes[0, 0].set_ylabel("accuracy_val")
-    axes[0, 0].set_xlabel("")
-    axes[0, 0].legend(title="LLM Name", bbox_to_anchor=(1.05, 1), loc="upper left")
-    axes[0, 0].tick_params(axis='x', rotation=45)
-    axes[0, 0].xaxis.set_major_formatter(DateFormatter("%Y-%m-%d"))
-
-    # --- Test Accuracy 時系列 ---
-    sns.lineplot(
-        data=df,
-        x="created_at",
-        y="accuracy_test",
-        hue="llm_name",
-        marker="o",
-        ax=axes[0, 1]
-    )
-    axes[0, 1].set_title("Test Accuracy over Time")
-    axes[0, 1].set_ylabel("accuracy_test")
-    axes[0, 1].set_xlabel("")
-    axes[0, 1].legend().remove()
-    axes[0, 1].tick_params(axis='x', rotation=45)
-    axes[0, 1].xaxis.set_major_formatter(DateFormatter("%Y-%m-%d"))
-
-    # --- Validation Accuracy 分布 ---
-    sns.histplot(df, x="accuracy_val", hue="llm_name", multiple="stack", kde=True, ax=axes[1, 0], bins=70)
-    axes[1, 0].set_title("Validation Accuracy Distribution")
-    axes[1, 0].set_xlabel("accuracy_val")
-    axes[1, 0].set_ylabel("Count")
-    sns.move_legend(axes[1, 0], title="LLM Name", loc="upper left", bbox_to_anchor=(1.05, 1))
-
-    # --- Test Accuracy 分布 ---
-    sns.histplot(df, x="accuracy_test", hue="llm_name", multiple="stack", kde=True, ax=axes[1, 1], bins=70)
-    axes[1, 1].set_title("Test Accuracy Distribution")
-    axes[1, 1].set_xlabel("accuracy_test")
-    axes[1, 1].set_ylabel("Count")
-    axes[1, 1].legend().remove()
-
-    plt.tight_layout()
-    plt.savefig(output_filepath, dpi=150)
-    plt.close()
+    return render_accuracy_spec(accuracy_rollup_spec(df_rollup), output_filepath, fmt)
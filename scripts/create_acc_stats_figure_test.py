@@ -2,11 +2,11 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.dates import DateFormatter
 
-from mplm.db.crud import get_all_records_as_df
+from mplm.db.crud import RUN_STATS_COLUMNS, get_all_records_as_df
 from mplm.db.session import get_session
 from mplm.settings import settings
 
-df = get_all_records_as_df(db=get_session(db_path=settings.db_file)())
+df = get_all_records_as_df(db=get_session(db_path=settings.db_file)(), columns=RUN_STATS_COLUMNS)
 
 # 日付順にソート
 df = df.sort_values("created_at")
@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+
+from mplm.agent.reevaluation import default_batch_id, reevaluate_runs
+from mplm.db.base import init_db
+from mplm.db.crud import create_run_record
+from mplm.db.models import ReevaluationRecord
+from mplm.db.session import get_engine, get_session
+from mplm.services.split_cache import get_dataset_split
+from mplm.services.training_executor import run_training_code
+
+OK_CODE = """
+model = 'dummy-model'
+accuracy_val = len(df_val) / 100
+accuracy_test = len(df_test) / 100
+"""
+
+
+class InProcessExecutor:
+    """SandboxExecutor と同じインターフェースで、共有データをそのまま現在のプロセスで実行する"""
+
+    num_workers = 2
+
+    def __init__(self):
+        self.runs = 0
+
+    def share_frames(self, key, make_frames, keepalive=None):
+        return make_frames()
+
+    def run(self, code, *, dataset=None, **kwargs):
+        self.runs += 1
+        return run_training_code(code, dataset["df_train"], dataset["df_val"], dataset["df_test"])
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "runs.db")
+    init_db(get_engine(path))
+    return path
+
+
+def make_df(n: int = 100) -> pd.DataFrame:
+    return pd.DataFrame({"x": range(n), "survived": [i % 2 for i in range(n)]})
+
+
+def add_runs(db_path, codes):
+    with get_session(db_path)() as db:
+        return [
+            create_run_record(
+                db,
+                train_code=code,
+                model_name="m",
+                model_path="p",
+                dataset_summary="s",
+                accuracy_val=0.5,
+                accuracy_test=0.5,
+            ).id
+            for code in codes
+        ]
+
+
+def load_reevaluations(db_path):
+    with get_session(db_path)() as db:
+        return {r.run_id: (r.status, r.accuracy_val, r.error) for r in db.query(ReevaluationRecord).all()}
+
+
+def test_reevaluate_runs(db_path):
+    """全 run の train_code を再実行し、元の run に紐づく結果を保存する（失敗も記録する）"""
+    df = make_df()
+    ok_id, error_id, invalid_id = add_runs(db_path, [OK_CODE, OK_CODE + "x = 1 / 0", "import os\n" + OK_CODE])
+
+    summary = reevaluate_runs(df, random_seed=7, db_path=db_path, executor=InProcessExecutor(), page_size=2)
+
+    assert (summary.evaluated, summary.succeeded, summary.failed, summary.skipped) == (3, 1, 2, 0)
+    assert summary.batch_id == default_batch_id(df, 7)
+    rows = load_reevaluations(db_path)
+    expected_val = len(get_dataset_split(df, random_seed=7).df_val) / 100
+    assert rows[ok_id] == ("ok", expected_val, None)
+    assert rows[error_id][0] == "failed" and "division by zero" in rows[error_id][2]
+    assert rows[invalid_id][0] == "failed" and "os" in rows[invalid_id][2]
+
+
+def test_reevaluate_runs_resumes(db_path):
+    """中断したバッチは評価済みの run をスキップして続きから再開する"""
+    df = make_df()
+    run_ids = add_runs(db_path, [OK_CODE] * 5)
+    executor = InProcessExecutor()
+
+    first = reevaluate_runs(df, db_path=db_path, executor=executor, limit=2)
+    second = reevaluate_runs(df, db_path=db_path, executor=executor)
+    third = reevaluate_runs(df, db_path=db_path, executor=executor)
+
+    assert (first.evaluated, first.skipped) == (2, 0)
+    assert (second.evaluated, second.skipped) == (3, 2)
+    assert (third.evaluated, third.skipped) == (0, 5)
+    assert executor.runs == 5
+    assert sorted(load_reevaluations(db_path)) == run_ids
+
+    other_seed = reevaluate_runs(df, random_seed=1, db_path=db_path, executor=executor)
+    assert other_seed.evaluated == 5
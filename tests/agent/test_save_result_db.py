@@ -68,3 +68,26 @@ def test_save_run_to_db_success():
             accuracy_test=0.85,
             llm_name="mock_llm",
         )
+
+
+def test_save_run_to_db_all_candidates():
+    """並列学習の場合は全候補がレコードとして保存される"""
+    candidates = [
+        TrainExecutionResult(accuracy_val=v, accuracy_test=0.5, code=f"code{i}", model="m", model_name=f"model{i}")
+        for i, v in enumerate([0.7, 0.9])
+    ]
+    mock_llm = MagicMock()
+    mock_llm.model = "mock_llm"
+    state: WorkflowState = {
+        "summary_result": SummaryResult(summary_text="summary"),
+        "training_result": candidates[1],
+        "candidate_results": candidates,
+        "llm": mock_llm,
+    }
+
+    with patch("mplm.agent.automatic_model_build_agent.create_run_record") as mock_create, \
+         patch("mplm.agent.automatic_model_build_agent.get_session"):
+        save_run_to_db(state)
+
+    assert mock_create.call_count == 2
+    assert [c.kwargs["model_name"] for c in mock_create.call_args_list] == ["model0", "model1"]
@@ -0,0 +1,62 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from mplm.agent.tournament import model_provider, run_tournament
+from mplm.models.training import TrainExecutionResult
+
+
+class FakeWorkflow:
+    """モデル名に応じて成功・失敗を返し、プロバイダごとの同時実行数を記録する"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running: dict[str, int] = {}
+        self.max_running: dict[str, int] = {}
+
+    def invoke(self, state, debug=False):
+        name = state["llm"].model
+        provider = model_provider(name)
+        with self.lock:
+            self.running[provider] = self.running.get(provider, 0) + 1
+            self.max_running[provider] = max(self.max_running.get(provider, 0), self.running[provider])
+        time.sleep(0.05)
+        with self.lock:
+            self.running[provider] -= 1
+
+        if name.endswith("bad"):
+            return {**state, "status": "failed", "training_errors": ["boom"]}
+        result = TrainExecutionResult(
+            accuracy_val=len(name) / 100, accuracy_test=0.5, code="c", model="m", model_name="RF"
+        )
+        return {**state, "status": "ok", "training_result": result}
+
+
+def fake_get_llm(model_name=None, temperature=None, fallback=True):
+    assert not fallback  # 比較対象のモデル以外に応答させない
+    llm = MagicMock()
+    llm.model = model_name
+    return llm
+
+
+def test_run_tournament():
+    """全モデルを実行し、成功したモデルごとに 1 レコード保存、プロバイダ同時実行数を守る"""
+    df = pd.DataFrame({"x": range(20), "survived": [i % 2 for i in range(20)]})
+    models = ["a/m1", "a/m2", "a/bad", "b/m1", "b/long-model"]
+    workflow = FakeWorkflow()
+
+    with patch("mplm.agent.tournament.build_workflow", return_value=workflow), \
+         patch("mplm.agent.tournament.get_llm", side_effect=fake_get_llm), \
+         patch("mplm.agent.tournament.save_run_to_db") as mock_save, \
+         patch("mplm.agent.tournament.record_model_run") as mock_record:
+        entries = run_tournament(df, models, target_column="survived", max_workers=4, max_per_provider=1)
+
+    assert [e.model_name for e in entries] == models
+    assert [e.status for e in entries] == ["ok", "ok", "failed", "ok", "ok"]
+    assert entries[2].error == "boom"
+    assert entries[4].accuracy_val == len("b/long-model") / 100
+    assert mock_save.call_count == 4
+    assert mock_record.call_count == 5
+    assert workflow.max_running == {"a": 1, "b": 1}
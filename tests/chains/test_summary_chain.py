@@ -62,6 +62,38 @@ def test_summary_chain_failure():
         assert updated["retry_count"] == 1
 
 
+# ----------------------------------------------------------------------
+# プロファイルがプロンプトと SummaryResult に渡される
+# ----------------------------------------------------------------------
+def test_summary_chain_uses_profile():
+    state = make_state()
+
+    with patch(
+        "mplm.chains.summary_chain.generate_summary_with_llm",
+        side_effect=lambda df, **kwargs: SummaryResult(summary_text=kwargs["metadata_str"]),
+    ) as mock_summary:
+
+        updated = summary_chain(state)
+
+        assert "Rows: 2" in mock_summary.call_args.kwargs["metadata_str"]
+        assert updated["summary_result"].profile is updated["profile"]
+        assert updated["profile"].num_rows == 2
+
+
+def test_summary_chain_fixed_summary():
+    state = make_state()
+    state["use_fixed_summary"] = True
+
+    with patch("mplm.chains.summary_chain.generate_summary_with_llm") as mock_summary:
+        updated = summary_chain(state)
+
+        mock_summary.assert_not_called()
+        assert updated["status"] == "ok"
+        assert isinstance(updated["summary_result"], SummaryResult)
+        assert "a: int64, missing=0" in updated["summary_result"].summary_text
+        assert updated["summary_result"].summary_code is None
+
+
 # ----------------------------------------------------------------------
 # 本番 LLM テスト
 # ----------------------------------------------------------------------
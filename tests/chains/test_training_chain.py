@@ -1,14 +1,17 @@
+import asyncio
 from unittest.mock import patch
 
+import pandas as pd
 import pytest
 
 from mplm.chains.summary_chain import summary_chain
-from mplm.chains.training_chain import training_chain
+from mplm.chains.training_chain import parallel_training_chain, training_chain
 from mplm.llm.client import get_llm
 from mplm.models.state import WorkflowState
 from mplm.models.summary import SummaryResult
 from mplm.models.training import TrainExecutionResult
 from mplm.services.data_loader import load_titanic_dataset
+from mplm.utils.logger import get_log_context, log_context
 
 
 # ============================================================
@@ -146,3 +149,92 @@ def test_training_chain_prod(request):
     assert state["status"] == "ok"
     assert tr.accuracy_val is not None
     assert tr.accuracy_test is not None
+
+
+# ============================================================
+# 並列候補生成（parallel_training_chain）
+# ============================================================
+CANDIDATE_CODE = """
+model = 'm{i}'
+accuracy_val = {val}
+accuracy_test = 0.5
+"""
+
+
+def make_parallel_state():
+    df = pd.DataFrame({"x": range(40), "survived": [i % 2 for i in range(40)]})
+    return {
+        "df": df,
+        "summary_result": SummaryResult(summary_text="some summary"),
+        "training_errors": [],
+        "retry_count": 0,
+        "target_column": "survived",
+    }
+
+
+def test_parallel_training_chain_keeps_best(tmp_path):
+    """全候補を実行し、accuracy_val が最大の候補を training_result にする"""
+    vals = [0.6, 0.9, "undefined_name"]
+
+    async def fake_agenerate(summary, target, candidate_index, num_candidates, llm):
+        assert summary == "some summary"
+        assert num_candidates == 3
+        return CANDIDATE_CODE.format(i=candidate_index, val=vals[candidate_index])
+
+    state = make_parallel_state()
+    state["model_output_path"] = str(tmp_path / "model.pkl")
+    with patch("mplm.chains.training_chain.agenerate_training_code", side_effect=fake_agenerate):
+        updated = parallel_training_chain(state, num_candidates=3)
+
+    assert updated["status"] == "ok"
+    assert updated["training_result"].model == "m1"
+    assert updated["training_result"].model_path == str(tmp_path / "model.pkl")
+    assert (tmp_path / "model.pkl").exists()
+    assert sorted(r.accuracy_val for r in updated["candidate_results"]) == [0.6, 0.9]
+
+
+def test_parallel_training_chain_all_failed():
+    """全候補が失敗した場合は failed となり、previous_code とそのエラーの組が記録される"""
+
+    async def fake_agenerate(summary, target, candidate_index, num_candidates, llm):
+        if candidate_index == 0:
+            raise RuntimeError("llm boom")
+        return "raise ValueError('exec boom')\nmodel = accuracy_val = accuracy_test = 0"
+
+    state = make_parallel_state()
+    with patch("mplm.chains.training_chain.agenerate_training_code", side_effect=fake_agenerate):
+        updated = parallel_training_chain(state, num_candidates=2)
+
+    assert updated["status"] == "failed"
+    assert updated["retry_count"] == 1
+    assert updated["previous_code"].startswith("raise ValueError('exec boom')")
+    assert len(updated["training_errors"]) == 1
+    assert "exec boom" in updated["training_errors"][0]
+
+
+def test_training_chain_passes_summary_text():
+    """プロンプトには要約テキストだけを渡す（profile や cache_id を含めない）"""
+    state = make_parallel_state()
+    state["summary_result"] = SummaryResult(summary_text="some summary", cache_id=7)
+    with patch("mplm.chains.training_chain.generate_training_code", return_value=CANDIDATE_CODE.format(i=0, val=0.5)) as mock_gen:
+        updated = training_chain(state)
+
+    assert updated["status"] == "ok"
+    assert mock_gen.call_args.args[0] == "some summary"
+
+
+def test_parallel_training_chain_inside_running_event_loop():
+    """実行中のイベントループ内（workflow.ainvoke やノートブック）から呼んでも動き、コンテキストを引き継ぐ"""
+
+    async def fake_agenerate(summary, target, candidate_index, num_candidates, llm):
+        assert get_log_context()["run_id"] == "r1"
+        return CANDIDATE_CODE.format(i=candidate_index, val=0.5)
+
+    async def drive():
+        with log_context(run_id="r1"):
+            return parallel_training_chain(make_parallel_state(), num_candidates=2)
+
+    with patch("mplm.chains.training_chain.agenerate_training_code", side_effect=fake_agenerate):
+        updated = asyncio.run(drive())
+
+    assert updated["status"] == "ok"
@@ -1,3 +1,6 @@
+import pytest
+
+
 def pytest_addoption(parser):
     parser.addoption(
         "--run-prod-tests",
@@ -5,3 +8,107 @@ def pytest_addoption(parser):
         default=False,
         help="Run production summary generator tests"
     )
+
+
+class FakeBlob:
+    """google.cloud.storage.Blob のうちアプリが使う部分だけを、メモリ上のオブジェクトで再現する"""
+
+    def __init__(self, client, bucket_name, name):
+        self.client = client
+        self.bucket_name = bucket_name
+        self.name = name
+
+    @property
+    def _key(self):
+        return (self.bucket_name, self.name)
+
+    @property
+    def generation(self):
+        stored = self.client.objects.get(self._key)
+        return stored[1] if stored else None
+
+    @property
+    def public_url(self):
+        return f"https://storage.googleapis.com/{self.bucket_name}/{self.name}"
+
+    def _check_generation(self, if_generation_match):
+        from google.api_core.exceptions import PreconditionFailed
+
+        if if_generation_match is not None and (self.generation or 0) != if_generation_match:
+            raise PreconditionFailed(f"generation of {self.name} is {self.generation}, not {if_generation_match}")
+
+    def upload_from_filename(self, filename, if_generation_match=None, content_type=None):
+        with self.client.lock:
+            self._check_generation(if_generation_match)
+            self.client.last_generation += 1
+            with open(filename, "rb") as f:
+                self.client.objects[self._key] = (f.read(), self.client.last_generation)
+
+    def download_to_filename(self, filename, if_generation_match=None):
+        from google.api_core.exceptions import NotFound
+
+        with self.client.lock:
+            if self._key not in self.client.objects:
+                raise NotFound(self.name)
+            self._check_generation(if_generation_match)
+            data = self.client.objects[self._key][0]
+        with open(filename, "wb") as f:
+            f.write(data)
+
+    def exists(self):
+        return self._key in self.client.objects
+
+    def delete(self):
+        from google.api_core.exceptions import NotFound
+
+        with self.client.lock:
+            if self.client.objects.pop(self._key, None) is None:
+                raise NotFound(self.name)
+
+    def make_public(self):
+        pass
+
+
+class FakeBucket:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def blob(self, name):
+        return FakeBlob(self.client, self.name, name)
+
+    def get_blob(self, name):
+        blob = self.blob(name)
+        return blob if blob.exists() else None
+
+
+class FakeGCSClient:
+    """
+    ローカル fake の GCS クライアント（オブジェクトごとに generation を持ち、if_generation_match を検査する）
+    """
+
+    def __init__(self):
+        import threading
+
+        self.objects: dict[tuple[str, str], tuple[bytes, int]] = {}
+        self.last_generation = 0
+        self.lock = threading.Lock()
+
+    def bucket(self, name):
+        return FakeBucket(self, name)
+
+    def list_blobs(self, bucket_name, prefix=""):
+        return [FakeBlob(self, b, n) for (b, n) in sorted(self.objects) if b == bucket_name and n.startswith(prefix)]
+
+    def paths(self, prefix="gs://"):
+        return sorted(p for p in (f"gs://{b}/{n}" for (b, n) in self.objects) if p.startswith(prefix))
+
+
+@pytest.fixture
+def fake_gcs(monkeypatch):
+    """mplm.utils.gcs の関数が FakeGCSClient を使うようにする"""
+    from mplm.utils import gcs
+
+    client = FakeGCSClient()
+    monkeypatch.setattr(gcs, "get_gcs_client", lambda: client)
+    return client
@@ -7,9 +7,17 @@ from sqlalchemy.engine import Engine
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 
-from mplm.db.base import Base
-from mplm.db.crud import create_run_record
+from mplm.db.base import Base, init_db
+from mplm.db.crud import (
+    RUN_STATS_COLUMNS,
+    create_run_record,
+    create_run_spans,
+    get_all_records_as_df,
+    get_run_spans_as_df,
+    query_runs_as_df,
+)
 from mplm.db.session import get_engine, get_session
+from mplm.models.tracing import SpanRecord
 
 
 @pytest.fixture(scope="function")
@@ -148,3 +156,60 @@ def test_get_engine_and_session():
         # --- テスト結果にかかわらず確実に削除 ---
         if os.path.exists(test_db_path):
             os.remove(test_db_path)
+
+
+def add_runs(db, llm_names):
+    for i, llm_name in enumerate(llm_names):
+        create_run_record(
+            db=db,
+            dataset_summary="ds-summary",
+            train_code="train-code",
+            model_name="SomeClassifier",
+            model_path="path/to/model",
+            accuracy_val=i / 10,
+            accuracy_test=i / 10,
+            llm_name=llm_name,
+        )
+
+
+def test_query_runs_as_df_projection_and_filters(db_session: Session):
+    """指定した列だけを取得し、LLM 名・件数で絞り込める"""
+    add_runs(db_session, ["a", "b", "a", "a"])
+
+    df = query_runs_as_df(db_session, columns=RUN_STATS_COLUMNS)
+    assert list(df.columns) == list(RUN_STATS_COLUMNS)
+    assert list(df["id"]) == [1, 2, 3, 4]
+    assert str(df["created_at"].dtype).startswith("datetime64")
+
+    df = query_runs_as_df(db_session, columns=["id", "accuracy_val"], llm_name="a", limit=2)
+    assert list(df["id"]) == [3, 4]  # 最新 2 件を古い順に
+
+    assert len(get_all_records_as_df(db_session).columns) == len(Base.metadata.tables["runs"].columns)
+
+
+def test_get_run_spans_as_df(db_session: Session):
+    """実行ごとのスパンを run_id・span_id 順に取得する（該当なしでも列は揃う）"""
+    add_runs(db_session, ["a", "b"])
+    create_run_spans(db_session, run_id=2, spans=[SpanRecord(span_id=1, name="node", kind="node")])
+    create_run_spans(db_session, run_id=1, spans=[SpanRecord(span_id=2, name="llm", kind="llm"), SpanRecord(span_id=1, name="node", kind="node")])
+
+    df = get_run_spans_as_df(db_session)
+    assert list(zip(df["run_id"], df["span_id"], strict=True)) == [(1, 1), (1, 2), (2, 1)]
+    assert list(get_run_spans_as_df(db_session, run_id=2)["name"]) == ["node"]
+
+    empty = get_run_spans_as_df(db_session, run_id=3)
+    assert empty.empty and list(empty.columns) == list(df.columns)
+
+
+def test_init_db_adds_missing_indexes(tmp_path):
+    """インデックス追加前に作られた DB にも init_db でインデックスが作成される"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        Base.metadata.tables["runs"].create(conn)
+        conn.execute(text("DROP INDEX ix_runs_created_at"))
+        conn.execute(text("DROP INDEX ix_runs_llm_name"))
+
+    init_db(engine)
+
+    indexes = {index["name"] for index in sqlalchemy.inspect(engine).get_indexes("runs")}
+    assert {"ix_runs_created_at", "ix_runs_llm_name"} <= indexes
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from mplm.db.base import init_db
+from mplm.db.crud import create_run_record
+from mplm.db.incremental_export import export_incremental, load_manifest, read_export
+from mplm.db.models import RunRecord
+from mplm.db.session import get_engine, get_session
+
+PREFIX = "gs://bucket/db/runs_export/"
+
+
+def add_run(db_path, accuracy_val, created_at):
+    with get_session(db_path)() as db:
+        record = create_run_record(
+            db,
+            train_code="code",
+            model_name="RF",
+            model_path="p",
+            dataset_summary="s",
+            accuracy_val=accuracy_val,
+            accuracy_test=accuracy_val,
+        )
+        db.query(RunRecord).filter(RunRecord.id == record.id).update({RunRecord.created_at: created_at})
+        db.commit()
+
+
+def test_export_only_touches_months_with_new_rows(tmp_path, fake_gcs):
+    """新しい行がある月のファイルだけを作り直し、manifest に最新の id と月別ファイルを記録する"""
+    db_path = str(tmp_path / "runs.db")
+    init_db(get_engine(db_path))
+    add_run(db_path, 0.1, datetime(2026, 9, 30, 23))
+    add_run(db_path, 0.2, datetime(2026, 10, 1))
+
+    assert export_incremental(db_path, PREFIX) == 2
+    assert export_incremental(db_path, PREFIX) == 0
+    september = fake_gcs.objects[("bucket", "db/runs_export/runs-2026-09-1.csv.gz")]
+
+    add_run(db_path, 0.3, datetime(2026, 10, 2))
+    assert export_incremental(db_path, PREFIX) == 1
+
+    manifest, _ = load_manifest(PREFIX, tmp_path)
+    assert manifest["max_id"] == 3 and manifest["rows"] == 3
+    assert {k: p["file"] for k, p in manifest["partitions"].items()} == {
+        "2026-09": "runs-2026-09-1.csv.gz",
+        "2026-10": "runs-2026-10-3.csv.gz",
+    }
+    # 9 月のファイルは書き直されず、置き換えられた 10 月の古いファイルは削除される
+    assert fake_gcs.objects[("bucket", "db/runs_export/runs-2026-09-1.csv.gz")] == september
+    assert fake_gcs.paths(PREFIX + "runs-2026-10") == [PREFIX + "runs-2026-10-3.csv.gz"]
+
+    df = read_export(PREFIX)
+    assert sorted(df["id"]) == [1, 2, 3]
+    assert "train_code" in df.columns
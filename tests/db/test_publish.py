@@ -0,0 +1,96 @@
+import pytest
+
+from mplm.db.base import init_db
+from mplm.db.crud import create_run_record
+from mplm.db.models import RunRecord
+from mplm.db.publish import download_db_with_generation, publish_db
+from mplm.db.segment_sync import get_watermarks
+from mplm.db.session import get_engine, get_session
+from mplm.utils import gcs
+from mplm.utils.exceptions import DBPublishConflictError
+
+GCS_DB = "gs://bucket/db/runs.db"
+
+
+def add_run(db_path, accuracy_val):
+    with get_session(db_path)() as db:
+        create_run_record(
+            db,
+            train_code="code",
+            model_name="RF",
+            model_path="p",
+            dataset_summary="s",
+            accuracy_val=accuracy_val,
+            accuracy_test=accuracy_val,
+        )
+
+
+def accuracies(db_path):
+    with get_session(db_path)() as db:
+        return sorted(r.accuracy_val for r in db.query(RunRecord).all())
+
+
+def start_job(tmp_path, name):
+    """ジョブ開始時の処理（DB を generation 付きでダウンロードし、watermark を記録する）"""
+    db_path = str(tmp_path / f"{name}.db")
+    generation = download_db_with_generation(db_path, GCS_DB)
+    init_db(get_engine(db_path))
+    return db_path, generation, get_watermarks(db_path)
+
+
+def test_concurrent_jobs_keep_all_rows(tmp_path, fake_gcs):
+    """同時に走った 2 つのジョブの行が、後からアップロードした側のマージで両方とも残る"""
+    seed = str(tmp_path / "seed.db")
+    init_db(get_engine(seed))
+    add_run(seed, 0.1)
+    publish_db(seed, GCS_DB, 0, get_watermarks(seed))
+
+    job_a, gen_a, wm_a = start_job(tmp_path, "a")
+    job_b, gen_b, wm_b = start_job(tmp_path, "b")
+    assert gen_a == gen_b > 0
+    add_run(job_a, 0.5)
+    add_run(job_b, 0.7)
+
+    publish_db(job_a, GCS_DB, gen_a, wm_a, backoff_sec=0)
+    final_generation = publish_db(job_b, GCS_DB, gen_b, wm_b, backoff_sec=0)
+
+    result = str(tmp_path / "result.db")
+    assert download_db_with_generation(result, GCS_DB) == final_generation
+    assert accuracies(result) == [0.1, 0.5, 0.7]
+    assert accuracies(job_b) == [0.1, 0.5, 0.7]  # ローカルもマージ後の DB になる
+
+
+def test_first_publish_conflicts_with_other_creator(tmp_path, fake_gcs):
+    """DB がまだ無い状態で始めた 2 つのジョブも、どちらの行も失わない"""
+    job_a, gen_a, wm_a = start_job(tmp_path, "a")
+    job_b, gen_b, wm_b = start_job(tmp_path, "b")
+    assert gen_a == gen_b == 0
+    add_run(job_a, 0.2)
+    add_run(job_b, 0.3)
+
+    publish_db(job_a, GCS_DB, gen_a, wm_a, backoff_sec=0)
+    publish_db(job_b, GCS_DB, gen_b, wm_b, backoff_sec=0)
+
+    result = str(tmp_path / "result.db")
+    download_db_with_generation(result, GCS_DB)
+    assert accuracies(result) == [0.2, 0.3]
+
+
+def test_publish_gives_up_after_max_attempts(tmp_path, fake_gcs, monkeypatch):
+    """毎回ほかのジョブに先を越されると、max_attempts 回で DBPublishConflictError になる"""
+    job, generation, watermarks = start_job(tmp_path, "job")
+    add_run(job, 0.4)
+    other = str(tmp_path / "other.db")
+    init_db(get_engine(other))
+    gcs.upload_file_to_gcs(other, GCS_DB)
+
+    download = gcs.download_file_from_gcs_with_generation
+
+    def download_then_overwrite(gcs_path, local_path):
+        result = download(gcs_path, local_path)
+        gcs.upload_file_to_gcs(other, GCS_DB)  # マージ中に別のジョブがアップロードする
+        return result
+
+    monkeypatch.setattr("mplm.db.publish.download_file_from_gcs_with_generation", download_then_overwrite)
+    with pytest.raises(DBPublishConflictError):
+        publish_db(job, GCS_DB, generation, watermarks, max_attempts=3, backoff_sec=0)
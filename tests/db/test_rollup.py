@@ -0,0 +1,90 @@
+from sqlalchemy import delete
+
+from mplm.db.base import init_db
+from mplm.db.crud import create_model_run_event, create_run_record
+from mplm.db.models import AccuracyRollup
+from mplm.db.rollup import ensure_accuracy_rollups, get_accuracy_rollups_as_df, histogram_quantile
+from mplm.db.segment_sync import apply_segment, export_segment, get_watermarks
+from mplm.db.session import get_engine, get_session
+
+
+def new_db(path) -> str:
+    init_db(get_engine(str(path)))
+    return str(path)
+
+
+def add_run(db_path, llm_name, accuracy_val, accuracy_test=None):
+    with get_session(db_path)() as db:
+        create_run_record(
+            db,
+            train_code="code",
+            model_name="RF",
+            model_path="p",
+            dataset_summary="s",
+            accuracy_val=accuracy_val,
+            accuracy_test=accuracy_val if accuracy_test is None else accuracy_test,
+            llm_name=llm_name,
+        )
+
+
+def rollups(db_path):
+    with get_engine(db_path).begin() as conn:
+        return get_accuracy_rollups_as_df(conn)
+
+
+def test_rollup_updated_on_insert(tmp_path):
+    """create_run_record / 失敗イベントの追加ごとに LLM・日単位の集計が更新される"""
+    db_path = new_db(tmp_path / "runs.db")
+    for value in (0.70, 0.80, 0.90):
+        add_run(db_path, "a", value, accuracy_test=value - 0.1)
+    add_run(db_path, None, 0.5)
+    with get_session(db_path)() as db:
+        create_model_run_event(db, llm_name="a", success=False)
+        create_model_run_event(db, llm_name="a", success=True)
+
+    df = rollups(db_path).set_index("llm_name")
+    a = df.loc["a"]
+    assert a["run_count"] == 3 and a["failure_count"] == 1
+    assert abs(a["val_mean"] - 0.8) < 1e-9 and abs(a["test_mean"] - 0.7) < 1e-9
+    assert (a["val_min"], a["val_max"]) == (0.70, 0.90)
+    assert abs(a["val_p50"] - 0.8) <= 0.01
+    assert df.loc["unknown", "run_count"] == 1
+
+
+def test_ensure_rebuilds_missing_rollups(tmp_path):
+    """集計が実行記録と食い違う（集計テーブル導入前の DB）と作り直す"""
+    db_path = new_db(tmp_path / "runs.db")
+    add_run(db_path, "a", 0.7)
+    add_run(db_path, "b", 0.8)
+    expected = rollups(db_path)
+
+    engine = get_engine(db_path)
+    with engine.begin() as conn:
+        conn.execute(delete(AccuracyRollup.__table__))
+        assert ensure_accuracy_rollups(conn)
+        assert not ensure_accuracy_rollups(conn)
+    assert rollups(db_path).drop(columns=["day"]).equals(expected.drop(columns=["day"]))
+
+
+def test_apply_segment_updates_rollup(tmp_path):
+    """セグメントから取り込んだ行も集計に加わる"""
+    source = new_db(tmp_path / "source.db")
+    watermarks = get_watermarks(source)
+    add_run(source, "a", 0.6)
+    segment = tmp_path / "seg.jsonl"
+    export_segment(source, watermarks, segment)
+
+    target = new_db(tmp_path / "target.db")
+    add_run(target, "a", 0.8)
+    apply_segment(target, segment)
+
+    a = rollups(target).set_index("llm_name").loc["a"]
+    assert a["run_count"] == 2 and abs(a["val_mean"] - 0.7) < 1e-9
+
+
+def test_histogram_quantile():
+    """ビン内は一様分布とみなして補間する"""
+    hist = [0] * 10
+    hist[5] = 4
+    assert histogram_quantile(hist, 0.5) == 0.55
+    assert histogram_quantile([0] * 10, 0.5) is None
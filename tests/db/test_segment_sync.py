@@ -0,0 +1,115 @@
+from mplm.db.base import init_db
+from mplm.db.crud import create_model_run_event, create_run_record, create_run_spans, get_run_spans_as_df
+from mplm.db.models import RunRecord
+from mplm.db.segment_sync import (
+    apply_segment,
+    compact_segments,
+    export_segment,
+    get_watermarks,
+    load_history,
+    needs_history,
+    publish_segment,
+)
+from mplm.db.session import get_engine, get_session
+from mplm.models.tracing import SpanRecord
+from mplm.settings import settings
+
+BASE = "gs://bucket/db/runs.db"
+SEGMENTS = "gs://bucket/db/runs_segments/"
+
+
+def new_db(path) -> str:
+    init_db(get_engine(str(path)))
+    return str(path)
+
+
+def add_run(db_path, accuracy_val, with_span=False):
+    with get_session(db_path)() as db:
+        record = create_run_record(
+            db,
+            train_code="code",
+            model_name="RF",
+            model_path="p",
+            dataset_summary="s",
+            accuracy_val=accuracy_val,
+            accuracy_test=accuracy_val,
+        )
+        if with_span:
+            create_run_spans(db, run_id=record.id, spans=[SpanRecord(span_id=0, name="training", kind="node", wall_sec=1.0)])
+        create_model_run_event(db, llm_name="m", success=True)
+        return record.id
+
+
+def accuracies(db_path):
+    with get_session(db_path)() as db:
+        return sorted(r.accuracy_val for r in db.query(RunRecord).all())
+
+
+def test_export_and_apply_segment(tmp_path):
+    """新しい行だけを書き出し、別の DB では新しい id を振って外部キーを付け替える（再適用は無視）"""
+    source = new_db(tmp_path / "source.db")
+    add_run(source, 0.1)
+    watermarks = get_watermarks(source)
+    add_run(source, 0.7, with_span=True)
+
+    segment = tmp_path / "seg.jsonl"
+    assert export_segment(source, watermarks, segment) == 3  # runs, run_spans, model_run_events
+
+    target = new_db(tmp_path / "target.db")
+    add_run(target, 0.2)
+    add_run(target, 0.3)
+    assert apply_segment(target, segment) == 3
+    assert apply_segment(target, segment) == 0
+
+    assert accuracies(target) == [0.2, 0.3, 0.7]
+    with get_session(target)() as db:
+        spans = get_run_spans_as_df(db)
+        run = db.query(RunRecord).filter(RunRecord.accuracy_val == 0.7).one()
+    assert list(spans["run_id"]) == [run.id] and run.id == 3
+
+
+def test_publish_and_compact(tmp_path, fake_gcs):
+    """並行ジョブのセグメントを compaction で base に統合し、統合済みセグメントを削除する"""
+    job_dbs = []
+    for i in range(3):
+        db_path = new_db(tmp_path / f"job{i}.db")
+        watermarks = get_watermarks(db_path)
+        add_run(db_path, i / 10, with_span=True)
+        assert publish_segment(db_path, watermarks, segments_prefix=SEGMENTS) is not None
+        job_dbs.append(db_path)
+
+    empty = new_db(tmp_path / "empty.db")
+    assert publish_segment(empty, get_watermarks(empty), segments_prefix=SEGMENTS) is None
+    assert len(fake_gcs.paths(SEGMENTS)) == 3
+
+    work = str(tmp_path / "work.db")
+    assert not compact_segments(work, gcs_db_path=BASE, segments_prefix=SEGMENTS, min_segments=4)
+    assert compact_segments(work, gcs_db_path=BASE, segments_prefix=SEGMENTS, min_segments=2)
+    assert fake_gcs.paths(SEGMENTS) == []
+    assert accuracies(work) == [0.0, 0.1, 0.2]
+
+    # 次のジョブは base + 未統合セグメントから履歴を復元する
+    db_path = new_db(tmp_path / "job3.db")
+    watermarks = get_watermarks(db_path)
+    add_run(db_path, 0.9)
+    publish_segment(db_path, watermarks, segments_prefix=SEGMENTS)
+
+    history = str(tmp_path / "history.db")
+    assert load_history(history, gcs_db_path=BASE, segments_prefix=SEGMENTS) == 1
+    assert accuracies(history) == [0.0, 0.1, 0.2, 0.9]
+    with get_session(history)() as db:
+        assert len(get_run_spans_as_df(db)) == 3
+
+
+def test_needs_history(monkeypatch):
+    """要約キャッシュ・健全性によるモデル選択のどちらかを使うなら履歴を読み込む"""
+    monkeypatch.setattr(settings, "db_load_history", False)
+    monkeypatch.setattr(settings, "summary_cache_mode", "off")
+    monkeypatch.setattr(settings, "model_health_window_days", 14.0)
+    assert needs_history()
+
+    monkeypatch.setattr(settings, "model_health_window_days", 0)
+    assert not needs_history()
+
+    monkeypatch.setattr(settings, "summary_cache_mode", "latest")
+    assert needs_history()
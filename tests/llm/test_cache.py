@@ -0,0 +1,168 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from mplm import settings
+from mplm.llm.cache import CachedLLM, LLMResponseCache, make_cache_key
+from mplm.llm.client import get_llm
+from mplm.llm.rate_limit import RateLimitedLLM
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(str(tmp_path / "llm_cache.db"), ttl_sec=None, max_entries=None)
+
+
+def make_llm(response):
+    llm = MagicMock()
+    llm.invoke.return_value = response
+    llm.ainvoke = AsyncMock(return_value=response)
+    llm.model_name = "m"
+    return llm
+
+
+def test_cached_llm_replays_response(cache):
+    """同じプロンプトの 2 回目以降は LLM を呼ばずキャッシュから返す"""
+    llm = make_llm(AIMessage(content="answer"))
+    cached = CachedLLM(llm, cache, model_name="m", temperature=0.0)
+
+    first = cached.invoke("prompt")
+    second = cached.invoke("prompt")
+
+    llm.invoke.assert_called_once_with("prompt")
+    assert isinstance(second, AIMessage)
+    assert first.content == second.content == "answer"
+    assert cached.model_name == "m"
+
+
+def test_cached_llm_async(cache):
+    """ainvoke も invoke と同じキャッシュを共有する"""
+    llm = make_llm("text answer")
+    cached = CachedLLM(llm, cache, model_name="m", temperature=0.0)
+
+    cached.invoke("prompt")
+    result = asyncio.run(cached.ainvoke("prompt"))
+
+    assert result == "text answer"
+    llm.ainvoke.assert_not_called()
+
+
+def test_cache_key_depends_on_model_and_temperature():
+    """モデル名・temperature・プロンプトが異なればキーも異なる"""
+    keys = {
+        make_cache_key("m", 0.0, "p"),
+        make_cache_key("m2", 0.0, "p"),
+        make_cache_key("m", 0.5, "p"),
+        make_cache_key("m", 0.0, "p2"),
+    }
+    assert len(keys) == 4
+
+
+def test_fallback_answer_cached_under_fallback_model(cache):
+    """フェイルオーバーで別モデルが答えた応答は、そのモデルのキーで保存される"""
+
+    class RateLimitError(Exception):
+        pass
+
+    primary = MagicMock()
+    primary.invoke.side_effect = RateLimitError("429")
+    fallback = make_llm("fallback answer")
+    llm = RateLimitedLLM([("m", primary), ("f", fallback)], backoff_base_sec=10)
+    cached = CachedLLM(llm, cache, model_name="m", temperature=0.0)
+
+    assert cached.invoke("prompt") == "fallback answer"
+    assert cache.get(make_cache_key("m", 0.0, "prompt")) is None
+    assert cache.get(make_cache_key("f", 0.0, "prompt")) == "fallback answer"
+
+
+def test_high_temperature_not_cached(cache):
+    """max_temperature を超える呼び出しはキャッシュしない"""
+    llm = make_llm("x")
+    cached = CachedLLM(llm, cache, model_name="m", temperature=1.0, max_temperature=0.5)
+
+    cached.invoke("prompt")
+    cached.invoke("prompt")
+
+    assert llm.invoke.call_count == 2
+
+
+def test_ttl_expiry(tmp_path):
+    """TTL を過ぎたエントリはミスになる"""
+    cache = LLMResponseCache(str(tmp_path / "c.db"), ttl_sec=10)
+    with patch("mplm.llm.cache.time.time", return_value=1000.0):
+        cache.put("k", "v", "m", 0.0)
+        assert cache.get("k") == "v"
+    with patch("mplm.llm.cache.time.time", return_value=1011.0):
+        assert cache.get("k") is None
+
+
+def test_lru_eviction(tmp_path):
+    """上限を超えると最も長く使われていないエントリから削除される"""
+    cache = LLMResponseCache(str(tmp_path / "c.db"), max_entries=2)
+    with patch("mplm.llm.cache.time.time", side_effect=[1.0, 2.0, 3.0, 4.0]):
+        cache.put("a", "A", "m", 0.0)
+        cache.put("b", "B", "m", 0.0)
+        cache.get("a")
+        cache.put("c", "C", "m", 0.0)
+
+    assert cache.get("a") == "A"
+    assert cache.get("b") is None
+    assert cache.get("c") == "C"
+
+
+def test_get_llm_wraps_when_enabled(tmp_path, monkeypatch):
+    """LLM_CACHE_FILE が設定されていれば get_llm はキャッシュ付きクライアントを返す"""
+    monkeypatch.setattr(settings.settings, "openrouter_api_key", "fake-api-key")
+    monkeypatch.setattr(settings.settings, "llm_cache_file", str(tmp_path / "llm_cache.db"))
+    mock_chat = MagicMock()
+    with patch("mplm.llm.client.ChatOpenAI", return_value=mock_chat):
+        llm = get_llm("explicit-model", temperature=0.0)
+
+    assert isinstance(llm, CachedLLM)
+    assert llm.llm is mock_chat
+
+
+def test_cached_llm_stream(cache):
+    """最後まで受信したストリームは保存され、次回は 1 チャンクで再生される"""
+    llm = MagicMock()
+    llm.stream.return_value = iter(["a", "b", "c"])
+    cached = CachedLLM(llm, cache, model_name="m", temperature=0.0)
+
+    assert list(cached.stream("prompt")) == ["a", "b", "c"]
+    assert list(cached.stream("prompt")) == ["abc"]
+    llm.stream.assert_called_once()
+
+
+def test_cached_llm_stream_closed_early(cache):
+    """呼び出し側が打ち切ったストリームは受信済みの部分が保存される"""
+    llm = MagicMock()
+    llm.stream.side_effect = lambda prompt: iter(["a", "b", "c"])
+    cached = CachedLLM(llm, cache, model_name="m", temperature=0.0)
+
+    stream = cached.stream("prompt")
+    next(stream)
+    next(stream)
+    stream.close()
+
+    assert list(cached.stream("prompt")) == ["ab"]
+    llm.stream.assert_called_once()
+
+
+def test_cached_llm_stream_error_not_stored(cache):
+    """途中でエラーになったストリームは保存しない"""
+
+    def failing(prompt):
+        yield "a"
+        raise RuntimeError("connection lost")
+
+    llm = MagicMock()
+    llm.stream.side_effect = failing
+    cached = CachedLLM(llm, cache, model_name="m", temperature=0.0)
+
+    with pytest.raises(RuntimeError):
+        list(cached.stream("prompt"))
+    with pytest.raises(RuntimeError):
+        list(cached.stream("prompt"))
+    assert llm.stream.call_count == 2
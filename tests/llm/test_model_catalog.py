@@ -0,0 +1,85 @@
+import time
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+
+from mplm.db.base import init_db
+from mplm.llm import model_catalog
+from mplm.llm.model_catalog import get_free_models, get_model_health, is_healthy, record_model_run, select_models
+from mplm.llm.model_list import OPEN_ROUTER_FREE_MODEL_LIST
+from mplm.models.catalog import ModelCatalogSnapshot, ModelHealth
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    init_db(create_engine(f"sqlite:///{path}"))
+    return path
+
+
+def write_snapshot(cache_dir, models, age_sec):
+    snapshot = ModelCatalogSnapshot(fetched_at=time.time() - age_sec, models=models)
+    (cache_dir / model_catalog.CATALOG_FILE).write_text(snapshot.model_dump_json())
+
+
+def test_fresh_cache_skips_network(tmp_path):
+    """TTL 内のキャッシュがあればネットワークにアクセスしない"""
+    write_snapshot(tmp_path, ["a:free"], age_sec=10)
+    with patch("mplm.llm.model_catalog.fetch_free_models") as mock_fetch:
+        assert get_free_models(ttl_sec=60, cache_dir=str(tmp_path)) == ["a:free"]
+    mock_fetch.assert_not_called()
+
+
+def test_stale_cache_refreshed_in_background(tmp_path):
+    """期限切れのキャッシュは即座に返し、裏で更新する"""
+    write_snapshot(tmp_path, ["old:free"], age_sec=100)
+    with patch("mplm.llm.model_catalog.fetch_free_models", return_value=["new:free"]):
+        assert get_free_models(ttl_sec=60, cache_dir=str(tmp_path)) == ["old:free"]
+        # 更新スレッドの終了を待つ
+        with model_catalog._refresh_lock:
+            pass
+    assert get_free_models(ttl_sec=60, cache_dir=str(tmp_path)) == ["new:free"]
+
+
+def test_no_cache_fetch_failure_uses_static_list(tmp_path):
+    """キャッシュがなく取得にも失敗した場合は静的リスト"""
+    with patch("mplm.llm.model_catalog.fetch_free_models", side_effect=OSError("offline")):
+        assert get_free_models(cache_dir=str(tmp_path)) == OPEN_ROUTER_FREE_MODEL_LIST
+
+
+def test_model_health(db_path):
+    """実行履歴から成功率・レイテンシ・直近の 429 を集計する"""
+    for success, latency in [(True, 10.0), (True, 20.0), (False, 30.0), (True, 40.0)]:
+        record_model_run("good", success=success, latency_sec=latency, db_path=db_path)
+    record_model_run("limited", success=False, latency_sec=1.0, rate_limited=True, db_path=db_path)
+
+    health = get_model_health(db_path=db_path)
+
+    assert health["good"].runs == 4
+    assert health["good"].success_rate == 0.75
+    assert health["good"].p50_latency_sec == 25.0
+    assert health["good"].last_rate_limited_at is None
+    assert health["limited"].last_rate_limited_at is not None
+
+
+def test_select_models_skips_unhealthy():
+    """失敗が多い・遅い・直近で 429 のモデルは選ばれない（履歴のないモデルは選ばれる）"""
+    now = datetime.now(UTC).replace(tzinfo=None)
+    health = {
+        "failing": ModelHealth(llm_name="failing", runs=5, success_rate=0.0),
+        "slow": ModelHealth(llm_name="slow", runs=5, success_rate=1.0, p95_latency_sec=1e6),
+        "limited": ModelHealth(llm_name="limited", runs=1, success_rate=1.0, last_rate_limited_at=now),
+        "ok": ModelHealth(llm_name="ok", runs=5, success_rate=0.8, p95_latency_sec=100.0),
+    }
+    models = ["failing", "slow", "limited", "ok", "new"]
+
+    assert sorted(select_models(5, models=models, health=health)) == ["new", "ok"]
+    assert is_healthy(health["limited"], now=now + timedelta(days=1))
+
+
+def test_select_models_falls_back_to_all():
+    """健全なモデルが 1 つもなければ全モデルから選ぶ"""
+    health = {"failing": ModelHealth(llm_name="failing", runs=5, success_rate=0.0)}
+    assert select_models(1, models=["failing"], health=health) == ["failing"]
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from mplm import settings
+from mplm.llm import rate_limit
+from mplm.llm.client import get_llm
+from mplm.llm.rate_limit import RateLimitedLLM, TokenBucket, retry_after_seconds
+from mplm.utils.exceptions import LLMRateLimitError
+
+
+class FakeHTTPError(Exception):
+    """status_code と response.headers を持つ HTTP エラー（openai.APIStatusError 相当）"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = MagicMock(headers=headers or {})
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    rate_limit._buckets.clear()
+    rate_limit._cooldown_until.clear()
+    yield
+    rate_limit._buckets.clear()
+    rate_limit._cooldown_until.clear()
+
+
+def make_client(*effects):
+    client = MagicMock()
+    client.invoke.side_effect = list(effects)
+    client.ainvoke = AsyncMock(side_effect=list(effects))
+    return client
+
+
+def test_token_bucket_limits_rate():
+    """容量を使い切ると次のトークンまでの待ち時間を返す"""
+    bucket = TokenBucket(rate_per_sec=10, capacity=2)
+
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    wait = bucket.try_acquire()
+    assert 0 < wait <= 0.1
+
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start >= wait * 0.5
+
+
+def test_retry_after_header():
+    """Retry-After（秒）と X-RateLimit-Reset（epoch ms）を解釈する"""
+    assert retry_after_seconds(FakeHTTPError(429, {"retry-after": "3"})) == 3.0
+    reset = retry_after_seconds(FakeHTTPError(429, {"x-ratelimit-reset": str((time.time() + 5) * 1000)}))
+    assert 4 < reset <= 5
+    assert retry_after_seconds(FakeHTTPError(429)) is None
+
+
+def test_failover_on_rate_limit():
+    """429 を受けたモデルはクールダウンし、次のモデルで再試行する"""
+    primary = make_client(FakeHTTPError(429, {"retry-after": "30"}))
+    fallback = make_client("answer")
+    llm = RateLimitedLLM([("a/primary", primary), ("b/fallback", fallback)], backoff_max_sec=60)
+
+    assert llm.invoke("prompt") == "answer"
+    assert llm.model == "b/fallback"
+    assert rate_limit.answered_model_name() == "b/fallback"
+    assert rate_limit.cooldown_remaining("a/primary") > 25
+
+
+def test_backoff_then_success():
+    """単一モデルではバックオフ後に同じモデルで再試行する"""
+    client = make_client(FakeHTTPError(503), "answer")
+    llm = RateLimitedLLM([("m", client)], backoff_base_sec=0.01, backoff_max_sec=0.05)
+
+    assert llm.invoke("prompt") == "answer"
+    assert client.invoke.call_count == 2
+
+
+def test_non_retryable_error_propagates():
+    """429/5xx 以外のエラーはそのまま送出する"""
+    client = make_client(ValueError("bad prompt"))
+    llm = RateLimitedLLM([("m", client)])
+
+    with pytest.raises(ValueError):
+        llm.invoke("prompt")
+    assert client.invoke.call_count == 1
+
+
+def test_gives_up_after_max_attempts():
+    """全モデルが制限され続けた場合は LLMRateLimitError"""
+    client = make_client(*[FakeHTTPError(429)] * 3)
+    llm = RateLimitedLLM([("m", client)], max_attempts=3, backoff_base_sec=0.001, backoff_max_sec=0.01)
+
+    with pytest.raises(LLMRateLimitError):
+        llm.invoke("prompt")
+    assert client.invoke.call_count == 3
+
+
+def test_async_failover():
+    """ainvoke でも同様にフェイルオーバーする"""
+    primary = make_client(FakeHTTPError(429))
+    fallback = make_client("answer")
+    llm = RateLimitedLLM([("p", primary), ("f", fallback)], backoff_base_sec=10)
+
+    assert asyncio.run(llm.ainvoke("prompt")) == "answer"
+
+
+def test_get_llm_wraps_when_enabled(monkeypatch):
+    """フォールバックモデルが設定されていれば RateLimitedLLM を返す"""
+    monkeypatch.setattr(settings.settings, "openrouter_api_key", "fake-api-key")
+    monkeypatch.setattr(settings.settings, "llm_fallback_models", ["x/fallback"])
+    with patch("mplm.llm.client.ChatOpenAI") as mock_class:
+        llm = get_llm("x/primary")
+
+    assert isinstance(llm, RateLimitedLLM)
+    assert [name for name, _ in llm.clients] == ["x/primary", "x/fallback"]
+    assert mock_class.call_args.kwargs["max_retries"] == 0
+
+
+def test_get_llm_without_fallback(monkeypatch):
+    """fallback=False ではフォールバックモデルを使わない（特定モデルの評価用）"""
+    monkeypatch.setattr(settings.settings, "openrouter_api_key", "fake-api-key")
+    monkeypatch.setattr(settings.settings, "llm_fallback_models", ["x/fallback"])
+    monkeypatch.setattr(settings.settings, "llm_requests_per_min", 10)
+    with patch("mplm.llm.client.ChatOpenAI"):
+        llm = get_llm("x/primary", fallback=False)
+
+    assert isinstance(llm, RateLimitedLLM)
+    assert [name for name, _ in llm.clients] == ["x/primary"]
+
+
+def test_stream_failover_before_first_chunk():
+    """最初のチャンク受信前の 429 は次のモデルにフェイルオーバーする"""
+
+    def limited_stream(prompt):
+        raise FakeHTTPError(429)
+        yield  # pragma: no cover
+
+    primary = MagicMock()
+    primary.stream.side_effect = limited_stream
+    fallback = MagicMock()
+    fallback.stream.return_value = iter(["x", "y"])
+    llm = RateLimitedLLM([("p", primary), ("f", fallback)], backoff_base_sec=10)
+
+    assert list(llm.stream("prompt")) == ["x", "y"]
+    assert llm.model == "f"
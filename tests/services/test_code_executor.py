@@ -1,6 +1,6 @@
 import pytest
 
-from mplm.services.code_executor import safe_exec
+from mplm.services.code_executor import CodeCache, code_cache, execute_code, safe_exec
 from mplm.utils.exceptions import CodeExecutionError
 
 
@@ -25,3 +25,40 @@ def test_safe_exec_invalid_code():
 
     with pytest.raises(CodeExecutionError, match="Execution failed:"):
         safe_exec(code, globals_, locals_)
+
+
+def test_execute_code_reuses_compiled_code():
+    """同じソースの 2 回目以降はコンパイル済みコードを再利用し、実行時間を別に計測する"""
+    code_cache.clear()
+    code = "value = sum(range(10))"
+
+    first_locals, second_locals = {}, {}
+    first = execute_code(code, {}, first_locals)
+    second = execute_code(code, {}, second_locals)
+
+    assert not first.cache_hit and first.compile_sec > 0
+    assert second.cache_hit and second.compile_sec == 0.0
+    assert first_locals["value"] == second_locals["value"] == 45
+    assert second.run_sec >= 0
+    assert (code_cache.hits, code_cache.misses) == (1, 1)
+
+
+def test_code_cache_lru_eviction():
+    """上限を超えると最も長く使われていないコードから削除される"""
+    cache = CodeCache(maxsize=2)
+    cache.compile("a = 1")
+    cache.compile("b = 2")
+    cache.compile("a = 1")
+    cache.compile("c = 3")
+
+    assert len(cache) == 2
+    assert cache.compile("a = 1")[2] is True
+    assert cache.compile("b = 2")[2] is False
+
+
+def test_execute_code_syntax_error_not_cached():
+    """コンパイルできないコードは SyntaxError になりキャッシュされない"""
+    cache_size = len(code_cache)
+    with pytest.raises(SyntaxError):
+        execute_code("def broken(:", {}, {})
+    assert len(code_cache) == cache_size
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from mplm.services.code_parser import (
+    CodeBlockStreamParser,
+    aextract_code_from_stream,
+    extract_code_from_block,
+    extract_code_from_stream,
+)
+
+OUTPUT = "Here is the code:\n```python\nx = 1\nprint(x)\n```\nExplanation: this prints 1. ```python\ny = 2\n```"
+
+
+def split_every(text, n):
+    return [text[i:i + n] for i in range(0, len(text), n)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_stream_parser_matches_block_parser(size):
+    """どのチャンク境界でも extract_code_from_block と同じ結果になる"""
+    parser = CodeBlockStreamParser()
+    results = [parser.feed(chunk) for chunk in split_every(OUTPUT, size)]
+    first = next(r for r in results if r is not None)
+
+    assert first == extract_code_from_block(OUTPUT) == "x = 1\nprint(x)"
+
+
+def test_extract_code_from_stream_stops_early():
+    """閉じフェンスを受信した時点でストリームを打ち切る"""
+    consumed = []
+    closed = []
+
+    def stream():
+        try:
+            for chunk in split_every(OUTPUT, 4):
+                consumed.append(chunk)
+                yield AIMessageChunk(content=chunk)
+        finally:
+            closed.append(True)
+
+    code = extract_code_from_stream(stream())
+
+    assert code == "x = 1\nprint(x)"
+    assert closed == [True]
+    assert "".join(consumed) != OUTPUT
+    assert "Explanation" not in "".join(consumed)
+
+
+def test_extract_code_from_stream_not_found():
+    """コードブロックが完結しないまま終わった場合は ValueError"""
+    with pytest.raises(ValueError):
+        extract_code_from_stream(iter(["```python\nx = 1\n"]))
+
+
+def test_aextract_code_from_stream():
+    """非同期ストリームでも同様に抽出できる"""
+
+    async def stream():
+        for chunk in split_every(OUTPUT, 5):
+            yield chunk
+
+    assert asyncio.run(aextract_code_from_stream(stream())) == "x = 1\nprint(x)"
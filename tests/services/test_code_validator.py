@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from mplm.services.code_validator import validate_summary_code, validate_training_code
+from mplm.services.training_executor import execute_training_code
+from mplm.utils.exceptions import CodeExecutionError, CodeValidationError
+
+VALID_CODE = """
+from sklearn.linear_model import LogisticRegression
+import numpy as np
+
+features = [c for c in df_train.columns if c != "survived"]
+model = LogisticRegression()
+model.fit(df_train[features], df_train["survived"])
+try:
+    accuracy_val, accuracy_test = (
+        model.score(df_val[features], df_val["survived"]),
+        model.score(df_test[features], df_test["survived"]),
+    )
+except ValueError:
+    accuracy_val = accuracy_test = 0.0
+"""
+
+
+def test_valid_code_passes():
+    """正しいコード（タプル代入・try 内の代入を含む）は通る"""
+    validate_training_code(VALID_CODE)
+    validate_summary_code("summary_text = str(df.shape)")
+
+
+@pytest.mark.parametrize(
+    "code, message",
+    [
+        ("model = 1\naccuracy_val = (\naccuracy_test = 1", "SyntaxError"),
+        ("import os\nmodel = accuracy_val = accuracy_test = 1", "Importing os is not allowed (line 1: import os)"),
+        ("from subprocess import run\nmodel = accuracy_val = accuracy_test = 1", "Importing subprocess"),
+        ("import xgboost_not_installed\nmodel = accuracy_val = accuracy_test = 1", "not installed"),
+        ("model = accuracy_val = accuracy_test = eval('1')", "Calling eval() is not allowed"),
+        ("model = 1\naccuracy_val = 0.5", "accuracy_test"),
+        ("def train():\n    model = 1\n    accuracy_val = accuracy_test = 0\ntrain()", "model, accuracy_val, accuracy_test"),
+    ],
+)
+def test_invalid_code_rejected(code, message):
+    """構文エラー・禁止 import・未導入モジュール・禁止関数・必須変数の欠落を検出する"""
+    with pytest.raises(CodeValidationError) as excinfo:
+        validate_training_code(code)
+    assert message in str(excinfo.value)
+
+
+def test_execute_training_code_validates_first():
+    """検証エラーは実行前に CodeExecutionError（CodeValidationError）として送出される"""
+    df = pd.DataFrame({"x": range(10), "survived": [i % 2 for i in range(10)]})
+
+    with pytest.raises(CodeExecutionError, match="never assigns required variable"):
+        execute_training_code(df=df, code="model = 1")
@@ -1,5 +1,24 @@
+import sqlite3
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
 from mplm.models.data import DatasetMetadata
-from mplm.services.data_loader import load_titanic_dataset
+from mplm.services.data_loader import (
+    DATASET_SOURCES,
+    DatasetSource,
+    build_metadata_streaming,
+    get_dataset_source,
+    load_dataset,
+    load_titanic_dataset,
+    register_dataset_source,
+)
+from mplm.services.split_cache import dataset_fingerprint
+from mplm.settings import settings
+from mplm.utils.exceptions import DatasetUnavailableError
 
 
 def test_load_titanic_dataset():
@@ -13,3 +32,130 @@ def test_load_titanic_dataset():
     assert "age" in df.columns
     assert isinstance(metadata.num_rows, int)
     assert isinstance(metadata.missing_counts, dict)
+
+
+def make_fake_openml_bunch():
+    frame = pd.DataFrame(
+        {
+            "pclass": [1.0, 3.0, 2.0],
+            "name": ["A", "B", None],
+            "sex": pd.Categorical(["male", "female", "female"]),
+            "age": [22.0, np.nan, 35.0],
+            "survived": pd.Categorical(["0", "1", "1"]),
+        }
+    )
+    return SimpleNamespace(frame=frame, details={"md5_checksum": "abc123"})
+
+
+@pytest.fixture
+def tmp_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "dataset_offline", False)
+    return tmp_path
+
+
+def test_load_titanic_dataset_uses_cache(tmp_cache_dir):
+    """2回目以降はネットワークを使わずローカルキャッシュ（memmap）から読み込む"""
+    bunch = make_fake_openml_bunch()
+    with patch("mplm.services.data_loader.fetch_openml", return_value=bunch) as mock_fetch:
+        df1, metadata1 = load_titanic_dataset()
+        assert mock_fetch.call_count == 1
+
+    assert (tmp_cache_dir / "datasets" / "titanic" / "1" / "abc123").is_dir()
+
+    with patch("mplm.services.data_loader.fetch_openml", side_effect=RuntimeError("network")) as mock_fetch:
+        df2, metadata2 = load_titanic_dataset()
+        mock_fetch.assert_not_called()
+
+    pd.testing.assert_frame_equal(df2, bunch.frame)
+    assert metadata2 == metadata1
+    assert metadata2.missing_counts == {"pclass": 0, "name": 1, "sex": 0, "age": 1, "survived": 0}
+    assert dataset_fingerprint(df2) == dataset_fingerprint(bunch.frame.copy())
+
+
+def test_load_titanic_dataset_offline_without_cache(tmp_cache_dir, monkeypatch):
+    """オフラインモードでキャッシュが無い場合は DatasetUnavailableError"""
+    monkeypatch.setattr(settings, "dataset_offline", True)
+    with patch("mplm.services.data_loader.fetch_openml") as mock_fetch:
+        with pytest.raises(DatasetUnavailableError):
+            load_titanic_dataset()
+        mock_fetch.assert_not_called()
+
+
+def test_csv_source_streaming_metadata(tmp_path):
+    """チャンク読み込みで計算した metadata が全件読み込みの metadata と一致する"""
+    df = pd.DataFrame(
+        {
+            "a": [1, 2, 3, 4, 5],
+            "b": [1.5, None, 3.5, None, 5.5],
+            "c": ["x", None, "z", "w", None],
+        }
+    )
+    csv_path = tmp_path / "data.csv"
+    df.to_csv(csv_path, index=False)
+
+    source = get_dataset_source("csv", path=str(csv_path))
+    chunks = list(source.iter_chunks(chunksize=2))
+    streamed = source.scan_metadata(chunksize=2)
+    df_loaded, metadata = load_dataset("csv", path=str(csv_path))
+
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert streamed == metadata
+    assert streamed.num_rows == 5
+    assert streamed.missing_counts == {"a": 0, "b": 2, "c": 2}
+
+
+def test_metadata_accumulator_merges_chunks():
+    """チャンク間で dtype が変わる列・途中から現れる列を正しく集計する"""
+    chunks = [
+        pd.DataFrame({"a": [1, 2], "b": ["x", None]}),
+        pd.DataFrame({"a": [1.5, None], "c": [True, False]}),
+    ]
+    metadata = build_metadata_streaming(chunks)
+
+    assert metadata.columns == ["a", "b", "c"]
+    assert metadata.dtypes == {"a": "float64", "b": "object", "c": "bool"}
+    assert metadata.num_rows == 4
+    assert metadata.missing_counts == {"a": 1, "b": 3, "c": 2}
+
+
+def test_sqlite_source(tmp_path):
+    """SQLite クエリ結果をチャンクで読み込める"""
+    db_path = tmp_path / "data.db"
+    with sqlite3.connect(db_path) as conn:
+        pd.DataFrame({"x": range(10), "y": ["a", "b"] * 5}).to_sql("t", conn, index=False)
+
+    source = get_dataset_source("sqlite", db_path=str(db_path), query="SELECT * FROM t WHERE x >= 3")
+    chunks = list(source.iter_chunks(chunksize=4))
+
+    assert [len(c) for c in chunks] == [4, 3]
+    assert source.scan_metadata().num_rows == 7
+
+
+def test_register_dataset_source():
+    """独自のデータソースを登録でき、未登録の種類は ValueError"""
+
+    @register_dataset_source("test-range")
+    class RangeSource(DatasetSource):
+        def __init__(self, n: int):
+            self.n = n
+
+        def iter_chunks(self, chunksize=100_000):
+            for start in range(0, self.n, chunksize):
+                yield pd.DataFrame({"v": range(start, min(start + chunksize, self.n))})
+
+    try:
+        df, metadata = load_dataset("test-range", n=7)
+        assert len(df) == 7
+        assert get_dataset_source("test-range", n=7).scan_metadata(chunksize=3).num_rows == 7
+    finally:
+        DATASET_SOURCES.pop("test-range")
+
+    with pytest.raises(ValueError, match="Unknown dataset source"):
+        get_dataset_source("no-such-source")
+
+    class IncompleteSource(DatasetSource):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteSource()
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from mplm.models.data import DatasetProfile
+from mplm.services.dataset_profiler import format_profile, profile_dataset
+
+
+def make_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "age": [10.0, 20.0, np.nan, 40.0, 50.0],
+            "sex": pd.Categorical(["male", "female", "male", "male", None]),
+            "name": ["a", "b", "c", "d", "e"],
+            "alive": [True, False, True, True, True],
+        }
+    )
+
+
+def test_profile_dataset():
+    """dtype・欠損数・ユニーク数・分位点・上位カテゴリを計算する"""
+    profile = profile_dataset(make_df(), sample_rows=None, top_k=2)
+    cols = {c.name: c for c in profile.columns}
+
+    assert isinstance(profile, DatasetProfile)
+    assert profile.num_rows == profile.sampled_rows == 5
+    assert [c.name for c in profile.columns] == ["age", "sex", "name", "alive"]
+
+    assert cols["age"].dtype == "float64"
+    assert cols["age"].missing == 1
+    assert cols["age"].unique == 4
+    assert cols["age"].quantiles == {"min": 10.0, "25%": 17.5, "50%": 30.0, "75%": 42.5, "max": 50.0}
+    assert cols["age"].mean == 30.0
+    assert cols["age"].top_values is None
+
+    assert cols["sex"].missing == 1
+    assert cols["sex"].unique == 2
+    assert cols["sex"].top_values == [("male", 3), ("female", 1)]
+    assert cols["sex"].quantiles is None
+
+    assert cols["alive"].top_values == [("True", 4), ("False", 1)]
+
+
+def test_profile_dataset_sampling():
+    """サンプリング時も欠損数は全行で計算する"""
+    df = pd.DataFrame({"x": [np.nan] * 10 + list(range(990))})
+    profile = profile_dataset(df, sample_rows=100)
+
+    assert profile.num_rows == 1000
+    assert profile.sampled_rows == 100
+    assert profile.columns[0].missing == 10
+    assert profile.columns[0].unique <= 100
+
+
+def test_format_profile():
+    """プロンプト・サマリー用のテキストに主要な統計量が含まれる"""
+    text = format_profile(profile_dataset(make_df()))
+
+    assert text.startswith("Rows: 5\nColumns:")
+    assert "age: float64, missing=1, unique=4, min=10, 25%=17.5, 50%=30, 75%=42.5, max=50, mean=30" in text
+    assert "sex: category, missing=1, unique=2, top=['male':3, 'female':1]" in text
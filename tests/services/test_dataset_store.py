@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mplm.services.dataset_store import attach_shared_dataset, create_shared_dataset, delete_shared_dataset
+from mplm.services.sandbox_executor import SandboxExecutor
+from mplm.services.training_executor import execute_training_code
+
+
+def is_memory_mapped(arr: np.ndarray) -> bool:
+    while arr is not None:
+        if isinstance(arr, np.memmap):
+            return True
+        arr = arr.base
+    return False
+
+
+def make_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "age": [22.0, np.nan, 35.0, 54.0],
+            "sibsp": [1, 0, 1, 0],
+            "sex": pd.Categorical(["male", "female", "female", None]),
+            "name": ["A", "B", None, "D"],
+            "survived": pd.Categorical(["0", "1", "1", "0"]),
+        },
+        index=[10, 11, 12, 13],
+    )
+
+
+@pytest.fixture
+def handle(tmp_path):
+    df = make_df()
+    h = create_shared_dataset({"df_train": df, "df_test": df.iloc[:2]}, root_dir=str(tmp_path))
+    yield h
+    delete_shared_dataset(h)
+
+
+def test_attach_roundtrip(handle):
+    """保存・attach した DataFrame が元と一致する（dtype, index, 欠損値含む）"""
+    frames = attach_shared_dataset(handle)
+
+    pd.testing.assert_frame_equal(frames["df_train"], make_df())
+    pd.testing.assert_frame_equal(frames["df_test"], make_df().iloc[:2])
+
+
+def test_attach_is_memory_mapped(handle):
+    """数値列・カテゴリ列はコピーされず memmap を参照する"""
+    df = attach_shared_dataset(handle)["df_train"]
+
+    assert is_memory_mapped(df["age"].to_numpy())
+    assert is_memory_mapped(df["sibsp"].to_numpy())
+    assert is_memory_mapped(df["sex"].array.codes)
+    assert not is_memory_mapped(df["name"].to_numpy())
+
+
+def test_attach_is_copy_on_write(handle):
+    """attach 先での in-place 変更は保存データや他の attach に影響しない"""
+    df1 = attach_shared_dataset(handle)["df_train"]
+    df1.loc[10, "age"] = 999.0
+
+    df2 = attach_shared_dataset(handle)["df_train"]
+    assert df2.loc[10, "age"] == 22.0
+
+
+def test_sandbox_shares_split_once():
+    """同じ df へのリトライでは分割済みデータを再作成しない"""
+    df = pd.DataFrame({"x": range(100), "survived": [i % 2 for i in range(100)]})
+    code = "df_train.loc[:, 'x'] = -1\nmodel = 'm'\naccuracy_val = float(df_train['x'].sum())\naccuracy_test = float(len(df_test))"
+
+    with SandboxExecutor(num_workers=1, timeout_sec=30, max_rss_mb=None) as ex:
+        first = execute_training_code(df=df, code=code, executor=ex)
+        second = execute_training_code(df=df, code=code, executor=ex)
+
+        assert len(ex._shared) == 1
+        assert first.accuracy_val == second.accuracy_val == -68.0
+        assert first.accuracy_test == 20.0
@@ -0,0 +1,112 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from mplm.models.training import TrainExecutionResult
+from mplm.services import sandbox_executor
+from mplm.services.sandbox_executor import SandboxExecutor
+from mplm.services.training_executor import execute_training_code
+from mplm.settings import settings
+from mplm.utils.exceptions import CodeExecutionError, CodeExecutionMemoryError, CodeExecutionTimeoutError
+
+OK_CODE = """
+model = 'dummy-model'
+accuracy_val = len(df_train) / 100
+accuracy_test = len(df_test) / 100
+"""
+
+
+def make_df(n: int = 100) -> pd.DataFrame:
+    return pd.DataFrame({"x": range(n), "survived": [i % 2 for i in range(n)]})
+
+
+@pytest.fixture
+def executor():
+    ex = SandboxExecutor(num_workers=1, timeout_sec=30, max_rss_mb=None, max_runs_per_worker=2)
+    yield ex
+    ex.close()
+
+
+def test_sandbox_executor_returns_result(executor):
+    """ワーカープロセスで実行した結果が TrainExecutionResult として返る"""
+    result = execute_training_code(df=make_df(), code=OK_CODE, executor=executor)
+
+    assert isinstance(result, TrainExecutionResult)
+    assert result.model == "dummy-model"
+    assert result.accuracy_val == 0.68
+    assert result.accuracy_test == 0.2
+    assert result.model_path is None
+
+
+def test_sandbox_executor_code_error(executor):
+    """生成コードの例外は CodeExecutionError として伝搬し、ワーカーは再利用される"""
+    with pytest.raises(CodeExecutionError, match="division by zero"):
+        executor.run("x = 1 / 0", df_train=None, df_val=None, df_test=None)
+
+    result = executor.run(OK_CODE, df_train=make_df(), df_val=make_df(), df_test=make_df())
+    assert result.accuracy_val == 1.0
+
+
+def test_sandbox_executor_timeout(executor):
+    """タイムアウトしたワーカーは kill され、新しいワーカーで次の実行ができる"""
+    with pytest.raises(CodeExecutionTimeoutError):
+        executor.run("while True:\n    pass", df_train=None, df_val=None, df_test=None, timeout_sec=1)
+
+    result = executor.run(OK_CODE, df_train=make_df(), df_val=make_df(), df_test=make_df())
+    assert result.model == "dummy-model"
+
+
+def test_sandbox_executor_memory_limit():
+    """RSS 上限を超えたワーカーは CodeExecutionMemoryError で停止される"""
+    code = "import time\nbuf = b'x' * (300 * 1024 * 1024)\ntime.sleep(30)"
+    with SandboxExecutor(num_workers=1, timeout_sec=30, max_rss_mb=200) as ex:
+        with pytest.raises(CodeExecutionMemoryError):
+            ex.run(code, df_train=None, df_val=None, df_test=None)
+
+
+def test_sandbox_executor_recycles_workers(executor):
+    """max_runs_per_worker 回実行したワーカーは入れ替えられる"""
+    code = "import os\nmodel = os.getpid()\naccuracy_val = 0.0\naccuracy_test = 0.0"
+    pids = [
+        executor.run(code, df_train=None, df_val=None, df_test=None).model
+        for _ in range(3)
+    ]
+
+    assert pids[0] == pids[1]
+    assert pids[2] != pids[0]
+
+
+def test_sandbox_executor_close_stops_busy_worker():
+    """close() 時に実行中だったワーカーは実行後に停止され、空きを待っていた呼び出しは RuntimeError"""
+    ex = SandboxExecutor(num_workers=1, timeout_sec=30, max_rss_mb=None, max_runs_per_worker=10)
+    code = "import time\ntime.sleep(1)\nmodel = 'dummy-model'\naccuracy_val = 0.0\naccuracy_test = 0.0"
+    worker = ex._idle.queue[0]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        busy = pool.submit(ex.run, code, df_train=None, df_val=None, df_test=None)
+        time.sleep(0.3)
+        waiting = pool.submit(ex.run, code, df_train=None, df_val=None, df_test=None)
+        time.sleep(0.1)
+        ex.close()
+
+        assert busy.result().model == "dummy-model"
+        with pytest.raises(RuntimeError, match="closed"):
+            waiting.result(timeout=5)
+
+    assert ex._idle.empty()
+    assert not worker.process.is_alive()
+
+
+def test_default_executor_has_a_worker_per_candidate(monkeypatch):
+    """既定のプールは学習候補の数以上のワーカーを持つ（候補が逐次実行にならない）"""
+    monkeypatch.setattr(settings, "execution_backend", "sandbox")
+    monkeypatch.setattr(settings, "execution_num_workers", 1)
+    monkeypatch.setattr(settings, "num_training_candidates", 2)
+    monkeypatch.setattr(sandbox_executor, "_default_executor", None)
+
+    executor = sandbox_executor.get_default_executor()
+    try:
+        assert executor.num_workers == 2
+    finally:
+        executor.close()
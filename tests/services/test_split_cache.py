@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import train_test_split
+
+from mplm.services import split_cache
+from mplm.services.split_cache import dataset_fingerprint, get_dataset_split
+from mplm.settings import settings
+
+
+def make_df(n: int = 50) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"x": np.arange(n, dtype=float), "c": pd.Categorical(["a", "b"] * (n // 2))},
+        index=np.arange(100, 100 + n),
+    )
+
+
+@pytest.fixture(autouse=True)
+def tmp_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "cache_dir", str(tmp_path))
+    split_cache._splits.clear()
+    yield tmp_path
+    split_cache._splits.clear()
+
+
+def test_split_matches_train_test_split():
+    """キャッシュ経由の分割は DataFrame を直接 train_test_split した結果と一致する"""
+    df = make_df()
+    split = get_dataset_split(df, random_seed=42)
+
+    df_train_full, df_test = train_test_split(df, test_size=0.2, random_state=42, shuffle=True)
+    df_train, df_val = train_test_split(df_train_full, test_size=0.15, random_state=42, shuffle=True)
+
+    pd.testing.assert_frame_equal(split.df_train, df_train)
+    pd.testing.assert_frame_equal(split.df_val, df_val)
+    pd.testing.assert_frame_equal(split.df_test, df_test)
+
+
+def test_split_is_cached_in_memory_and_on_disk(tmp_cache_dir):
+    """同じデータ・seed では分割を再計算しない（メモリ → ディスクの順で再利用）"""
+    with patch.object(split_cache, "_compute_split_indices", wraps=split_cache._compute_split_indices) as mock_compute:
+        first = get_dataset_split(make_df(), random_seed=1)
+        second = get_dataset_split(make_df(), random_seed=1)  # 別オブジェクト・同一内容
+        assert mock_compute.call_count == 1
+        assert len(list((tmp_cache_dir / "splits").glob("*.npz"))) == 1
+
+        split_cache._splits.clear()  # 別プロセス（次回の定期実行）を想定
+        third = get_dataset_split(make_df(), random_seed=1)
+        assert mock_compute.call_count == 1
+
+        get_dataset_split(make_df(), random_seed=2)
+        assert mock_compute.call_count == 2
+
+    np.testing.assert_array_equal(first.train_idx, second.train_idx)
+    np.testing.assert_array_equal(first.test_idx, third.test_idx)
+
+
+def test_split_frames_are_lazy():
+    """index 配列のみ保持し、DataFrame はアクセス時に作られる"""
+    split = get_dataset_split(make_df(), random_seed=42)
+    assert "df_train" not in split.__dict__
+
+    _ = split.df_train
+    assert "df_train" in split.__dict__
+    assert "df_test" not in split.__dict__
+
+
+def test_dataset_fingerprint():
+    """内容が同じなら同じ fingerprint、値が変われば異なる fingerprint"""
+    df = make_df()
+    changed = make_df()
+    changed.loc[100, "x"] = -1.0
+
+    assert dataset_fingerprint(df) == dataset_fingerprint(make_df())
+    assert dataset_fingerprint(df) != dataset_fingerprint(changed)
@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from mplm.chains.summary_chain import summary_chain
+from mplm.db.base import init_db
+from mplm.models.summary import SummaryResult
+from mplm.services.summary_cache import load_cached_summary, record_summary_accuracy, store_summary
+from mplm.settings import settings
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    init_db(create_engine(f"sqlite:///{path}"))
+    return path
+
+
+def make_df(n=5) -> pd.DataFrame:
+    return pd.DataFrame({"a": range(n), "b": [str(i) for i in range(n)]})
+
+
+def test_store_and_load_latest(db_path):
+    """同一内容のデータセットでは最新の要約が再利用される"""
+    store_summary(make_df(), SummaryResult(summary_text="old"), db_path=db_path)
+    cache_id = store_summary(make_df(), SummaryResult(summary_text="new", summary_code="print(1)"), db_path=db_path)
+
+    cached = load_cached_summary(make_df(), mode="latest", db_path=db_path)
+
+    assert cached.summary_text == "new"
+    assert cached.summary_code == "print(1)"
+    assert cached.cache_id == cache_id
+
+
+def test_load_miss(db_path):
+    """内容の異なるデータセット・mode=off ではヒットしない"""
+    store_summary(make_df(), SummaryResult(summary_text="s"), db_path=db_path)
+
+    assert load_cached_summary(make_df(6), mode="latest", db_path=db_path) is None
+    assert load_cached_summary(make_df(), mode="off", db_path=db_path) is None
+
+
+def test_prompt_version_mismatch(db_path):
+    """プロンプトのバージョンが変わると古い要約は使われない"""
+    store_summary(make_df(), SummaryResult(summary_text="s"), db_path=db_path)
+
+    with patch("mplm.services.summary_cache.SUMMARY_PROMPT_VERSION", "other"):
+        assert load_cached_summary(make_df(), mode="latest", db_path=db_path) is None
+
+
+def test_load_best(db_path):
+    """best モードでは検証精度の最も高い要約が選ばれる（最大値が保持される）"""
+    low = store_summary(make_df(), SummaryResult(summary_text="low"), db_path=db_path)
+    high = store_summary(make_df(), SummaryResult(summary_text="high"), db_path=db_path)
+    store_summary(make_df(), SummaryResult(summary_text="unscored"), db_path=db_path)
+
+    record_summary_accuracy(low, 0.7, db_path=db_path)
+    record_summary_accuracy(high, 0.9, db_path=db_path)
+    record_summary_accuracy(high, 0.5, db_path=db_path)
+
+    cached = load_cached_summary(make_df(), mode="best", best_n=1, db_path=db_path)
+    assert cached.summary_text == "high"
+
+
+def test_summary_chain_reuses_cache(db_path, monkeypatch):
+    """2 回目の summary_chain は LLM を呼ばずにキャッシュを使う"""
+    monkeypatch.setattr(settings, "summary_cache_mode", "latest")
+    monkeypatch.setattr(settings, "db_file", db_path)
+
+    with patch(
+        "mplm.chains.summary_chain.generate_summary_with_llm",
+        return_value=SummaryResult(summary_text="generated", summary_code="pass"),
+    ) as mock_summary:
+        first = summary_chain({"df": make_df()})
+        second = summary_chain({"df": make_df()})
+
+        mock_summary.assert_called_once()
+        assert second["status"] == "ok"
+        assert second["summary_result"].summary_text == "generated"
+        assert second["summary_result"].cache_id == first["summary_result"].cache_id
@@ -1,3 +1,4 @@
+import logging
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
@@ -7,6 +8,7 @@ from mplm.models.data import DatasetMetadata
 from mplm.models.summary import SummaryResult
 from mplm.services.data_loader import load_titanic_dataset
 from mplm.services.summary_generator import fixed_summary_logic, generate_summary_with_llm
+from mplm.settings import settings
 from mplm.utils.exceptions import CodeExecutionError
 
 
@@ -89,6 +91,24 @@ summary_text = None
         generate_summary_with_llm(df, metadata)
 
 
+# ストリーミング時にコードブロックがなければ、受信したテキストを debug ログに出す
+@patch("mplm.services.summary_generator.get_llm")
+def test_generate_summary_with_llm_streaming_logs_raw_output(mock_get_llm, monkeypatch, caplog):
+    """ストリーミングでコードブロックが見つからない場合も、LLM の出力を debug ログに残す"""
+    monkeypatch.setattr(settings, "llm_streaming", True)
+    mock_llm = MagicMock()
+    mock_get_llm.return_value = mock_llm
+    mock_llm.stream.return_value = iter(["no code ", "here"])
+    df = pd.DataFrame({"Age": [25, 30]})
+    metadata = DatasetMetadata(columns=["Age"], dtypes={"Age": "int64"}, num_rows=2, missing_counts={"Age": 0})
+
+    with caplog.at_level(logging.INFO, logger="mplm.services.summary_generator"):
+        with pytest.raises(ValueError, match="code block not found"):
+            generate_summary_with_llm(df, metadata, debug=True)
+
+    assert "no code here" in caplog.text
+
+
 # 本番テスト
 def test_generate_summary_with_llm_prod(request):
     """本番のgenerate_summary_with_llm関数のテスト"""
@@ -1,8 +1,10 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from mplm.services.training_code_generator import generate_training_code
+from mplm.services.training_code_generator import agenerate_training_code, generate_training_code
+from mplm.settings import settings
 
 
 @patch("mplm.services.training_code_generator.get_llm")
@@ -35,6 +37,22 @@ def test_generate_training_code(mock_extract_code, mock_get_llm):
     mock_extract_code.assert_called_once()
 
 
+def test_agenerate_training_code():
+    """非同期版は ainvoke を使い、候補番号をプロンプトに含める"""
+    mock_llm = MagicMock()
+    mock_llm.ainvoke = AsyncMock(return_value="```python\nmodel = 1\n```")
+
+    code = asyncio.run(
+        agenerate_training_code("Rows: 100", "survived", candidate_index=1, num_candidates=3, llm=mock_llm)
+    )
+
+    assert code.strip() == "model = 1"
+    mock_llm.invoke.assert_not_called()
+    prompt = mock_llm.ainvoke.call_args[0][0]
+    assert "Rows: 100" in prompt
+    assert "candidate 2 of 3" in prompt
+
+
 @patch("mplm.services.training_code_generator.get_llm")
 @patch("mplm.services.training_code_generator.extract_code_from_block")
 def test_generate_training_code_empty(mock_extract_code, mock_get_llm):
@@ -71,3 +89,15 @@ def test_generate_training_code_prod(request):
 
     assert isinstance(code, str)
     assert len(code) > 0
+
+
+def test_generate_training_code_streaming(monkeypatch):
+    """LLM_STREAMING 有効時は stream() を使い、コードブロック完結で打ち切る"""
+    monkeypatch.setattr(settings, "llm_streaming", True)
+    mock_llm = MagicMock()
+    mock_llm.stream.return_value = iter(["```python\nmodel", " = 1\n``", "`\nexplanation..."])
+
+    code = generate_training_code("Rows: 100", "survived", llm=mock_llm)
+
+    assert code == "model = 1"
+    mock_llm.invoke.assert_not_called()
@@ -0,0 +1,22 @@
+import numpy as np
+
+from mplm.utils.downsample import lttb
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    """両端と、なだらかな系列の中の鋭いピークは間引いても残る"""
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 100)
+    y[500] = 10.0
+
+    kept = lttb(x, y, 50)
+
+    assert len(kept) == 50
+    assert kept[0] == 0 and kept[-1] == 999
+    assert 500 in kept
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_lttb_short_series_unchanged():
+    """しきい値以下の系列はそのまま"""
+    assert list(lttb([1, 2, 3], [1, 2, 3], 10)) == [0, 1, 2]
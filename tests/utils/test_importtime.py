@@ -0,0 +1,29 @@
+import os
+
+from mplm.utils.importtime import measure_import_time
+
+# 必要な経路でだけ読み込むモジュール（mplm.main の import 時に読み込まれてはいけない）
+DEFERRED_MODULES = (
+    "matplotlib",
+    "seaborn",
+    "sklearn",
+    "langchain_ollama",
+    "google.cloud.storage",
+    "google.api_core",
+    "mplm.agent.tournament",
+    "mplm.utils.visualization",
+)
+
+
+def test_main_does_not_import_deferred_modules():
+    """mplm.main の import では重いモジュールを読み込まない"""
+    times = measure_import_time("mplm.main")
+    assert [module for module in DEFERRED_MODULES if times.imported(module)] == []
+
+
+def test_main_import_time_budget():
+    """mplm.main の import 時間が予算内に収まる（MPLM_IMPORT_BUDGET_SEC で変更可）"""
+    budget_sec = float(os.environ.get("MPLM_IMPORT_BUDGET_SEC", "8"))
+    times = measure_import_time("mplm.main")
+    assert times.imported("mplm.main")
+    assert times.total_sec < budget_sec, times.top(10)
@@ -0,0 +1,93 @@
+import io
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+
+from mplm.utils.logger import ContextFilter, JsonFormatter, TextFormatter, _QueueHandler, get_logger, log_context
+
+
+def make_pipeline(formatter, sample_every=1):
+    """get_logger と同じ構成（QueueHandler → QueueListener → StringIO）のロガーを作る"""
+    stream = io.StringIO()
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(ContextFilter(sample_every))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+
+    logger = logging.getLogger(f"test-logger-{id(stream)}")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    return logger, listener, stream
+
+
+def test_json_logging_with_context():
+    """JSON 形式で severity・message・コンテキスト項目・例外を出力する"""
+    logger, listener, stream = make_pipeline(JsonFormatter())
+    listener.start()
+    with log_context(run_id="r1", node="training"):
+        with log_context(attempt=2):
+            logger.info("accuracy=%.2f", 0.91)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+    logger.warning("outside")
+    listener.stop()
+
+    first, second, third = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["severity"] == "INFO"
+    assert first["message"] == "accuracy=0.91"
+    assert (first["run_id"], first["node"], first["attempt"]) == ("r1", "training", 2)
+    assert second["severity"] == "ERROR" and "ValueError: boom" in second["exception"]
+    assert "attempt" not in second
+    assert "run_id" not in third
+
+
+def test_context_follows_threads():
+    """コンテキストはログを出したスレッドのものが使われる"""
+    logger, listener, stream = make_pipeline(TextFormatter("%(message)s"))
+    listener.start()
+
+    def work(i):
+        with log_context(candidate=i):
+            logger.info(f"candidate {i}")
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    listener.stop()
+
+    lines = sorted(stream.getvalue().splitlines())
+    assert lines == [f"candidate {i} candidate={i}" for i in range(4)]
+
+
+def test_debug_sampling():
+    """DEBUG ログは呼び出し箇所ごとに N 件に 1 件だけ出力され、INFO は間引かない"""
+    logger, listener, stream = make_pipeline(JsonFormatter(), sample_every=10)
+    listener.start()
+    for i in range(25):
+        logger.debug(f"step {i}")
+        logger.info(f"info {i}")
+    listener.stop()
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    debug = [e["message"] for e in entries if e["severity"] == "DEBUG"]
+    assert debug == ["step 0", "step 10", "step 20"]
+    assert all(e["sample_every"] == 10 for e in entries if e["severity"] == "DEBUG")
+    assert sum(e["severity"] == "INFO" for e in entries) == 25
+
+
+def test_get_logger_uses_shared_queue_handler():
+    """get_logger のロガーはすべて同じ QueueHandler を共有する"""
+    a = get_logger("mplm.test.a")
+    b = get_logger("mplm.test.b")
+    assert len(a.handlers) == 1
+    assert a.handlers[0] is b.handlers[0]
+    assert isinstance(a.handlers[0], _QueueHandler)
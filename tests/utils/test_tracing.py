@@ -0,0 +1,132 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from mplm.agent.automatic_model_build_agent import save_run_to_db
+from mplm.db.base import init_db
+from mplm.db.crud import get_run_spans_as_df
+from mplm.db.session import get_engine, get_session
+from mplm.models.summary import SummaryResult
+from mplm.models.training import TrainExecutionResult
+from mplm.utils.tracing import Trace, observe_stream, record_llm_usage, span, traced_node, use_trace
+
+
+def test_span_noop_without_trace():
+    """トレースが有効でなければ span は何もしない"""
+    with span("x") as record:
+        assert record is None
+
+
+def test_nested_spans_and_errors():
+    """ネストした span は親子関係を持ち、例外はエラーとして記録される"""
+    trace = Trace()
+    with use_trace(trace):
+        with span("node", kind="node"):
+            with span("llm", kind="llm", model="m"):
+                pass
+            with pytest.raises(ValueError):
+                with span("exec", kind="exec"):
+                    raise ValueError("boom")
+
+    node, llm, exec_ = trace.spans
+    assert node.parent_id is None
+    assert llm.parent_id == exec_.parent_id == node.span_id
+    assert llm.attributes == {"model": "m"}
+    assert exec_.error == "boom"
+    assert all(s.wall_sec is not None and s.cpu_sec is not None for s in trace.spans)
+    assert set(trace.totals_by_kind()) == {"node", "llm", "exec"}
+
+
+def test_spans_in_threads_and_tasks():
+    """copy_context したスレッドや asyncio タスク内の span も親 span に紐づく"""
+    trace = Trace()
+
+    async def task(i):
+        with span(f"task{i}"):
+            await asyncio.sleep(0)
+
+    def run_tasks():
+        async def gather():
+            await asyncio.gather(task(0), task(1))
+        asyncio.run(gather())
+
+    with use_trace(trace), span("node", kind="node") as node:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, lambda i=i: span_in_thread(i)) for i in range(2)]
+            [f.result() for f in futures]
+        run_tasks()
+
+    children = [s for s in trace.spans if s.span_id != node.span_id]
+    assert len(children) == 4
+    assert all(s.parent_id == node.span_id for s in children)
+
+
+def span_in_thread(i):
+    with span(f"thread{i}"):
+        pass
+
+
+def test_traced_node():
+    """traced_node は state["trace"] があるときだけノード span を記録する"""
+    node = traced_node("training", lambda state: {**state, "status": "ok"})
+
+    assert node({"retry_count": 0})["status"] == "ok"
+
+    trace = Trace()
+    node({"trace": trace, "retry_count": 2})
+    (record,) = trace.spans
+    assert (record.name, record.kind, record.attributes) == ("training", "node", {"attempt": 2})
+
+
+def test_record_llm_usage_and_stream():
+    """レスポンス・ストリームのチャンクからトークン数を集計し、close は元のストリームに伝わる"""
+    trace = Trace()
+    closed = []
+
+    def source():
+        try:
+            yield AIMessage(content="ab", usage_metadata={"input_tokens": 10, "output_tokens": 1, "total_tokens": 11})
+            yield AIMessage(content="c", usage_metadata={"input_tokens": 0, "output_tokens": 2, "total_tokens": 2})
+            yield AIMessage(content="never read")
+        finally:
+            closed.append(True)
+
+    with use_trace(trace), span("llm", kind="llm") as record:
+        stream = observe_stream(source(), record)
+        next(stream)
+        next(stream)
+        stream.close()
+        record_llm_usage(record, "plain text")
+
+    assert closed == [True]
+    assert (record.prompt_tokens, record.completion_tokens) == (10, 3)
+    assert record.attributes["completion_chars"] == 3 + len("plain text")
+
+
+def test_save_run_to_db_saves_spans(tmp_path):
+    """トレースのスパンは保存した RunRecord に紐づく run_spans として保存される"""
+    db_path = str(tmp_path / "runs.db")
+    init_db(get_engine(db_path))
+    trace = Trace()
+    with use_trace(trace), span("training", kind="node"), span("exec.training", kind="exec", backend="inprocess"):
+        pass
+
+    result = TrainExecutionResult(accuracy_val=0.9, accuracy_test=0.8, code="c", model="m", model_name="RF")
+    state = {
+        "summary_result": SummaryResult(summary_text="s"),
+        "training_result": result,
+        "llm": MagicMock(model="m"),
+        "trace": trace,
+    }
+    save_run_to_db(state, db_path=db_path)
+
+    with get_session(db_path)() as db:
+        df = get_run_spans_as_df(db)
+    assert list(df["name"]) == ["training", "exec.training"]
+    assert df["run_id"].nunique() == 1
+    assert df.loc[1, "parent_span_id"] == 0
+    assert '"backend": "inprocess"' in df.loc[1, "attributes"]
@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from mplm.utils.visualization import accuracy_summary_spec, binned_kde, plot_accuracy_summary
+
+
+def make_records(n=2000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "created_at": pd.date_range("2026-01-01", periods=n, freq="h"),
+        "accuracy_val": rng.normal(0.8, 0.03, n),
+        "accuracy_test": rng.normal(0.78, 0.03, n),
+        "llm_name": rng.choice(["a", "b"], n),
+    })
+
+
+def test_summary_spec_downsamples_and_bins():
+    """時系列は LLM ごとに max_points 点まで間引き、ヒストグラムは全件を数える"""
+    spec = accuracy_summary_spec(make_records(), bins=70, max_points=100)
+
+    assert spec["llm_names"] == ["a", "b"]
+    assert all(len(s["t"]) == 100 for s in spec["series"]["val"].values())
+    histogram = spec["histograms"]["test"]
+    assert len(histogram["edges"]) == 71
+    assert sum(sum(c) for c in histogram["counts"].values()) == 2000
+
+
+def test_binned_kde_preserves_mass():
+    """ビン上の KDE はほぼ件数を保ち、ビン数と同じ長さになる"""
+    edges = np.linspace(0, 1, 101)
+    counts = np.histogram(np.random.default_rng(0).normal(0.5, 0.05, 1000), bins=edges)[0]
+    kde = binned_kde(counts, edges)
+    assert kde.shape == counts.shape
+    assert abs(kde.sum() - 1000) < 1
+
+
+def test_plot_formats(tmp_path):
+    """拡張子に応じて PNG / SVG / JSON を出力する"""
+    df = make_records(200)
+    for ext in ("png", "svg", "json"):
+        path = tmp_path / f"summary.{ext}"
+        plot_accuracy_summary(df, str(path))
+        assert path.stat().st_size > 0
+    assert json.loads((tmp_path / "summary.json").read_text())["kind"] == "accuracy_summary"
+    assert (tmp_path / "summary.png").read_bytes()[:4] == b"\x89PNG"